@@ -0,0 +1,115 @@
+import argparse
+import os
+import random
+
+from core.step import MaestroStep
+from core.yaml_service import flow_to_yaml
+
+APP_ID = "com.example.bench"
+GROUP_SIZE = 50
+
+
+def supported_item(rnd, i):
+    kind = rnd.randrange(5)
+    if kind == 0:
+        return {"tapOn": {"id": f"button_{i}"}}
+    if kind == 1:
+        return {"tapOn": {"point": f"{i % 100}%,50%"}}
+    if kind == 2:
+        return {"inputText": {"id": f"field_{i % 40}", "text": f"ввод {i}"}}
+    if kind == 3:
+        return {"assertVisible": {"text": f"Экран {i} ✅"}}
+    return "back"
+
+
+def unsupported_item(rnd, i):
+    kind = rnd.randrange(4)
+    if kind == 0:
+        return {"swipe": {"direction": rnd.choice(["UP", "DOWN"]), "duration": 400}}
+    if kind == 1:
+        return {
+            "extendedWaitUntil": {"visible": {"id": f"spinner_{i}"}, "timeout": 10000}
+        }
+    if kind == 2:
+        return {"scrollUntilVisible": {"element": {"text": f"Item {i}"}}}
+    return "waitForAnimationToEnd"
+
+
+def synthetic_items(count, unsupported=0.2, rnd=None):
+    rnd = rnd or random.Random(0)
+    items = []
+    for i in range(count):
+        if rnd.random() < unsupported:
+            items.append(unsupported_item(rnd, i))
+        else:
+            items.append(supported_item(rnd, i))
+    return items
+
+
+def items_to_steps(items):
+    return [
+        MaestroStep.from_dict(item) if isinstance(item, dict) else MaestroStep(item)
+        for item in items
+    ]
+
+
+def write_flow(path, steps):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(flow_to_yaml(APP_ID, steps))
+
+
+def generate_project(
+    root, files=200, steps=50, depth=3, unsupported=0.2, seed=0, subflow_steps=10
+):
+    # tests/group_N/test_M.yaml; каждый тест начинается с цепочки runFlow
+    # глубиной depth: common/level_1.yaml -> level_2.yaml -> ...
+    rnd = random.Random(seed)
+    tests_dir = os.path.join(root, "tests")
+    with open(os.path.join(root, "config.yaml"), "w", encoding="utf-8") as f:
+        f.write(f"appId: {APP_ID}\n")
+
+    for level in range(1, depth + 1):
+        level_steps = items_to_steps(synthetic_items(subflow_steps, unsupported, rnd))
+        if level < depth:
+            level_steps.insert(
+                0, MaestroStep("runFlow", params={"file": f"level_{level + 1}.yaml"})
+            )
+        write_flow(
+            os.path.join(tests_dir, "common", f"level_{level}.yaml"), level_steps
+        )
+
+    tests = []
+    for i in range(files):
+        test_steps = items_to_steps(synthetic_items(steps, unsupported, rnd))
+        if depth:
+            test_steps.insert(
+                0, MaestroStep("runFlow", params={"file": "../common/level_1.yaml"})
+            )
+        rel_path = os.path.join(f"group_{i // GROUP_SIZE}", f"test_{i}.yaml")
+        write_flow(os.path.join(tests_dir, rel_path), test_steps)
+        tests.append(rel_path)
+    return tests
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic Maestro project")
+    parser.add_argument("root")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--depth", type=int, default=3, help="runFlow chain depth")
+    parser.add_argument(
+        "--unsupported", type=float, default=0.2, help="share of unsupported steps"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.root, exist_ok=True)
+    tests = generate_project(
+        args.root, args.files, args.steps, args.depth, args.unsupported, args.seed
+    )
+    print(f"{len(tests)} tests in {os.path.join(args.root, 'tests')}")
+
+
+if __name__ == "__main__":
+    main()
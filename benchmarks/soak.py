@@ -0,0 +1,141 @@
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.project_generator import generate_project
+from core.memory import rss_bytes, start_tracing, take_snapshot, top_allocators
+from core.memory import format_allocators
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUB_DIR = os.path.join(ROOT, "benchmarks", "stub")
+
+
+def wait_for(app, condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("soak step timed out")
+        app.processEvents()
+        time.sleep(0.002)
+
+
+def edit_step(window):
+    # правка через настоящий редактор, как при наборе текста
+    from PyQt5.QtWidgets import QLineEdit
+
+    editor = window.editor_pool.currentWidget()
+    fields = editor.findChildren(QLineEdit)
+    if fields:
+        fields[0].setText(fields[0].text() + "x")
+
+
+def cycle(app, window, test_name):
+    item = window.test_items[test_name]
+    window.test_list_widget.setCurrentItem(item)
+    window.on_test_selected(item)
+    wait_for(app, lambda: not window.is_flow_loading())
+
+    for row in range(1, min(window.step_model.rowCount(), 6)):
+        window.step_list.set_current_row(row)
+        edit_step(window)
+    window.undo()
+    window.redo()
+    window.yaml_preview.refresh()
+
+    previous = window.runner
+    window.run_maestro()
+    wait_for(
+        app,
+        lambda: window.runner is not previous and window.runner.isFinished(),
+    )
+    app.processEvents()
+
+
+def measure(window):
+    from ui.memory_stats import memory_counts
+
+    # сначала счётчики: первый обход кучи в live_counts разово выделяет
+    # пару мегабайт, и в снимке после базового они выглядели бы утечкой
+    counts = memory_counts(window)
+    gc.collect()
+    return take_snapshot(), counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offscreen editing/run soak test")
+    parser.add_argument("--iterations", type=int, default=40)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=30)
+    parser.add_argument(
+        "--max-growth-kb",
+        type=int,
+        default=512,
+        help="allowed growth of traced memory after warmup",
+    )
+    parser.add_argument("--top", type=int, default=10, help="allocators to print")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ["PATH"] = STUB_DIR + os.pathsep + os.environ.get("PATH", "")
+    os.environ.setdefault("STUB_DELAY", "0")
+
+    from PyQt5.QtWidgets import QApplication
+
+    from ui.main_window import MainWindow
+
+    app = QApplication.instance() or QApplication([])
+    start_tracing()
+
+    with tempfile.TemporaryDirectory() as project:
+        tests = generate_project(project, args.files, args.steps, depth=2)
+        window = MainWindow()
+        window.load_project(project)
+        # список тестов наполняет фоновое сканирование
+        wait_for(app, lambda: all(test in window.test_items for test in tests))
+        # подтверждения в диалогах скрипт не проходит
+        window.confirm = lambda title, text: True
+
+        baseline = None
+        print(f"{'iter':>5}{'traced KiB':>12}{'rss KiB':>10}  live objects")
+        for i in range(args.iterations):
+            cycle(app, window, tests[i % len(tests)])
+            if i + 1 < args.warmup and (i + 1) % 5:
+                continue
+            snapshot, counts = measure(window)
+            if i + 1 == args.warmup:
+                baseline = (snapshot, counts)
+            print(
+                f"{i + 1:5d}{snapshot.traced / 1024:12.0f}"
+                f"{(rss_bytes() or 0) / 1024:10.0f}  "
+                f"steps={counts['steps (live)']} editors={counts['editors (live)']} "
+                f"runners={counts['runners (live)']} widgets={counts['widgets']}"
+            )
+
+        window.close()
+        app.processEvents()
+
+    first, first_counts = baseline
+    last, last_counts = snapshot, counts
+    growth = (last.traced - first.traced) / 1024
+    print(f"traced growth after warmup: {growth:+.0f} KiB")
+    for line in format_allocators(top_allocators(last, first, limit=args.top)):
+        print(line)
+
+    failed = growth > args.max_growth_kb
+    for name in ("editors (live)", "runners (live)", "worker threads (live)"):
+        if last_counts[name] > first_counts[name]:
+            print(f"{name}: {first_counts[name]} -> {last_counts[name]}")
+            failed = True
+    if failed:
+        print("memory is not flat", file=sys.stderr)
+        return 1
+    print("memory is flat")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
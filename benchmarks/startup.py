@@ -0,0 +1,80 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GUI_SNIPPET = """
+import sys
+from PyQt5.QtWidgets import QApplication
+from ui.main_window import MainWindow
+app = QApplication(sys.argv)
+window = MainWindow()
+window.show()
+app.processEvents()
+"""
+
+
+def timed(command, env=None):
+    start = time.perf_counter()
+    subprocess.run(
+        command,
+        cwd=ROOT,
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start
+
+
+def median_time(command, repeat, env=None):
+    return statistics.median(timed(command, env) for _ in range(repeat))
+
+
+def imports_qt(command):
+    # -X importtime пишет каждый импортированный модуль в stderr
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime"] + command[1:],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    return "PyQt5" in result.stderr
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CLI vs GUI startup time")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as project:
+        os.makedirs(os.path.join(project, "tests"))
+        with open(os.path.join(project, "tests", "flow.yaml"), "w") as f:
+            f.write("appId: com.example\n---\n- launchApp\n")
+
+        cli = [sys.executable, "main.py", "list", "--project", project]
+        gui = [sys.executable, "-c", GUI_SNIPPET]
+        gui_env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+
+        bare = median_time([sys.executable, "-c", "pass"], args.repeat)
+        cli_time = median_time(cli, args.repeat)
+        gui_time = median_time(gui, args.repeat, gui_env)
+
+        print(f"python -c pass: {bare * 1000:7.0f} ms")
+        print(f"CLI (list):     {cli_time * 1000:7.0f} ms")
+        print(f"GUI (window):   {gui_time * 1000:7.0f} ms")
+        print(f"CLI/GUI:        {cli_time / gui_time:7.2f}")
+        if imports_qt(cli):
+            print("CLI imported PyQt5")
+            return 1
+        print("CLI did not import PyQt5")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import argparse
+import gc
+import random
+import tracemalloc
+
+from core.step import MaestroStep
+
+
+class LegacyStep:
+    # MaestroStep до перехода на __slots__: __dict__ на каждый экземпляр,
+    # свой пустой params и исходный словарь у неподдержанных шагов
+    def __init__(self, step_type, params=None, raw=None):
+        self.step_type = step_type
+        self.params = params or {}
+        self.raw = raw
+
+    @staticmethod
+    def from_dict(data):
+        step_type = list(data.keys())[0]
+        params = data[step_type]
+        supported = step_type in (
+            "tapOn",
+            "inputText",
+            "launchApp",
+            "assertVisible",
+            "back",
+        )
+        if supported:
+            return LegacyStep(
+                step_type, params=params if isinstance(params, dict) else {}
+            )
+        return LegacyStep(
+            step_type, raw=data, params=params if isinstance(params, dict) else {}
+        )
+
+
+def fresh(text):
+    # разбор YAML даёт новый объект строки на каждый ключ — повторяем это
+    return "".join(list(text))
+
+
+def synthetic_items(count, seed=0):
+    rnd = random.Random(seed)
+    items = []
+    for i in range(count):
+        kind = rnd.randrange(6)
+        if kind == 0:
+            items.append({fresh("tapOn"): {fresh("id"): f"button_{i}"}})
+        elif kind == 1:
+            items.append({fresh("inputText"): {fresh("text"): f"text {i}"}})
+        elif kind == 2:
+            items.append(fresh("back"))
+        elif kind == 3:
+            items.append(fresh("launchApp"))
+        elif kind == 4:
+            items.append({fresh("runFlow"): {fresh("file"): f"flows/f{i % 500}.yaml"}})
+        else:
+            items.append({fresh("swipe"): {fresh("direction"): "UP"}})
+    return items
+
+
+def build(step_class, items):
+    steps = []
+    for item in items:
+        if isinstance(item, dict):
+            steps.append(step_class.from_dict(item))
+        else:
+            steps.append(step_class(item, params={}))
+    return steps
+
+
+def measure(step_class, count):
+    # учитываем и разобранные данные: после загрузки в памяти остаётся только
+    # то, на что ссылаются шаги
+    gc.collect()
+    tracemalloc.start()
+    items = synthetic_items(count)
+    steps = build(step_class, items)
+    del items
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del steps
+    return used
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MaestroStep memory benchmark")
+    parser.add_argument("--steps", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    legacy = measure(LegacyStep, args.steps)
+    compact = measure(MaestroStep, args.steps)
+    print(f"{args.steps} steps")
+    print(f"legacy:  {legacy / 2**20:8.1f} MiB  {legacy / args.steps:6.1f} B/step")
+    print(f"compact: {compact / 2**20:8.1f} MiB  {compact / args.steps:6.1f} B/step")
+    print(f"saved:   {(1 - compact / legacy) * 100:8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.project_generator import generate_project
+from core import yaml_backend
+from core.step import MaestroStep
+from core.validator import StepValidator, ValidationContext
+from core.yaml_service import (
+    flow_cache,
+    flow_to_yaml,
+    save_maestro_yaml,
+    steps_to_yaml,
+    yaml_to_steps,
+)
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+class Case:
+    def __init__(self, name, func, setup=None, number=1):
+        self.name = name
+        self.func = func
+        self.setup = setup
+        # вызовов func на один замер — для коротких операций
+        self.number = number
+
+
+def measure(case, repeat):
+    times = []
+    for _ in range(repeat):
+        if case.setup:
+            case.setup()
+        start = time.perf_counter()
+        for _ in range(case.number):
+            case.func()
+        times.append((time.perf_counter() - start) / case.number)
+    return {
+        "median": statistics.median(times),
+        "min": min(times),
+        "repeat": repeat,
+    }
+
+
+def biggest_flow(tests_dir, tests):
+    # самый длинный тест — на нём и меряем операции над одним потоком
+    return max((os.path.join(tests_dir, test) for test in tests), key=os.path.getsize)
+
+
+def core_cases(project, tests):
+    tests_dir = os.path.join(project, "tests")
+    path = biggest_flow(tests_dir, tests)
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    app_id, steps = yaml_to_steps(text)
+    items = [step.to_dict() for step in steps]
+    context = ValidationContext(path, tests_dir)
+    out_dir = tempfile.mkdtemp(dir=project)
+    changed_path = os.path.join(out_dir, "changed.yaml")
+    unchanged_path = os.path.join(out_dir, "unchanged.yaml")
+    save_maestro_yaml(unchanged_path, app_id, steps)
+
+    def remove_changed():
+        if os.path.exists(changed_path):
+            os.remove(changed_path)
+
+    def from_dict():
+        for item in items:
+            if isinstance(item, dict):
+                MaestroStep.from_dict(item)
+            else:
+                MaestroStep(item)
+
+    def display_names():
+        for step in steps:
+            step.display_name()
+
+    return [
+        Case("yaml_to_steps", lambda: yaml_to_steps(text), setup=flow_cache.clear),
+        Case("yaml_to_steps (cached)", lambda: yaml_to_steps(text), number=100),
+        Case("steps_to_yaml", lambda: steps_to_yaml(steps)),
+        Case("flow_to_yaml", lambda: flow_to_yaml(app_id, steps)),
+        Case(
+            "save_maestro_yaml",
+            lambda: save_maestro_yaml(changed_path, app_id, steps),
+            setup=remove_changed,
+        ),
+        Case(
+            "save_maestro_yaml (unchanged)",
+            lambda: save_maestro_yaml(unchanged_path, app_id, steps),
+        ),
+        Case(
+            "StepValidator.validate", lambda: StepValidator.validate(steps), number=20
+        ),
+        Case(
+            "StepValidator.validate (runFlow targets)",
+            lambda: StepValidator.validate(steps, context),
+            number=20,
+        ),
+        Case("MaestroStep.from_dict", from_dict, number=20),
+        Case("MaestroStep.display_name", display_names, number=20),
+    ]
+
+
+def gui_cases(project, tests):
+    # Qt без дисплея; импорт здесь, чтобы --no-gui не тянул PyQt5
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+
+    from core.project_index import ProjectIndex, scan_tests
+    from ui.main_window import MainWindow
+
+    app = QApplication.instance() or QApplication([])
+    window = MainWindow()
+    tests_dir = os.path.join(project, "tests")
+    window.project_dir = project
+    window.tests_dir = tests_dir
+    window.project_index = ProjectIndex(project, tests_dir)
+    window.project_index.replace(scan_tests(tests_dir))
+
+    with open(biggest_flow(tests_dir, tests), "r", encoding="utf-8") as f:
+        app_id, steps = yaml_to_steps(f.read())
+    window.app_id_input.setText(app_id or "")
+    window.step_model.set_steps(steps)
+    window.yaml_preview.refresh()
+    middle = len(steps) // 2
+
+    def edit_one():
+        # одна правка посередине: обновляется только её фрагмент
+        step = steps[middle]
+        step.set_params({"id": f"edited_{time.perf_counter_ns()}"})
+        window.yaml_cache.invalidate(step)
+        window.step_model.step_changed(middle)
+
+    def reset_preview():
+        window.yaml_cache.clear()
+        window.yaml_preview.fragments = []
+        window.yaml_preview.clear()
+
+    def update_yaml():
+        window.update_yaml()
+        window.yaml_preview.refresh()
+        app.processEvents()
+
+    return [
+        Case("load_test_list", window.load_test_list),
+        Case("update_yaml (one step edited)", update_yaml, setup=edit_one),
+        Case("update_yaml (full)", update_yaml, setup=reset_preview),
+    ]
+
+
+def compare(results, baseline, tolerance, floor):
+    # регрессия: медиана выросла больше чем на tolerance и хотя бы на floor
+    # секунд — чтобы шум микросекундных замеров не давал ложных срабатываний
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        ratio = result["median"] / base["median"] if base["median"] else 1.0
+        result["baseline"] = base["median"]
+        result["ratio"] = round(ratio, 3)
+        slower = result["median"] - base["median"]
+        result["regression"] = ratio > 1 + tolerance and slower > floor
+        if result["regression"]:
+            regressions.append(name)
+    return regressions
+
+
+WORKLOAD = ("files", "steps", "depth", "unsupported")
+
+
+def load_baseline(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def environment(args):
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "libyaml": yaml_backend.LIBYAML,
+        "files": args.files,
+        "steps": args.steps,
+        "depth": args.depth,
+        "unsupported": args.unsupported,
+        "repeat": args.repeat,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def print_table(results):
+    print(f"{'benchmark':<42}{'median, ms':>12}{'baseline':>12}{'ratio':>8}")
+    for name, result in results.items():
+        base = result.get("baseline")
+        base_text = f"{base * 1000:12.3f}" if base is not None else f"{'-':>12}"
+        ratio = f"{result['ratio']:8.2f}" if "ratio" in result else f"{'-':>8}"
+        mark = "  REGRESSION" if result.get("regression") else ""
+        print(f"{name:<42}{result['median'] * 1000:12.3f}{base_text}{ratio}{mark}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Core hot path benchmark suite")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=200, help="steps per file")
+    parser.add_argument("--depth", type=int, default=3, help="runFlow chain depth")
+    parser.add_argument(
+        "--unsupported", type=float, default=0.2, help="share of unsupported steps"
+    )
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--no-gui", action="store_true", help="skip the Qt cases")
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="store results as the baseline"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%"
+    )
+    parser.add_argument(
+        "--floor-ms", type=float, default=0.05, help="ignore smaller slowdowns"
+    )
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as project:
+        tests = generate_project(
+            project, args.files, args.steps, args.depth, args.unsupported
+        )
+        cases = core_cases(project, tests)
+        if not args.no_gui:
+            cases += gui_cases(project, tests)
+        for case in cases:
+            results[case.name] = measure(case, args.repeat)
+
+    regressions = []
+    baseline = None if args.save_baseline else load_baseline(args.baseline)
+    if baseline:
+        env = environment(args)
+        stored = baseline.get("environment", {})
+        if any(stored.get(key) != env[key] for key in WORKLOAD):
+            print("baseline was recorded on a different workload", file=sys.stderr)
+        regressions = compare(
+            results, baseline.get("results", {}), args.tolerance, args.floor_ms / 1000
+        )
+    print_table(results)
+
+    report = {"environment": environment(args), "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+    elif baseline is None:
+        print(f"no baseline at {args.baseline}, run with --save-baseline")
+
+    if regressions:
+        print(f"{len(regressions)} regressions", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+import argparse
+import random
+import time
+
+import yaml
+
+from core import yaml_backend
+from core.step import MaestroStep
+from core.yaml_service import flow_to_yaml, parse_flow
+
+
+def synthetic_steps(count, seed=0):
+    rnd = random.Random(seed)
+    steps = []
+    for i in range(count):
+        kind = rnd.randrange(8)
+        if kind == 0:
+            steps.append(MaestroStep("tapOn", params={"id": f"button_{i}"}))
+        elif kind == 1:
+            steps.append(MaestroStep("tapOn", params={"point": f"{i % 100}%,50%"}))
+        elif kind == 2:
+            steps.append(
+                MaestroStep(
+                    "inputText", params={"id": f"field_{i}", "text": f"ввод {i}"}
+                )
+            )
+        elif kind == 3:
+            text = f"Экран {i} ✅" if i % 50 else f"Экран {i} 😀\tготово"
+            steps.append(MaestroStep("assertVisible", params={"text": text}))
+        elif kind == 4:
+            steps.append(MaestroStep("back"))
+        elif kind == 5:
+            steps.append(
+                MaestroStep("runFlow", params={"file": f"common/flow_{i}.yaml"})
+            )
+        elif kind == 6:
+            raw = {"swipe": {"direction": rnd.choice(["UP", "DOWN"]), "duration": 400}}
+            steps.append(MaestroStep.from_dict(raw))
+        else:
+            raw = {
+                "extendedWaitUntil": {
+                    "visible": {"id": f"spinner_{i}"},
+                    "timeout": 10000,
+                }
+            }
+            steps.append(MaestroStep.from_dict(raw))
+    return steps
+
+
+def legacy_dump(app_id, steps):
+    # формат до появления yaml_backend: yaml.dump с Dumper по умолчанию
+    text = ""
+    if app_id:
+        text = yaml.dump({"appId": app_id}, sort_keys=False, allow_unicode=True)
+        text += "---\n"
+    step_list = [step.to_dict() for step in steps]
+    return text + yaml.dump(step_list, sort_keys=False, allow_unicode=True)
+
+
+def best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="YAML backend benchmark")
+    parser.add_argument("--steps", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    app_id = "com.example.app"
+    steps = synthetic_steps(args.steps)
+    expected = legacy_dump(app_id, steps)
+
+    backends = [("pure", yaml_backend.PURE_LOADER, yaml_backend.PURE_DUMPER)]
+    if yaml_backend.LIBYAML:
+        backends.append(("libyaml", yaml.CSafeLoader, yaml.CSafeDumper))
+    else:
+        print("libyaml is not available, only the pure backend is measured")
+
+    print(f"{args.steps} steps, {len(expected.encode('utf-8'))} bytes")
+    print(f"{'backend':<10}{'dump, s':>10}{'load, s':>10}  identical")
+    for name, loader, dumper in backends:
+        text = flow_to_yaml(app_id, steps, dumper=dumper)
+        identical = text == expected
+        loaded_app_id, loaded = parse_flow(text, loader=loader)
+        identical = identical and loaded_app_id == app_id
+        identical = identical and [s.to_dict() for s in loaded] == [
+            s.to_dict() for s in steps
+        ]
+
+        dump_time = best_of(args.repeat, lambda: flow_to_yaml(app_id, steps, dumper))
+        load_time = best_of(args.repeat, lambda: parse_flow(text, loader=loader))
+        print(f"{name:<10}{dump_time:>10.3f}{load_time:>10.3f}  {identical}")
+
+
+if __name__ == "__main__":
+    main()
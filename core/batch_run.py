@@ -0,0 +1,175 @@
+import os
+import re
+import threading
+import time
+
+from core import yaml_backend
+from core.step_profiler import FLOW_LINE, StepProfiler
+
+# итог потока в выводе maestro при запуске нескольких файлов:
+# "[Passed] login (12s)", "[Failed] checkout (5s) (Element not found)"
+SUMMARY_LINE = re.compile(
+    r"^\s*\[(?P<status>Passed|Failed|Skipped)\]\s+(?P<name>.+?)"
+    r"(?:\s+\((?P<time>[^()]*)\).*)?\s*$"
+)
+
+
+def flow_name(path):
+    # maestro называет поток по name из заголовка, иначе по имени файла;
+    # читаем только первый документ
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for index, value, is_item in yaml_backend.iter_items(f):
+                if index == 0 and not is_item and isinstance(value, dict):
+                    if value.get("name"):
+                        return str(value["name"])
+                break
+    except Exception:
+        pass
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+class BatchFlow:
+    def __init__(self, job, listener, log_dir):
+        self.job = job
+        self.listener = listener
+        self.profiler = None
+        self.log = None
+        self.started = None
+        self.stopped = None
+        self.finished = False
+        # результат отдан слушателю; job к этому времени мог уйти на повтор
+        self.reported = False
+        if log_dir:
+            job.log_path = os.path.join(log_dir, job.log_name())
+
+    def start(self, device):
+        self.started = time.monotonic()
+        self.job.device = device
+        self.job.running = True
+        self.profiler = StepProfiler(
+            on_step=lambda timing: self.listener.job_step(self.job, timing)
+        )
+        if self.job.log_path:
+            self.log = open(self.job.log_path, "w", encoding="utf-8")
+        self.listener.job_started(self.job)
+
+    def write(self, line):
+        self.profiler.feed(line)
+        if self.log:
+            self.log.write(line.rstrip("\n") + "\n")
+
+    def stop(self):
+        # итоги maestro печатает в конце; время потока — до начала следующего
+        if self.stopped is None:
+            self.stopped = time.monotonic()
+
+    def close(self, returncode):
+        self.finished = True
+        self.job.running = False
+        self.job.returncode = returncode
+        if self.profiler:
+            self.profiler.finish()
+            self.job.steps = self.profiler.steps
+        if self.started is not None:
+            self.stop()
+            self.job.duration = self.stopped - self.started
+        if self.log:
+            self.log.close()
+            self.log = None
+
+
+class BatchProfiler:
+    # разбирает общий вывод одного "maestro test a.yaml b.yaml ..." на потоки:
+    # строки после "> Flow X" относятся к X, "[Passed] X" / "[Failed] X" —
+    # его результат. Вызывается построчно из потока чтения, как StepProfiler
+    def __init__(self, jobs, device=None, listener=None, log_dir=None):
+        self.device = device
+        self.listener = listener
+        self.flows = {}
+        for job in jobs:
+            self.flows[flow_name(job.yaml_path)] = BatchFlow(job, listener, log_dir)
+        self.current = None
+        self.lock = threading.Lock()
+        self.pending = {}  # job -> строки для listener.job_log
+
+    @staticmethod
+    def distinct(jobs):
+        # потоки с одинаковым именем в общем выводе не различить
+        names = set()
+        for job in jobs:
+            name = flow_name(job.yaml_path)
+            if name in names:
+                return False
+            names.add(name)
+        return True
+
+    def feed(self, line):
+        if "Flow" in line:
+            match = FLOW_LINE.match(line)
+            if match:
+                flow = self.flows.get(match.group("name"))
+                if flow is not None and flow.started is None:
+                    if self.current is not None:
+                        self.current.stop()
+                    flow.start(self.device)
+                    self.current = flow
+                    self.write(flow, line)
+                    return
+
+        if "[" in line:
+            match = SUMMARY_LINE.match(line)
+            flow = self.flows.get(match.group("name")) if match else None
+            if flow is not None and not flow.finished:
+                if flow.started is None:
+                    flow.start(self.device)
+                self.write(flow, line)
+                status = match.group("status")
+                if status == "Skipped":
+                    # не запускался — пусть пройдёт отдельным запуском
+                    flow.close(None)
+                else:
+                    self.finish_flow(flow, 0 if status == "Passed" else 1)
+                if flow is self.current:
+                    self.current = None
+                return
+
+        if self.current is not None:
+            self.write(self.current, line)
+
+    def write(self, flow, line):
+        flow.write(line)
+        with self.lock:
+            self.pending.setdefault(flow.job, []).append(line.rstrip())
+
+    def flush(self):
+        # вызывается пачками из FlowRun.on_lines, а не на каждую строку
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        for job, lines in pending.items():
+            self.listener.job_log(job, lines)
+
+    def finish_flow(self, flow, returncode):
+        flow.close(returncode)
+        self.flush()
+        flow.reported = True
+        self.listener.job_finished(flow.job)
+
+    def finish(self):
+        pass
+
+    def complete(self, returncode):
+        # без итоговой строки: при коде 0 начатый поток считаем пройденным,
+        # иначе результат неизвестен и тест перезапускается отдельно
+        self.flush()
+        unknown = []
+        for flow in self.flows.values():
+            if flow.reported:
+                continue
+            if flow.started is not None and not flow.finished:
+                if returncode == 0:
+                    self.finish_flow(flow, 0)
+                    continue
+                flow.close(None)
+            unknown.append(flow.job)
+        return unknown
@@ -0,0 +1,489 @@
+import argparse
+import os
+import sys
+
+from core.project_index import scan_tests
+
+# модули команд импортируются внутри cmd_*: каждая команда платит только за
+# то, чем пользуется, а PyQt5 здесь не импортируется вовсе
+
+
+def tests_dir_for(args):
+    return os.path.abspath(args.tests_dir or os.path.join(args.project, "tests"))
+
+
+def read_paths(values):
+    # "-" — список файлов из stdin, например из git diff --name-only
+    paths = []
+    for value in values:
+        if value == "-":
+            paths.extend(line.strip() for line in sys.stdin if line.strip())
+        else:
+            paths.append(value)
+    return paths
+
+
+def to_test_path(path, tests_dir):
+    rel_path = os.path.relpath(os.path.abspath(path), tests_dir)
+    if rel_path.startswith(os.pardir + os.sep) or rel_path == os.pardir:
+        return None
+    return rel_path
+
+
+def select_tests(args, tests_dir):
+    if not args.tests:
+        tests = sorted(scan_tests(tests_dir))
+        if getattr(args, "top_level", False):
+            from core.flow_graph import FlowGraph
+
+            graph = FlowGraph(tests_dir)
+            graph.sync()
+            tests = graph.top_level_tests()
+        return tests
+
+    tests = []
+    for path in read_paths(args.tests):
+        rel_path = to_test_path(path, tests_dir)
+        if rel_path is None or not os.path.isfile(os.path.join(tests_dir, rel_path)):
+            # имя теста относительно tests/, как в списке редактора
+            rel_path = os.path.normpath(path)
+        tests.append(rel_path)
+    return tests
+
+
+def display_path(tests_dir, test):
+    return os.path.relpath(os.path.join(tests_dir, test))
+
+
+def report_graph_problems(graph):
+    problems = graph.problems()
+    for message in problems:
+        print(message, file=sys.stderr)
+    return len(problems)
+
+
+def cmd_list(args):
+    tests_dir = tests_dir_for(args)
+    for test in select_tests(args, tests_dir):
+        print(display_path(tests_dir, test))
+    return 0
+
+
+def cmd_impacted(args):
+    from core.flow_graph import FlowGraph
+
+    tests_dir = tests_dir_for(args)
+    graph = FlowGraph(tests_dir)
+    graph.sync()
+
+    changed = []
+    for path in read_paths(args.changed):
+        rel_path = to_test_path(path, tests_dir)
+        if rel_path is not None:
+            changed.append(rel_path)
+
+    for test in graph.impacted(changed):
+        print(display_path(tests_dir, test))
+
+    return 1 if report_graph_problems(graph) else 0
+
+
+def cmd_graph(args):
+    from core.flow_graph import FlowGraph
+
+    tests_dir = tests_dir_for(args)
+    graph = FlowGraph(tests_dir)
+    graph.sync()
+
+    if args.dot:
+        print("digraph flows {")
+        for path in graph.flows():
+            print(f'  "{path}";')
+            for target in sorted(graph.edges[path]):
+                print(f'  "{path}" -> "{target}";')
+        print("}")
+    else:
+        for path in graph.flows():
+            for target in sorted(graph.edges[path]):
+                print(f"{path} -> {target}")
+
+    return 1 if report_graph_problems(graph) else 0
+
+
+def cmd_validate(args):
+    from core.validator import ProjectValidator
+
+    validator = ProjectValidator(args.project, tests_dir_for(args), args.jobs)
+    errors = validator.validate()
+    for error in errors:
+        print(error)
+    print(
+        f"{len(validator.results)} files, {validator.revalidated} revalidated, "
+        f"{len(errors)} errors",
+        file=sys.stderr,
+    )
+    return 1 if errors else 0
+
+
+def format_flow(path):
+    # возвращает отформатированный текст или None, если формат редактора
+    # потерял бы данные (например, шаги без документа appId)
+    from core import yaml_backend
+    from core.yaml_service import flow_to_yaml, parse_flow
+
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    app_id, steps = parse_flow(text)
+    formatted = flow_to_yaml(app_id, steps)
+    if yaml_backend.load_all(formatted) != yaml_backend.load_all(text):
+        return None
+    return text, formatted
+
+
+def cmd_format(args):
+    from core.files import atomic_write
+
+    tests_dir = tests_dir_for(args)
+    changed = 0
+    failed = 0
+    for test in select_tests(args, tests_dir):
+        path = os.path.join(tests_dir, test)
+        try:
+            result = format_flow(path)
+        except Exception as e:
+            print(f"{test}: {' '.join(str(e).split())}", file=sys.stderr)
+            failed += 1
+            continue
+        if result is None:
+            print(f"{test}: not in editor format, skipped", file=sys.stderr)
+            failed += 1
+            continue
+
+        text, formatted = result
+        if text == formatted:
+            continue
+        changed += 1
+        print(display_path(tests_dir, test))
+        if not args.check:
+            atomic_write(path, formatted.encode("utf-8"))
+
+    if failed or (args.check and changed):
+        return 1
+    return 0
+
+
+def cmd_compile(args):
+    from core.flow_compiler import CompileError, FlowCompiler
+
+    tests_dir = tests_dir_for(args)
+    compiler = FlowCompiler(args.project, tests_dir)
+    failed = 0
+    for test in select_tests(args, tests_dir):
+        try:
+            compiled = compiler.compile(os.path.join(tests_dir, test))
+        except (CompileError, OSError) as e:
+            print(f"{test}: {e}", file=sys.stderr)
+            failed += 1
+            continue
+        state = "cached" if compiled.cached else f"{len(compiled.files)} files"
+        print(f"{display_path(tests_dir, test)}\t{compiled.path}\t{state}")
+    return 1 if failed else 0
+
+
+def cmd_usages(args):
+    from core.selector_index import SelectorIndex
+
+    tests_dir = tests_dir_for(args)
+    index = SelectorIndex(tests_dir)
+    index.sync()
+    usages = index.usages(args.kind, args.value)
+    for path, step_index in usages:
+        step = "header" if step_index is None else f"step {step_index + 1}"
+        print(f"{display_path(tests_dir, path)}: {step}")
+    return 0 if usages else 1
+
+
+def cmd_rename(args):
+    from core.selector_index import SelectorIndex, apply_changes
+
+    tests_dir = tests_dir_for(args)
+    index = SelectorIndex(tests_dir, args.jobs)
+    index.sync()
+    changes = index.plan_rename(args.kind, args.old, args.new)
+    if not args.apply:
+        # по умолчанию — только diff
+        for change in changes:
+            sys.stdout.write(change.diff(tests_dir))
+        print(f"{len(changes)} files would change", file=sys.stderr)
+        return 0
+
+    written, conflicts = apply_changes(changes)
+    for path in conflicts:
+        print(
+            f"{display_path(tests_dir, path)}: changed since dry run, skipped",
+            file=sys.stderr,
+        )
+    print(f"{len(written)} files rewritten", file=sys.stderr)
+    return 1 if conflicts else 0
+
+
+def cmd_run(args):
+    import signal
+    import threading
+
+    from core.config import load_config, run_devices, run_limits
+    from core.matrix import MatrixError, env_label, make_job, matrix_jobs
+    from core.matrix import matrix_table, parse_env
+    from core.paths import new_run_log_dir
+    from core.run_queue import DurationHistory, RunListener, RunPool
+    from core.run_report import LastRun, job_status, write_junit
+
+    class PrintListener(RunListener):
+        def __init__(self):
+            self.lock = threading.Lock()
+
+        def write(self, text):
+            with self.lock:
+                print(text, flush=True)
+
+        def job_started(self, job):
+            device = f" on {job.device}" if job.device else ""
+            self.write(f"▶ {job.test_name}{device}")
+
+        def job_log(self, job, lines):
+            prefix = f"[{job.test_name}] "
+            self.write("\n".join(prefix + line for line in lines))
+
+        def job_retry(self, job):
+            attempt = job.attempts[-1]
+            self.write(
+                f"↻ {job.test_name} failed (code {attempt.returncode}), "
+                f"retry {len(job.attempts)}"
+            )
+
+        def job_finished(self, job):
+            if job.flaky:
+                status = f"⚠️ flaky, attempt {len(job.attempts) + 1}"
+            elif job.passed:
+                status = "✅"
+            elif job.stop_reason:
+                status = f"⏹ {job.stop_reason}"
+            else:
+                status = f"❌ code {job.returncode}"
+            usage = ""
+            if job.cpu_time is not None:
+                usage = f", CPU {job.cpu_time:.1f}s, RSS {job.peak_rss / 2**20:.0f} MiB"
+            self.write(f"{status} {job.test_name} ({job.duration:.1f}s{usage})")
+
+    tests_dir = tests_dir_for(args)
+    config = load_config(args.project)
+    if args.device:
+        devices = args.device
+    elif args.workers:
+        devices = [None] * args.workers
+    else:
+        devices = run_devices(config)
+
+    last_run = LastRun(args.project)
+    try:
+        env = parse_env(args.env)
+        if args.failed:
+            # только упавшие и остановленные в прошлый раз тесты и ячейки матриц
+            jobs = last_run.failed_jobs(tests_dir)
+        elif args.matrix:
+            jobs = matrix_jobs(config, tests_dir, select_tests(args, tests_dir), env)
+        else:
+            tests = select_tests(args, tests_dir)
+            jobs = [make_job(tests_dir, test, env) for test in tests]
+    except MatrixError as e:
+        print(e, file=sys.stderr)
+        return 2
+    batch_size = args.batch or config.get("batch_size", 1)
+    timeout, idle_timeout = run_limits(config)
+    pool = RunPool(
+        devices,
+        history=DurationHistory(args.project),
+        log_dir=new_run_log_dir(args.project),
+        listener=PrintListener(),
+        batch_size=batch_size,
+        timeout=args.timeout or timeout,
+        idle_timeout=args.idle_timeout or idle_timeout,
+        retries=config.get("retries", 0) if args.retries is None else args.retries,
+    )
+    interrupted = False
+    try:
+        pool.run(jobs)
+    except KeyboardInterrupt:
+        interrupted = True
+        print("interrupted, maestro processes stopped", file=sys.stderr)
+
+    last_run.record(jobs)
+    last_run.save()
+    if args.junit:
+        write_junit(args.junit, jobs)
+    if interrupted:
+        # 128 + номер сигнала, как у оболочки: 130 для Ctrl+C, 143 для SIGTERM
+        return 128 + (pool.stop_signal or signal.SIGINT)
+
+    if args.matrix:
+        tests, labels, cells = matrix_table(jobs)
+        for test in tests:
+            runs = [cells[(label, test)] for label in labels if (label, test) in cells]
+            broken = [job for job in runs if not job.passed]
+            print(
+                f"{test}: {len(runs) - len(broken)}/{len(runs)} passed", file=sys.stderr
+            )
+            for job in broken:
+                label = env_label(job.env)
+                print(f"  {job_status(job)} {label}".rstrip(), file=sys.stderr)
+
+    failed = [job for job in jobs if not job.passed]
+    flaky = [job for job in jobs if job.flaky]
+    print(
+        f"{len(jobs) - len(failed)} passed ({len(flaky)} flaky), "
+        f"{len(failed)} failed",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--project", default=".", help="Maestro project directory")
+    common.add_argument("--tests-dir", help="tests directory (default: PROJECT/tests)")
+
+    parser = argparse.ArgumentParser(prog="main.py")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    listing = commands.add_parser("list", parents=[common], help="list tests")
+    listing.add_argument("tests", nargs="*", help="tests to list (default: all)")
+    listing.add_argument(
+        "--top-level", action="store_true", help="only flows not called via runFlow"
+    )
+    listing.set_defaults(func=cmd_list)
+
+    impacted = commands.add_parser(
+        "impacted",
+        parents=[common],
+        help="print top-level tests affected by changed files",
+    )
+    impacted.add_argument(
+        "changed", nargs="*", default=["-"], help="changed files, '-' for stdin"
+    )
+    impacted.set_defaults(func=cmd_impacted)
+
+    graph = commands.add_parser(
+        "graph", parents=[common], help="print the runFlow dependency graph"
+    )
+    graph.add_argument("--dot", action="store_true", help="Graphviz output")
+    graph.set_defaults(func=cmd_graph)
+
+    validate = commands.add_parser(
+        "validate", parents=[common], help="validate every flow in the project"
+    )
+    validate.add_argument("-j", "--jobs", type=int, help="worker processes")
+    validate.set_defaults(func=cmd_validate)
+
+    formatting = commands.add_parser(
+        "format", parents=[common], help="rewrite flows in the editor's YAML format"
+    )
+    formatting.add_argument("tests", nargs="*", help="tests to format (default: all)")
+    formatting.add_argument(
+        "--check", action="store_true", help="only report files that would change"
+    )
+    formatting.set_defaults(func=cmd_format)
+
+    compiling = commands.add_parser(
+        "compile",
+        parents=[common],
+        help="inline runFlow chains into one cached flow file per test",
+    )
+    compiling.add_argument("tests", nargs="*", help="tests to compile (default: all)")
+    compiling.add_argument(
+        "--top-level", action="store_true", help="only flows not called via runFlow"
+    )
+    compiling.set_defaults(func=cmd_compile)
+
+    kinds = ("id", "text", "point", "appId")
+    usages = commands.add_parser(
+        "usages", parents=[common], help="find steps that use a selector value"
+    )
+    usages.add_argument("value")
+    usages.add_argument("-k", "--kind", choices=kinds, default="id")
+    usages.set_defaults(func=cmd_usages)
+
+    rename = commands.add_parser(
+        "rename",
+        parents=[common],
+        help="rename a selector value in every flow (diff only without --apply)",
+    )
+    rename.add_argument("old")
+    rename.add_argument("new")
+    rename.add_argument("-k", "--kind", choices=kinds, default="id")
+    rename.add_argument("--apply", action="store_true", help="rewrite the files")
+    rename.add_argument("-j", "--jobs", type=int, help="worker processes")
+    rename.set_defaults(func=cmd_rename)
+
+    run = commands.add_parser("run", parents=[common], help="run tests with maestro")
+    run.add_argument("tests", nargs="*", help="tests to run (default: all)")
+    run.add_argument(
+        "--top-level", action="store_true", help="only flows not called via runFlow"
+    )
+    run.add_argument(
+        "-d", "--device", action="append", help="device id, one worker per device"
+    )
+    run.add_argument("-w", "--workers", type=int, help="workers on the default device")
+    run.add_argument(
+        "-b", "--batch", type=int, help="tests per maestro invocation (default: 1)"
+    )
+    run.add_argument(
+        "--failed",
+        action="store_true",
+        help="only tests that failed or were stopped in their last run",
+    )
+    run.add_argument(
+        "-m",
+        "--matrix",
+        action="store_true",
+        help="one run per matrix cell from config.yaml",
+    )
+    run.add_argument(
+        "-e",
+        "--env",
+        action="append",
+        metavar="KEY=VALUE",
+        help="flow parameter passed to maestro test -e",
+    )
+    run.add_argument(
+        "--retries", type=int, help="retries of a failed test (default: config)"
+    )
+    run.add_argument("--junit", help="write a JUnit XML report to this file")
+    run.add_argument(
+        "--timeout", type=float, help="seconds per run before maestro is killed"
+    )
+    run.add_argument(
+        "--idle-timeout", type=float, help="seconds without maestro output allowed"
+    )
+    run.set_defaults(func=cmd_run)
+
+    return parser
+
+
+COMMANDS = (
+    "list",
+    "impacted",
+    "graph",
+    "validate",
+    "format",
+    "compile",
+    "usages",
+    "rename",
+    "run",
+    "-h",
+    "--help",
+)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
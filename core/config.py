@@ -0,0 +1,30 @@
+import os
+
+from core import yaml_backend
+
+
+def load_config(project_dir):
+    config_path = os.path.join(project_dir, "config.yaml")
+    if not os.path.exists(config_path):
+        return {}
+    with open(config_path, "r", encoding="utf-8") as f:
+        return yaml_backend.load(f) or {}
+
+
+def run_devices(config):
+    # config.yaml: devices: [emulator-5554, ...] или workers: N
+    devices = config.get("devices")
+    if devices:
+        return [str(device) for device in devices]
+    workers = int(config.get("workers", 1) or 1)
+    return [None] * max(workers, 1)
+
+
+def run_limits(config):
+    # config.yaml: run_timeout — секунд на прогон, idle_timeout — секунд без
+    # вывода maestro; 0 или нет ключа — без ограничения
+    def seconds(key):
+        value = float(config.get(key) or 0)
+        return value if value > 0 else None
+
+    return seconds("run_timeout"), seconds("idle_timeout")
@@ -0,0 +1,70 @@
+import os
+import tempfile
+
+
+def read_umask():
+    # os.umask меняет маску всего процесса: читаем один раз при импорте, пока
+    # нет других потоков, иначе их файлы на миг создавались бы с маской 0
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+UMASK = read_umask()
+
+
+def atomic_write(path, data):
+    # пишем во временный файл рядом и подменяем: при падении на диске
+    # остаётся либо старая, либо новая версия, но не обрезанная
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        prefix="." + os.path.basename(path) + ".", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o666 & ~UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    fsync_dir(directory)
+
+
+def fsync_dir(directory):
+    # переименование становится надёжным только после fsync каталога
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def same_content(path, data):
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as f:
+            on_disk = f.read()
+    except OSError:
+        return False
+    return on_disk == data
+
+
+def write_if_changed(path, data):
+    # неизменённый файл не трогаем: mtime остаётся прежним, наблюдатели и
+    # CI не видят лишних изменений. Возвращает True, если файл записан
+    if same_content(path, data):
+        return False
+    atomic_write(path, data)
+    return True
@@ -0,0 +1,139 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+# разобранный поток в памяти примерно в 16 раз больше исходного YAML
+PARSED_SIZE_FACTOR = 16
+
+
+def content_digest(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+class CachedFlow:
+    def __init__(self, digest, app_id, steps, cost):
+        self.digest = digest
+        self.app_id = app_id
+        self.steps = steps
+        self.cost = cost
+
+
+class FlowCache:
+    def __init__(self, parser, max_bytes=64 * 1024 * 1024):
+        self.parser = parser
+        self.max_bytes = max_bytes
+        self.flows = OrderedDict()  # digest -> CachedFlow, порядок LRU
+        self.files = {}  # path -> (mtime_ns, size, digest)
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # кэшем пользуются UI и потоки фоновой загрузки
+        self.lock = threading.Lock()
+
+    def load(self, path, copy=True):
+        stat = os.stat(path)
+        flow = self.find(path, stat)
+        if flow is None:
+            with open(path, "rb") as f:
+                data = f.read()
+            flow = self.lookup(data)
+            self.remember(path, stat, flow)
+        return self.result(flow, copy)
+
+    def parse(self, text, copy=True):
+        return self.result(self.lookup(text.encode("utf-8")), copy)
+
+    def lookup(self, data):
+        # файл мог поменять mtime без изменения содержимого — ищем по хэшу
+        digest = content_digest(data)
+        flow = self.find_digest(digest)
+        if flow is None:
+            app_id, steps = self.parser(data.decode("utf-8"))
+            flow = self.add(digest, app_id, steps, len(data))
+        return flow
+
+    def find(self, path, stat):
+        with self.lock:
+            identity = self.files.get(path)
+            if not identity or identity[:2] != (stat.st_mtime_ns, stat.st_size):
+                return None
+        return self.find_digest(identity[2])
+
+    def find_digest(self, digest):
+        with self.lock:
+            flow = self.flows.get(digest)
+            if flow is not None:
+                self.hits += 1
+                self.flows.move_to_end(digest)
+            return flow
+
+    def add(self, digest, app_id, steps, size):
+        # разбор идёт вне блокировки: потоки загрузки не ждут друг друга
+        flow = CachedFlow(digest, app_id, steps, size * PARSED_SIZE_FACTOR)
+        with self.lock:
+            self.misses += 1
+            previous = self.flows.pop(digest, None)
+            if previous is not None:
+                self.used_bytes -= previous.cost
+            self.flows[digest] = flow
+            self.used_bytes += flow.cost
+            self.evict()
+        return flow
+
+    def remember(self, path, stat, flow):
+        with self.lock:
+            previous = self.files.get(path)
+            self.files[path] = (stat.st_mtime_ns, stat.st_size, flow.digest)
+            if previous and previous[2] != flow.digest:
+                self.drop_unreferenced(previous[2])
+
+    def drop_unreferenced(self, digest):
+        # прошлая версия изменённого файла: с диска её уже не прочитать, и
+        # в длинной сессии правок такие версии копились бы до предела бюджета
+        if any(identity[2] == digest for identity in self.files.values()):
+            return
+        flow = self.flows.pop(digest, None)
+        if flow is not None:
+            self.used_bytes -= flow.cost
+
+    def evict(self):
+        # последний добавленный поток оставляем, даже если он больше бюджета
+        while self.used_bytes > self.max_bytes and len(self.flows) > 1:
+            _, flow = self.flows.popitem(last=False)
+            self.used_bytes -= flow.cost
+            self.evictions += 1
+        if len(self.files) > 2 * len(self.flows):
+            self.files = {
+                path: identity
+                for path, identity in self.files.items()
+                if identity[2] in self.flows
+            }
+
+    def invalidate(self, path):
+        with self.lock:
+            self.files.pop(path, None)
+
+    def clear(self):
+        with self.lock:
+            self.flows.clear()
+            self.files.clear()
+            self.used_bytes = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "flows": len(self.flows),
+            "used_bytes": self.used_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    @staticmethod
+    def result(flow, copy):
+        # редакторы меняют params на месте, поэтому наружу отдаём копии
+        if copy:
+            return flow.app_id, [step.copy() for step in flow.steps]
+        return flow.app_id, flow.steps
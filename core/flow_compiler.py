@@ -0,0 +1,242 @@
+import json
+import os
+import threading
+
+from core import yaml_backend
+from core.files import atomic_write
+from core.flow_cache import content_digest
+from core.flow_graph import resolve_flow_path
+from core.paths import state_dir
+
+# меняется вместе с форматом скомпилированного потока — старый кэш не подходит
+COMPILER_VERSION = 1
+
+# подпоток с другими ключами заголовка (onFlowStart, onFlowComplete, ...)
+# встроить без потери смысла нельзя — он остаётся ссылкой на файл
+INLINE_HEADER_KEYS = {"appId", "env", "name", "tags"}
+FLOW_HOOKS = ("onFlowStart", "onFlowComplete")
+
+
+class CompileError(Exception):
+    pass
+
+
+class CompiledFlow:
+    def __init__(self, path, key, files, cached):
+        self.path = path
+        self.key = key
+        self.files = files  # абсолютный путь -> хэш содержимого
+        self.cached = cached
+
+
+class FlowCompiler:
+    DIR_NAME = "compiled"
+    MANIFEST = "manifest.json"
+
+    def __init__(self, project_dir, tests_dir):
+        self.tests_dir = tests_dir
+        self.dir = os.path.join(state_dir(project_dir), self.DIR_NAME)
+        os.makedirs(self.dir, exist_ok=True)
+        self.manifest_path = os.path.join(self.dir, self.MANIFEST)
+        self.manifest = self.load_manifest()
+        self.lock = threading.Lock()
+
+    def compile(self, path):
+        # один плоский файл на прогон: цепочки runFlow встроены, кэш — по
+        # хэшам всех файлов, из которых собран результат
+        root = os.path.abspath(path)
+        with self.lock:
+            entry = self.manifest.get(root)
+            if entry and self.up_to_date(entry):
+                return CompiledFlow(
+                    self.artifact_path(entry["key"]), entry["key"], entry["files"], True
+                )
+
+            files = {}
+            documents = self.build(root, files)
+            key = content_digest(
+                json.dumps([COMPILER_VERSION, root, sorted(files.items())]).encode()
+            )
+            artifact = self.artifact_path(key)
+            if not os.path.exists(artifact):
+                text = yaml_backend.dump_all(documents)
+                atomic_write(artifact, text.encode("utf-8"))
+
+            previous = entry["key"] if entry else None
+            self.manifest[root] = {"key": key, "files": files}
+            self.save_manifest()
+            if previous and previous != key:
+                self.remove_artifact(previous)
+            return CompiledFlow(artifact, key, files, False)
+
+    def artifact_path(self, key):
+        return os.path.join(self.dir, key + ".yaml")
+
+    def up_to_date(self, entry):
+        if not os.path.exists(self.artifact_path(entry["key"])):
+            return False
+        for path, digest in entry["files"].items():
+            try:
+                with open(path, "rb") as f:
+                    if content_digest(f.read()) != digest:
+                        return False
+            except OSError:
+                return False
+        return True
+
+    def build(self, root, files):
+        header, commands = self.read(root, files)
+        app_id = header.get("appId") if header else None
+        commands = self.expand(commands, root, app_id, files, [root])
+        if header is None:
+            return [commands]
+
+        header = dict(header)
+        for hook in FLOW_HOOKS:
+            if isinstance(header.get(hook), list):
+                header[hook] = self.expand(header[hook], root, app_id, files, [root])
+        return [header, commands]
+
+    def read(self, path, files):
+        with open(path, "rb") as f:
+            data = f.read()
+        files[path] = content_digest(data)
+        try:
+            documents = yaml_backend.load_all(data.decode("utf-8"))
+        except Exception as e:
+            raise CompileError(f"{self.display(path)}: {' '.join(str(e).split())}")
+
+        # первый документ — заголовок, остальные — шаги; файл из одного
+        # списка — шаги без заголовка
+        header = None
+        if documents and isinstance(documents[0], dict):
+            header = documents[0]
+            documents = documents[1:]
+        elif len(documents) > 1:
+            documents = documents[1:]
+        commands = []
+        for document in documents:
+            if isinstance(document, list):
+                commands.extend(document)
+            elif document is not None:
+                commands.append(document)
+        return header, commands
+
+    def expand(self, commands, path, app_id, files, stack):
+        return [
+            self.expand_command(command, path, app_id, files, stack)
+            for command in commands
+        ]
+
+    def expand_command(self, command, path, app_id, files, stack):
+        # шаги переносятся как есть; меняются только ссылки на файлы, потому
+        # что скомпилированный поток лежит в другом каталоге
+        if not isinstance(command, dict) or len(command) != 1:
+            return command
+        ((name, value),) = command.items()
+
+        if name == "runFlow":
+            return {"runFlow": self.expand_run_flow(value, path, app_id, files, stack)}
+        if name == "runScript":
+            if isinstance(value, str):
+                return {name: self.absolute(value, path)}
+            if isinstance(value, dict) and isinstance(value.get("file"), str):
+                return {name: {**value, "file": self.absolute(value["file"], path)}}
+        if name == "addMedia" and isinstance(value, list):
+            return {
+                name: [
+                    self.absolute(item, path) if isinstance(item, str) else item
+                    for item in value
+                ]
+            }
+        if isinstance(value, dict) and isinstance(value.get("commands"), list):
+            # repeat, retry и прочие блоки со вложенными командами
+            commands = self.expand(value["commands"], path, app_id, files, stack)
+            return {name: {**value, "commands": commands}}
+        return command
+
+    def expand_run_flow(self, value, path, app_id, files, stack):
+        if isinstance(value, str):
+            options = {"file": value}
+        elif isinstance(value, dict):
+            options = dict(value)
+        else:
+            return value
+
+        if isinstance(options.get("commands"), list):
+            options["commands"] = self.expand(
+                options["commands"], path, app_id, files, stack
+            )
+            return options
+
+        ref = options.get("file")
+        if not isinstance(ref, str) or "${" in ref:
+            # путь из переменной окружения статически не разрешить
+            return value
+
+        target = resolve_flow_path(ref, path, self.tests_dir)
+        if not os.path.isfile(target):
+            raise CompileError(f"{self.display(path)}: runFlow target not found: {ref}")
+        target = os.path.abspath(target)
+        if target in stack:
+            chain = " -> ".join(self.display(p) for p in stack + [target])
+            raise CompileError(f"runFlow cycle: {chain}")
+
+        header, commands = self.read(target, files)
+        sub_app_id = header.get("appId") if header else None
+        commands = self.expand(
+            commands, target, sub_app_id or app_id, files, stack + [target]
+        )
+
+        if not self.inlineable(header, app_id):
+            # вложенные файлы всё равно прочитаны — их хэши входят в ключ кэша
+            options["file"] = target
+            return options
+
+        env = dict((header or {}).get("env") or {})
+        env.update(options.get("env") or {})
+        del options["file"]
+        if env:
+            options["env"] = env
+        options["commands"] = commands
+        return options
+
+    @staticmethod
+    def inlineable(header, app_id):
+        if header is None:
+            return True
+        if not set(header) <= INLINE_HEADER_KEYS:
+            return False
+        # launchApp без appId в подпотоке запускает его собственное приложение
+        return header.get("appId") in (None, app_id)
+
+    def absolute(self, ref, path):
+        if "${" in ref or os.path.isabs(ref):
+            return ref
+        return os.path.abspath(resolve_flow_path(ref, path, self.tests_dir))
+
+    def display(self, path):
+        return os.path.relpath(path, self.tests_dir)
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != COMPILER_VERSION:
+            return {}
+        return data.get("flows", {})
+
+    def save_manifest(self):
+        data = {"version": COMPILER_VERSION, "flows": self.manifest}
+        atomic_write(self.manifest_path, json.dumps(data).encode("utf-8"))
+
+    def remove_artifact(self, key):
+        # тот же результат может быть нужен другому корню — проверяем
+        if any(entry["key"] == key for entry in self.manifest.values()):
+            return
+        try:
+            os.remove(self.artifact_path(key))
+        except OSError:
+            pass
@@ -0,0 +1,174 @@
+import os
+
+from core.project_index import scan_tests
+from core.yaml_service import flow_cache
+
+
+def flow_reference(step):
+    # runFlow: file.yaml или runFlow: {file: file.yaml}
+    if step.step_type != "runFlow":
+        return None
+    if step.params.get("file"):
+        return step.params["file"]
+    if step.raw is not None and isinstance(step.raw.get("runFlow"), str):
+        return step.raw["runFlow"]
+    return None
+
+
+def resolve_flow_path(ref, from_path, tests_dir, isfile=os.path.isfile):
+    # maestro ищет файл относительно вызывающего потока, редактор пишет путь
+    # относительно tests/ — принимаем оба варианта
+    candidates = [os.path.join(os.path.dirname(from_path), ref)]
+    if tests_dir:
+        candidates.append(os.path.join(tests_dir, ref))
+    for candidate in candidates:
+        if isfile(candidate):
+            return os.path.normpath(candidate)
+    return os.path.normpath(candidates[0])
+
+
+class FlowGraph:
+    def __init__(self, tests_dir):
+        self.tests_dir = tests_dir
+        self.identities = {}  # path -> (mtime, size) разобранной версии
+        self.edges = {}  # path -> {target, ...}
+        self.reverse = {}  # target -> {path, ...}
+        self.missing = {}  # path -> [ref, ...]
+
+    def sync(self, entries=None):
+        # entries: {путь: [mtime, size]} из ProjectIndex; без них — сканируем
+        if entries is None:
+            entries = scan_tests(self.tests_dir)
+        for path in list(self.identities):
+            if path not in entries:
+                self.remove_file(path)
+        for path, identity in entries.items():
+            if self.identities.get(path) != tuple(identity):
+                self.update_file(path, tuple(identity))
+
+    def update_file(self, path, identity=None):
+        full_path = os.path.join(self.tests_dir, path)
+        self.remove_file(path)
+        try:
+            if identity is None:
+                stat = os.stat(full_path)
+                identity = (stat.st_mtime, stat.st_size)
+            _, steps = flow_cache.load(full_path, copy=False)
+        except Exception:
+            # битый YAML не должен ломать граф — файл остаётся без зависимостей
+            steps = []
+        self.identities[path] = identity
+
+        targets = set()
+        for step in steps:
+            ref = flow_reference(step)
+            if not ref:
+                continue
+            target = resolve_flow_path(ref, full_path, self.tests_dir)
+            target = os.path.relpath(target, self.tests_dir)
+            targets.add(target)
+            if not os.path.isfile(os.path.join(self.tests_dir, target)):
+                self.missing.setdefault(path, []).append(ref)
+
+        self.edges[path] = targets
+        for target in targets:
+            self.reverse.setdefault(target, set()).add(path)
+
+    def remove_file(self, path):
+        self.identities.pop(path, None)
+        self.missing.pop(path, None)
+        for target in self.edges.pop(path, ()):
+            sources = self.reverse.get(target)
+            if sources:
+                sources.discard(path)
+                if not sources:
+                    del self.reverse[target]
+
+    def flows(self):
+        return sorted(self.edges)
+
+    def top_level_tests(self):
+        # тест верхнего уровня — поток, который никто не вызывает через runFlow
+        return [path for path in self.flows() if not self.reverse.get(path)]
+
+    def missing_targets(self):
+        return [
+            (path, ref) for path in sorted(self.missing) for ref in self.missing[path]
+        ]
+
+    def problems(self):
+        messages = [
+            f"{path}: runFlow target not found: {ref}"
+            for path, ref in self.missing_targets()
+        ]
+        messages += [
+            f"runFlow cycle between: {', '.join(cycle)}" for cycle in self.cycles()
+        ]
+        return messages
+
+    def dependents(self, paths):
+        seen = set()
+        stack = list(paths)
+        while stack:
+            path = stack.pop()
+            if path in seen:
+                continue
+            seen.add(path)
+            stack.extend(self.reverse.get(path, ()))
+        return seen
+
+    def impacted(self, changed_paths):
+        affected = self.dependents(changed_paths)
+        return sorted(
+            path
+            for path in affected
+            if path in self.edges and not self.reverse.get(path)
+        )
+
+    def cycles(self):
+        # Тарьян без рекурсии: компоненты сильной связности из >1 потока
+        # или поток, вызывающий сам себя
+        index = {}
+        low = {}
+        on_stack = set()
+        stack = []
+        result = []
+        counter = 0
+
+        for root in self.flows():
+            if root in index:
+                continue
+            work = [(root, iter(sorted(self.edges.get(root, ()))))]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, children = work[-1]
+                child = next(children, None)
+                if child is not None:
+                    if child not in index:
+                        index[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(sorted(self.edges.get(child, ())))))
+                    elif child in on_stack:
+                        low[node] = min(low[node], index[child])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.edges.get(node, ()):
+                        result.append(sorted(component))
+        return result
@@ -0,0 +1,143 @@
+import itertools
+import os
+import re
+
+from core.run_queue import RunJob
+
+# config.yaml:
+#   matrix:                 общая для всех тестов
+#     LOCALE: [en, de, fr]  список — ось, произведение всех осей
+#     ACCOUNT: free         одно значение — для всех ячеек
+#   test_matrix:            для отдельных тестов, перекрывает общую
+#     checkout.yaml:        или явный список наборов
+#       - {LOCALE: en, CARD: visa}
+#       - {LOCALE: de, CARD: sepa}
+#     smoke.yaml: null      без матрицы
+MATRIX_KEY = "matrix"
+TEST_MATRIX_KEY = "test_matrix"
+# защита от случайного взрыва числа прогонов
+MAX_CELLS = 500
+ENV_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+class MatrixError(Exception):
+    pass
+
+
+def env_value(value):
+    # значения уходят в maestro -e KEY=VALUE строками, как их пишут в YAML
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None or isinstance(value, (dict, list)):
+        raise MatrixError(f"matrix value must be a scalar: {value!r}")
+    return str(value)
+
+
+def check_env(env):
+    if not isinstance(env, dict):
+        raise MatrixError(f"matrix row must be a mapping: {env!r}")
+    for key in env:
+        if not isinstance(key, str) or not ENV_NAME.fullmatch(key):
+            raise MatrixError(f"bad env variable name in matrix: {key!r}")
+    return {key: env_value(value) for key, value in env.items()}
+
+
+def expand(definition):
+    # список наборов -e для одного теста
+    if isinstance(definition, list):
+        cells = [check_env(row) for row in definition]
+    elif isinstance(definition, dict):
+        check_env({key: 0 for key in definition})
+        axes = [
+            (
+                [(key, env_value(value)) for value in values]
+                if isinstance(values, list)
+                else [(key, env_value(values))]
+            )
+            for key, values in definition.items()
+        ]
+        count = 1
+        for axis in axes:
+            count *= len(axis)
+        if count > MAX_CELLS:
+            raise MatrixError(f"matrix expands to {count} runs, limit {MAX_CELLS}")
+        cells = [dict(cell) for cell in itertools.product(*axes)]
+    else:
+        raise MatrixError(f"matrix must be a mapping or a list: {definition!r}")
+    if len(cells) > MAX_CELLS:
+        raise MatrixError(f"matrix expands to {len(cells)} runs, limit {MAX_CELLS}")
+    # повторы ячеек дали бы два прогона с одним именем
+    unique = []
+    for cell in cells:
+        if cell not in unique:
+            unique.append(cell)
+    return unique
+
+
+def test_matrix(config, test_name):
+    # определение матрицы теста или None
+    per_test = config.get(TEST_MATRIX_KEY) or {}
+    if not isinstance(per_test, dict):
+        raise MatrixError(f"{TEST_MATRIX_KEY} must map test names to matrices")
+    if test_name in per_test:
+        return per_test[test_name]
+    return config.get(MATRIX_KEY)
+
+
+def env_label(env):
+    return ", ".join(f"{key}={value}" for key, value in env.items())
+
+
+def cell_name(test_name, env):
+    # имя прогона: по нему ведутся история длительностей, логи и last_run
+    return f"{test_name} [{env_label(env)}]" if env else test_name
+
+
+def make_job(tests_dir, test_name, env=None):
+    return RunJob(
+        cell_name(test_name, env),
+        os.path.join(tests_dir, test_name),
+        env=env,
+        source=test_name,
+    )
+
+
+def matrix_jobs(config, tests_dir, test_names, extra_env=None):
+    # по прогону на ячейку матрицы; тест без матрицы — один прогон.
+    # extra_env (run -e) добавляется к каждой ячейке, матрица важнее
+    jobs = []
+    for test_name in test_names:
+        definition = test_matrix(config, test_name)
+        try:
+            cells = expand(definition) if definition is not None else [{}]
+        except MatrixError as e:
+            raise MatrixError(f"{test_name}: {e}") from None
+        for cell in cells:
+            env = dict(extra_env or {})
+            env.update(cell)
+            jobs.append(make_job(tests_dir, test_name, env))
+    return jobs
+
+
+def parse_env(values):
+    # ["KEY=VALUE", ...] из командной строки
+    env = {}
+    for value in values or []:
+        key, sep, text = value.partition("=")
+        if not sep or not ENV_NAME.fullmatch(key):
+            raise MatrixError(f"expected KEY=VALUE: {value}")
+        env[key] = text
+    return env
+
+
+def matrix_table(jobs):
+    # тесты (столбцы), наборы параметров (строки) и {(набор, тест): job}
+    tests, labels, cells = [], [], {}
+    for job in jobs:
+        label = env_label(job.env)
+        if job.source not in tests:
+            tests.append(job.source)
+        if label not in labels:
+            labels.append(label)
+        cells[(label, job.source)] = job
+    return tests, labels, cells
@@ -0,0 +1,101 @@
+import gc
+import os
+import time
+import tracemalloc
+from collections import Counter
+
+# свои кадры tracemalloc и импорт модулей в отчёте только мешают
+IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<unknown>")
+
+
+def rss_bytes():
+    # текущий RSS; без /proc — пиковый из getrusage
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдаёт КиБ, macOS — байты
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+def start_tracing(frames=5):
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def stop_tracing():
+    tracemalloc.stop()
+
+
+def is_tracing():
+    return tracemalloc.is_tracing()
+
+
+class MemorySnapshot:
+    def __init__(self, snapshot, traced, peak):
+        self.snapshot = snapshot
+        self.traced = traced
+        self.peak = peak
+        self.time = time.time()
+
+
+def take_snapshot():
+    # None, если tracemalloc не запущен
+    if not tracemalloc.is_tracing():
+        return None
+    gc.collect()
+    traced, peak = tracemalloc.get_traced_memory()
+    return MemorySnapshot(tracemalloc.take_snapshot(), traced, peak)
+
+
+def top_allocators(current, previous=None, limit=15, key_type="lineno"):
+    # без previous — крупнейшие места выделения, с ним — наибольший прирост
+    if previous is not None:
+        stats = current.snapshot.compare_to(previous.snapshot, key_type)
+        rows = [
+            (stat.traceback[0], stat.size, stat.size_diff, stat.count)
+            for stat in stats
+            if stat.size_diff
+        ]
+        rows.sort(key=lambda row: abs(row[2]), reverse=True)
+    else:
+        rows = [
+            (stat.traceback[0], stat.size, None, stat.count)
+            for stat in current.snapshot.statistics(key_type)
+        ]
+    # фильтруем готовую статистику: filter_traces на каждой записи в разы дольше
+    rows = [row for row in rows if row[0].filename not in IGNORED_FILES]
+    return rows[:limit]
+
+
+def format_allocators(rows):
+    lines = []
+    for frame, size, diff, count in rows:
+        place = f"{shorten(frame.filename)}:{frame.lineno}"
+        change = "" if diff is None else f" {diff / 1024:+10.1f} KiB"
+        lines.append(f"{size / 1024:10.1f} KiB{change} {count:8d}  {place}")
+    return lines
+
+
+def shorten(path):
+    # site-packages/... и пути проекта без общего префикса
+    for marker in ("site-packages" + os.sep, os.getcwd() + os.sep):
+        index = path.find(marker)
+        if index >= 0:
+            return path[index + len(marker) :]
+    return path
+
+
+def live_counts(types):
+    # число живых объектов по классам; обход всей кучи — только для диагностики
+    counts = Counter()
+    for obj in gc.get_objects():
+        if isinstance(obj, types):
+            counts[type(obj).__name__] += 1
+    return counts
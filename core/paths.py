@@ -0,0 +1,30 @@
+import os
+import shutil
+from datetime import datetime
+
+STATE_DIR_NAME = ".maestro_editor"
+KEEP_RUN_LOGS = 20
+
+
+def state_dir(project_dir):
+    # служебные файлы редактора (история запусков, кэши) храним внутри проекта
+    path = os.path.join(project_dir, STATE_DIR_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def new_run_log_dir(project_dir):
+    # каталог логов на каждый запуск; старые запуски удаляем
+    logs_dir = os.path.join(state_dir(project_dir), "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    runs = sorted(os.listdir(logs_dir))
+    for name in runs[: max(len(runs) - KEEP_RUN_LOGS + 1, 0)]:
+        shutil.rmtree(os.path.join(logs_dir, name), ignore_errors=True)
+
+    path = os.path.join(logs_dir, datetime.now().strftime("%Y%m%d-%H%M%S-%f"))
+    os.makedirs(path)
+    return path
+
+
+def log_file_name(test_name):
+    return test_name.replace(os.sep, "_") + ".log"
@@ -0,0 +1,166 @@
+import json
+import os
+
+from core.paths import state_dir
+
+YAML_EXTENSIONS = (".yaml", ".yml")
+
+
+class IndexDelta:
+    def __init__(self, added=(), removed=(), renamed=()):
+        self.added = list(added)
+        self.removed = list(removed)
+        self.renamed = list(renamed)  # пары (старый путь, новый путь)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.renamed)
+
+
+def scan_tests(tests_dir, sub_dir=None, recursive=True):
+    # {относительный путь: [mtime, size]}
+    entries = {}
+    stack = [sub_dir or tests_dir]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                        continue
+                    if not entry.name.endswith(YAML_EXTENSIONS):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    rel_path = os.path.relpath(entry.path, tests_dir)
+                    entries[rel_path] = [stat.st_mtime, stat.st_size]
+        except OSError:
+            continue
+    return entries
+
+
+def diff_entries(old, new):
+    added = [path for path in new if path not in old]
+    removed = [path for path in old if path not in new]
+
+    # переименование: исчез один файл и появился другой с теми же mtime/size
+    renamed = []
+    if added and removed:
+        by_identity = {}
+        for path in removed:
+            by_identity.setdefault(tuple(old[path]), []).append(path)
+        still_added = []
+        for path in added:
+            candidates = by_identity.get(tuple(new[path]))
+            if candidates:
+                renamed.append((candidates.pop(), path))
+            else:
+                still_added.append(path)
+        renamed_from = {old_path for old_path, _ in renamed}
+        added = still_added
+        removed = [path for path in removed if path not in renamed_from]
+
+    return IndexDelta(sorted(added), sorted(removed), renamed)
+
+
+class ProjectIndex:
+    FILE_NAME = "index.json"
+    VERSION = 1
+
+    def __init__(self, project_dir, tests_dir):
+        self.tests_dir = tests_dir
+        self.path = os.path.join(state_dir(project_dir), self.FILE_NAME)
+        self.entries = {}
+
+    def tests(self):
+        return sorted(self.entries)
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        if (
+            data.get("version") == self.VERSION
+            and data.get("tests_dir") == self.tests_dir
+        ):
+            self.entries = data.get("files", {})
+        else:
+            self.entries = {}
+        return self.tests()
+
+    def save(self):
+        data = {
+            "version": self.VERSION,
+            "tests_dir": self.tests_dir,
+            "files": self.entries,
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def replace(self, entries):
+        delta = diff_entries(self.entries, entries)
+        self.entries = entries
+        return delta
+
+    def update_file(self, path):
+        entries = dict(self.entries)
+        try:
+            stat = os.stat(os.path.join(self.tests_dir, path))
+        except OSError:
+            entries.pop(path, None)
+        else:
+            entries[path] = [stat.st_mtime, stat.st_size]
+        return self.replace(entries)
+
+    def rescan_dir(self, directory):
+        # перечитываем файлы одного каталога; содержимое вложенных каталогов
+        # обновится их собственными событиями, новые каталоги сканируем целиком
+        rel_dir = os.path.relpath(directory, self.tests_dir)
+        prefix = "" if rel_dir == os.curdir else rel_dir + os.sep
+        subdirs = {
+            os.path.relpath(path, self.tests_dir)
+            for path in self.list_subdirs(directory)
+        }
+
+        entries = {}
+        for path, value in self.entries.items():
+            if not path.startswith(prefix):
+                entries[path] = value
+                continue
+            rest = path[len(prefix) :]
+            if os.sep in rest and prefix + rest.split(os.sep, 1)[0] in subdirs:
+                entries[path] = value
+        entries.update(scan_tests(self.tests_dir, directory, recursive=False))
+
+        known_dirs = self.directories()
+        for sub_dir in subdirs:
+            if sub_dir not in known_dirs:
+                entries.update(
+                    scan_tests(self.tests_dir, os.path.join(self.tests_dir, sub_dir))
+                )
+
+        return self.replace(entries)
+
+    def directories(self):
+        dirs = set()
+        for path in self.entries:
+            parent = os.path.dirname(path)
+            while parent and parent not in dirs:
+                dirs.add(parent)
+                parent = os.path.dirname(parent)
+        return dirs
+
+    @staticmethod
+    def list_subdirs(directory):
+        try:
+            with os.scandir(directory) as it:
+                return [e.path for e in it if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            return []
@@ -0,0 +1,380 @@
+import json
+import os
+import signal
+import threading
+import time
+
+from core.batch_run import BatchProfiler
+from core.paths import log_file_name, state_dir
+from core.runner import FlowRun
+from core.step_profiler import StepProfiler
+
+
+class RunAttempt:
+    # неудачная попытка, после которой тест был перезапущен
+    def __init__(self, job):
+        self.returncode = job.returncode
+        self.duration = job.duration
+        self.log_path = job.log_path
+        self.steps = job.steps
+        self.stop_reason = job.stop_reason
+        self.device = job.device
+
+
+class RunJob:
+    def __init__(self, test_name, yaml_path, env=None, source=None):
+        # test_name — имя прогона; у ячейки матрицы в нём и параметры,
+        # source — тест проекта, env — его параметры maestro -e
+        self.test_name = test_name
+        self.yaml_path = yaml_path
+        self.env = dict(env or {})
+        self.source = source or test_name
+        self.device = None
+        self.running = False
+        self.returncode = None
+        self.duration = None
+        self.log_path = None
+        self.steps = []
+        self.stop_reason = None  # cancelled, timeout, idle
+        self.cpu_time = None
+        self.peak_rss = None
+        self.attempts = []
+
+    @property
+    def passed(self):
+        return self.returncode == 0
+
+    @property
+    def flaky(self):
+        return self.passed and bool(self.attempts)
+
+    def log_name(self):
+        # у повторов свой лог, первая попытка не перезаписывается
+        name = log_file_name(self.test_name)
+        if self.attempts:
+            name = f"{name[: -len('.log')]}.retry{len(self.attempts)}.log"
+        return name
+
+    def retry(self):
+        self.attempts.append(RunAttempt(self))
+        self.returncode = None
+        self.duration = None
+        self.log_path = None
+        self.steps = []
+        self.stop_reason = None
+        self.cpu_time = None
+        self.peak_rss = None
+
+
+class DurationHistory:
+    FILE_NAME = "durations.json"
+
+    def __init__(self, project_dir):
+        self.path = os.path.join(state_dir(project_dir), self.FILE_NAME)
+        self.durations = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.durations = json.load(f)
+        except (OSError, ValueError):
+            self.durations = {}
+
+    def save(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.durations, f, indent=2, sort_keys=True)
+
+    def get(self, test_name):
+        return self.durations.get(test_name)
+
+    def record(self, test_name, duration):
+        self.durations[test_name] = round(duration, 3)
+
+    def order(self, jobs):
+        # longest-first: тесты без истории считаем самыми долгими,
+        # чтобы они не оказались в хвосте очереди
+        def key(job):
+            duration = self.get(job.test_name)
+            return (duration is not None, -(duration or 0))
+
+        return sorted(jobs, key=key)
+
+
+class RunListener:
+    # колбэки вызываются из рабочих потоков пула
+    def job_started(self, job):
+        pass
+
+    def job_log(self, job, lines):
+        pass
+
+    def job_step(self, job, timing):
+        pass
+
+    def job_retry(self, job):
+        pass
+
+    def job_finished(self, job):
+        pass
+
+
+class RunPool:
+    def __init__(
+        self,
+        devices,
+        history=None,
+        log_dir=None,
+        listener=None,
+        timings=None,
+        batch_size=1,
+        timeout=None,
+        idle_timeout=None,
+        retries=0,
+    ):
+        # один воркер на устройство; None — устройство по умолчанию
+        self.devices = list(devices) or [None]
+        self.history = history
+        self.timings = timings
+        # batch_size > 1: несколько тестов за один запуск maestro, чтобы
+        # не платить за старт JVM на каждый файл
+        self.batch_size = max(int(batch_size or 1), 1)
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        # упавший тест уходит в конец очереди не больше retries раз: сбой
+        # устройства не требует перезапуска всего набора
+        self.retries = max(int(retries or 0), 0)
+        self.log_dir = log_dir
+        self.listener = listener or RunListener()
+        self.jobs = []
+        self.pending = []
+        self.active = set()  # FlowRun, идущие сейчас
+        self.cancelled = False
+        self.stop_signal = None  # SIGTERM/SIGHUP, остановившие run()
+        self.lock = threading.Lock()
+
+    def workers(self):
+        return len(self.devices)
+
+    def run(self, jobs):
+        self.jobs = list(jobs)
+        self.cancelled = False
+        self.stop_signal = None
+        if self.history:
+            self.pending = self.history.order(self.jobs)
+        else:
+            self.pending = list(self.jobs)
+
+        threads = [
+            threading.Thread(target=self.work, args=(device,), daemon=True)
+            for device in self.devices
+        ]
+        for thread in threads:
+            thread.start()
+        previous = self.install_stop_handlers()
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            # maestro в своей группе процессов и Ctrl+C не получает
+            self.cancel()
+            for thread in threads:
+                thread.join()
+            raise
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+        if self.history:
+            self.history.save()
+        return self.jobs
+
+    def install_stop_handlers(self):
+        # SIGTERM (отмена задачи CI, timeout) и SIGHUP до группы maestro тоже
+        # не доходят: останавливаем прогон тем же путём, что и Ctrl+C.
+        # Обработчики ставятся только из главного потока, UI зовёт run() в
+        # своём потоке и останавливает пул сам
+        if threading.current_thread() is not threading.main_thread():
+            return {}
+        previous = {}
+        for name in ("SIGTERM", "SIGHUP"):
+            signum = getattr(signal, name, None)
+            if signum is not None:
+                previous[signum] = signal.signal(signum, self.on_stop_signal)
+        return previous
+
+    def on_stop_signal(self, signum, frame):
+        # повторный сигнал, пока воркеры гасят maestro, прогон не прерывает
+        if self.stop_signal is None:
+            self.stop_signal = signum
+            raise KeyboardInterrupt
+
+    def cancel(self):
+        with self.lock:
+            self.cancelled = True
+            for job in self.pending:
+                job.stop_reason = "cancelled"
+            self.pending = []
+            active = list(self.active)
+        for flow_run in active:
+            flow_run.cancel()
+
+    def start_flow(self, flow_run):
+        with self.lock:
+            self.active.add(flow_run)
+            cancelled = self.cancelled
+        if cancelled:
+            flow_run.cancel()
+        try:
+            return flow_run.run()
+        finally:
+            with self.lock:
+                self.active.discard(flow_run)
+
+    def next_job(self):
+        with self.lock:
+            return self.pending.pop(0) if self.pending else None
+
+    def next_batch(self):
+        # поровну между воркерами, чтобы одна пачка не забрала всю очередь
+        with self.lock:
+            if not self.pending:
+                return []
+            size = -(-len(self.pending) // len(self.devices))
+            size = min(max(size, 1), self.batch_size)
+            # -e у запуска maestro общий: в пачку — тесты с одинаковыми параметрами
+            env = self.pending[0].env
+            batch = [job for job in self.pending if job.env == env][:size]
+            for job in batch:
+                self.pending.remove(job)
+            return batch
+
+    def work(self, device):
+        while True:
+            if self.batch_size > 1:
+                jobs = self.next_batch()
+            else:
+                job = self.next_job()
+                jobs = [job] if job else []
+            if not jobs:
+                return
+            if len(jobs) == 1 or not BatchProfiler.distinct(jobs):
+                for job in jobs:
+                    self.run_job(job, device)
+                continue
+            for job in self.run_batch(jobs, device):
+                if self.cancelled:
+                    job.stop_reason = "cancelled"
+                    continue
+                # запасной путь: тест, по которому вывод не дал результата
+                self.run_job(job, device)
+
+    def run_batch(self, jobs, device):
+        batch_log = None
+        if self.log_dir:
+            batch_log = os.path.join(
+                self.log_dir, "batch-" + log_file_name(jobs[0].test_name)
+            )
+        profiler = BatchProfiler(
+            jobs,
+            device=device,
+            listener=BatchListener(self, device),
+            log_dir=self.log_dir,
+        )
+        flow_run = FlowRun(
+            [job.yaml_path for job in jobs],
+            device=device,
+            log_path=batch_log,
+            on_lines=lambda lines: profiler.flush(),
+            profiler=profiler,
+            timeout=self.timeout and self.timeout * len(jobs),
+            idle_timeout=self.idle_timeout,
+            env=jobs[0].env,
+        )
+        code = self.start_flow(flow_run)
+        return profiler.complete(code)
+
+    def run_job(self, job, device):
+        job.device = device
+        job.running = True
+        if self.log_dir:
+            job.log_path = os.path.join(self.log_dir, job.log_name())
+        self.listener.job_started(job)
+
+        started_at = time.monotonic()
+        profiler = StepProfiler(
+            on_step=lambda timing: self.listener.job_step(job, timing)
+        )
+        flow_run = FlowRun(
+            job.yaml_path,
+            device=device,
+            log_path=job.log_path,
+            on_lines=lambda lines: self.listener.job_log(job, lines),
+            profiler=profiler,
+            timeout=self.timeout,
+            idle_timeout=self.idle_timeout,
+            env=job.env,
+        )
+        code = self.start_flow(flow_run)
+
+        job.running = False
+        job.returncode = code
+        job.duration = time.monotonic() - started_at
+        job.steps = profiler.steps
+        job.stop_reason = flow_run.stop_reason
+        job.cpu_time = flow_run.cpu_time
+        job.peak_rss = flow_run.peak_rss
+        self.finish_job(job, device)
+
+    def finish_job(self, job, device):
+        self.record(job, device)
+        with self.lock:
+            retry = (
+                not job.passed
+                and job.stop_reason != "cancelled"
+                and not self.cancelled
+                and len(job.attempts) < self.retries
+            )
+            if retry:
+                job.retry()
+                self.pending.append(job)
+        if retry:
+            self.listener.job_retry(job)
+        else:
+            self.listener.job_finished(job)
+
+    def record(self, job, device):
+        if self.timings:
+            self.timings.record(
+                job.test_name,
+                job.returncode,
+                job.duration,
+                job.steps,
+                device,
+                cpu_time=job.cpu_time,
+                peak_rss=job.peak_rss,
+            )
+        if self.history and job.passed:
+            # упавший прогон обрывается раньше и занижает оценку
+            with self.lock:
+                self.history.record(job.test_name, job.duration)
+
+
+class BatchListener(RunListener):
+    # события пакетного запуска идут слушателю пула, а завершение теста —
+    # через пул, чтобы упавшие тесты в пакете тоже повторялись
+    def __init__(self, pool, device):
+        self.pool = pool
+        self.device = device
+
+    def job_started(self, job):
+        self.pool.listener.job_started(job)
+
+    def job_log(self, job, lines):
+        self.pool.listener.job_log(job, lines)
+
+    def job_step(self, job, timing):
+        self.pool.listener.job_step(job, timing)
+
+    def job_finished(self, job):
+        self.pool.finish_job(job, self.device)
@@ -0,0 +1,158 @@
+import json
+import os
+import socket
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+from core.paths import state_dir
+from core.run_queue import RunJob
+
+
+def job_status(job):
+    # passed, flaky (прошёл с повтора), failed, stopped (отменён или не запускался)
+    if job.passed:
+        return "flaky" if job.attempts else "passed"
+    if job.returncode is None or job.stop_reason == "cancelled":
+        return "stopped"
+    return "failed"
+
+
+def failure_message(returncode, stop_reason, steps):
+    message = stop_reason or f"code {returncode}"
+    failed = [step for step in steps if step.failed]
+    if failed:
+        message += f", step {failed[0].index + 1}: {failed[0].text}"
+    return message
+
+
+class LastRun:
+    # итоги последнего прогона каждого теста — для "rerun failed"
+    FILE_NAME = "last_run.json"
+
+    def __init__(self, project_dir):
+        self.path = os.path.join(state_dir(project_dir), self.FILE_NAME)
+        self.tests = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.tests = json.load(f).get("tests", {})
+        except (OSError, ValueError, AttributeError):
+            self.tests = {}
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"tests": self.tests}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def record(self, jobs):
+        # прогон части тестов обновляет только их записи
+        finished = time.time()
+        for job in jobs:
+            entry = {
+                "status": job_status(job),
+                "returncode": job.returncode,
+                "duration": job.duration and round(job.duration, 3),
+                "attempts": len(job.attempts) + 1,
+                "log_path": job.log_path,
+                "finished": finished,
+            }
+            if job.env:
+                # развёрнутая ячейка матрицы перезапускается как есть,
+                # даже если определение матрицы с тех пор поменялось
+                entry["test"] = job.source
+                entry["env"] = job.env
+            self.tests[job.test_name] = entry
+
+    def status(self, test_name):
+        entry = self.tests.get(test_name)
+        return entry["status"] if entry else None
+
+    def failed(self):
+        return sorted(
+            name
+            for name, entry in self.tests.items()
+            if entry["status"] in ("failed", "stopped")
+        )
+
+    def failed_jobs(self, tests_dir):
+        # удалённые с прошлого прогона тесты пропускаем
+        jobs = []
+        for name in self.failed():
+            entry = self.tests[name]
+            source = entry.get("test", name)
+            yaml_path = os.path.join(tests_dir, source)
+            if os.path.isfile(yaml_path):
+                jobs.append(RunJob(name, yaml_path, entry.get("env"), source))
+        return jobs
+
+
+def junit_xml(jobs, suite_name="maestro"):
+    # формат JUnit из surefire: повторы — flakyFailure у прошедших и
+    # rerunFailure у упавших, его понимают Jenkins и GitLab
+    suite = ET.Element("testsuite", name=suite_name)
+    counts = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0}
+    total = 0.0
+    for job in jobs:
+        counts["tests"] += 1
+        duration = job.duration or 0.0
+        total += duration + sum(attempt.duration or 0.0 for attempt in job.attempts)
+        case = ET.SubElement(
+            suite,
+            "testcase",
+            classname=os.path.dirname(job.source).replace(os.sep, ".") or suite_name,
+            name=job.test_name,
+            time=f"{duration:.3f}",
+        )
+        if job.env:
+            properties = ET.SubElement(case, "properties")
+            for key, value in job.env.items():
+                ET.SubElement(properties, "property", name=key, value=value)
+        status = job_status(job)
+        retry_tag = "flakyFailure" if status == "flaky" else "rerunFailure"
+        if status == "stopped" and job.returncode is None:
+            counts["skipped"] += 1
+            ET.SubElement(case, "skipped", message="not run")
+        elif status == "stopped":
+            counts["errors"] += 1
+            ET.SubElement(case, "error", message="cancelled", type="cancelled")
+        elif status == "failed":
+            counts["failures"] += 1
+            failure = ET.SubElement(
+                case,
+                "failure",
+                message=failure_message(job.returncode, job.stop_reason, job.steps),
+                type=job.stop_reason or "failure",
+            )
+            failure.text = job.log_path or ""
+        for attempt in job.attempts:
+            element = ET.SubElement(
+                case,
+                retry_tag,
+                message=failure_message(
+                    attempt.returncode, attempt.stop_reason, attempt.steps
+                ),
+                type=attempt.stop_reason or "failure",
+            )
+            if attempt.log_path:
+                ET.SubElement(element, "system-out").text = attempt.log_path
+        if job.log_path:
+            ET.SubElement(case, "system-out").text = job.log_path
+
+    for key, value in counts.items():
+        suite.set(key, str(value))
+    suite.set("time", f"{total:.3f}")
+    suite.set("timestamp", datetime.now().isoformat(timespec="seconds"))
+    suite.set("hostname", socket.gethostname())
+    root = ET.Element("testsuites")
+    root.append(suite)
+    ET.indent(root)
+    return ET.tostring(root, encoding="unicode", xml_declaration=True) + "\n"
+
+
+def write_junit(path, jobs, suite_name="maestro"):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(junit_xml(jobs, suite_name))
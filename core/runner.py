@@ -1,26 +1,261 @@
+import os
+import queue
+import signal
 import subprocess
+import sys
+import threading
+import time
 
-from PyQt5.QtCore import QThread, pyqtSignal
+# причины остановки прогона и строки, которые о них попадают в лог
+STOP_MESSAGES = {
+    "cancelled": "⏹ Run cancelled",
+    "timeout": "⏱ Run timed out after {timeout:.0f}s",
+    "idle": "⏱ No output for {idle_timeout:.0f}s, run stopped",
+}
 
 
-class MaestroRunner(QThread):
-    log = pyqtSignal(str)
-    finished = pyqtSignal(int)
+def maestro_command(yaml_path, device=None, env=None):
+    # yaml_path — файл или список файлов для одного запуска maestro;
+    # env — параметры потока, maestro test -e KEY=VALUE
+    paths = [yaml_path] if isinstance(yaml_path, str) else list(yaml_path)
+    command = ["maestro"]
+    if device:
+        command += ["--device", device]
+    command.append("test")
+    for key, value in (env or {}).items():
+        command += ["-e", f"{key}={value}"]
+    command += paths
+    return command
 
-    def __init__(self, yaml_path):
-        super().__init__()
+
+def iter_batches(stream, max_lines=200, max_delay=0.1, on_line=None):
+    # строки копятся до max_lines или max_delay секунд с первой строки пачки;
+    # чтение в отдельном потоке, чтобы пачка уходила и при молчащем процессе.
+    # on_line вызывается в потоке чтения сразу, без задержки пачки
+    lines = queue.Queue()
+
+    def read():
+        for line in stream:
+            if on_line:
+                on_line(line)
+            lines.put(line)
+        lines.put(None)
+
+    threading.Thread(target=read, daemon=True).start()
+
+    batch = []
+    deadline = None
+    while True:
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        try:
+            line = lines.get(timeout=timeout)
+        except queue.Empty:
+            yield batch
+            batch, deadline = [], None
+            continue
+
+        if line is None:
+            break
+        batch.append(line.rstrip())
+        if deadline is None:
+            deadline = time.monotonic() + max_delay
+        if len(batch) >= max_lines:
+            yield batch
+            batch, deadline = [], None
+
+    if batch:
+        yield batch
+
+
+def popen_group_options():
+    # maestro — скрипт, запускающий JVM; своя группа процессов позволяет
+    # остановить всё дерево, а не только скрипт
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def signal_tree(process, force):
+    if os.name == "nt":
+        subprocess.run(
+            ["taskkill", "/T", "/F", "/PID", str(process.pid)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def kill_tree(process, grace):
+    # сначала SIGTERM, через grace секунд SIGKILL всей группе: JVM могла
+    # пережить выход скрипта maestro
+    signal_tree(process, force=False)
+    timer = threading.Timer(grace, signal_tree, args=(process, True))
+    timer.daemon = True
+    timer.start()
+
+
+def wait_group(process, grace):
+    # остановленный прогон завершается, когда вышла вся группа: таймер
+    # kill_tree — демон и не переживёт выход CLI, после которого JVM
+    # осталась бы сиротой
+    if os.name == "nt":
+        return
+    deadline = time.monotonic() + grace
+    while True:
+        try:
+            os.killpg(process.pid, 0)
+        except (ProcessLookupError, PermissionError):
+            return
+        if time.monotonic() > deadline:
+            signal_tree(process, force=True)
+            return
+        time.sleep(0.05)
+
+
+def wait_with_usage(process):
+    # (код возврата, время CPU, пиковый RSS в байтах) — wait4 учитывает и
+    # дождавшихся потомков процесса, то есть JVM
+    if not hasattr(os, "wait4"):
+        return process.wait(), None, None
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+    except ChildProcessError:
+        return process.wait(), None, None
+    process.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss: Linux — КиБ, macOS — байты
+    peak_rss = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    return process.returncode, usage.ru_utime + usage.ru_stime, peak_rss
+
+
+class FlowRun:
+    BATCH_LINES = 200
+    BATCH_DELAY = 0.1
+    WATCH_INTERVAL = 0.5
+    KILL_GRACE = 5.0
+
+    def __init__(
+        self,
+        yaml_path,
+        device=None,
+        log_path=None,
+        on_lines=None,
+        profiler=None,
+        timeout=None,
+        idle_timeout=None,
+        env=None,
+    ):
         self.yaml_path = yaml_path
+        self.device = device
+        self.env = env
+        self.log_path = log_path
+        self.on_lines = on_lines
+        self.profiler = profiler
+        # секунды на весь прогон и без вывода; None — без ограничения
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.process = None
+        self.stop_reason = None
+        self.cpu_time = None
+        self.peak_rss = None
+        self.last_output = None
+        self.lock = threading.Lock()
+        self.done = threading.Event()
 
-    def run(self):
-        process = subprocess.Popen(
-            ["maestro", "test", self.yaml_path],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
+    def cancel(self):
+        self.stop("cancelled")
+
+    def stop(self, reason):
+        # из любого потока; до запуска процесса — он будет остановлен сразу
+        with self.lock:
+            if self.stop_reason is not None:
+                return
+            self.stop_reason = reason
+            process = self.process
+        if process is not None:
+            kill_tree(process, self.KILL_GRACE)
+
+    def watch(self, started):
+        while not self.done.wait(self.WATCH_INTERVAL):
+            now = time.monotonic()
+            if self.timeout and now - started > self.timeout:
+                self.stop("timeout")
+            elif self.idle_timeout and now - self.last_output > self.idle_timeout:
+                self.stop("idle")
+
+    def feed(self, line):
+        # поток чтения
+        self.last_output = time.monotonic()
+        if self.profiler:
+            self.profiler.feed(line)
+
+    def stop_message(self):
+        if self.stop_reason is None:
+            return None
+        return STOP_MESSAGES[self.stop_reason].format(
+            timeout=self.timeout or 0, idle_timeout=self.idle_timeout or 0
         )
 
-        for line in process.stdout:
-            self.log.emit(line.rstrip())
+    def run(self):
+        spool = None
+        if self.log_path:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            spool = open(self.log_path, "w", encoding="utf-8")
+        try:
+            return self.execute(spool)
+        finally:
+            if spool:
+                spool.close()
+
+    def execute(self, spool):
+        if self.stop_reason is not None:
+            self.emit_batch([self.stop_message()], spool)
+            return -signal.SIGTERM
+        try:
+            process = subprocess.Popen(
+                maestro_command(self.yaml_path, self.device, self.env),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                **popen_group_options(),
+            )
+        except OSError as e:
+            # без кода возврата очередь запусков никогда не освободит воркер
+            self.emit_batch([str(e)], spool)
+            return 127
+
+        started = self.last_output = time.monotonic()
+        with self.lock:
+            self.process = process
+            stopped = self.stop_reason is not None
+        if stopped:
+            # cancel() пришёл, пока процесс запускался
+            kill_tree(process, self.KILL_GRACE)
+        if self.timeout or self.idle_timeout:
+            threading.Thread(target=self.watch, args=(started,), daemon=True).start()
+
+        try:
+            for batch in iter_batches(
+                process.stdout, self.BATCH_LINES, self.BATCH_DELAY, self.feed
+            ):
+                self.emit_batch(batch, spool)
+            code, self.cpu_time, self.peak_rss = wait_with_usage(process)
+        finally:
+            self.done.set()
+
+        if self.stop_reason is not None:
+            wait_group(process, self.KILL_GRACE)
+            self.emit_batch([self.stop_message()], spool)
+        if self.profiler:
+            self.profiler.finish()
+        return code
 
-        process.wait()
-        self.finished.emit(process.returncode)
+    def emit_batch(self, lines, spool):
+        # на диск пишем всё, наружу — пачками
+        if spool:
+            spool.write("\n".join(lines) + "\n")
+        if self.on_lines:
+            self.on_lines(lines)
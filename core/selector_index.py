@@ -0,0 +1,278 @@
+import difflib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import yaml
+from yaml.nodes import MappingNode, ScalarNode, SequenceNode
+
+from core import yaml_backend
+from core.files import atomic_write
+from core.project_index import scan_tests
+from core.yaml_service import flow_cache
+
+SELECTOR_KINDS = ("id", "text", "point")
+APP_ID = "appId"
+KINDS = SELECTOR_KINDS + (APP_ID,)
+
+# строка вместо словаря у этих шагов — текст элемента: tapOn: "Login"
+TEXT_SHORTHAND = {
+    "tapOn",
+    "doubleTapOn",
+    "longPressOn",
+    "assertVisible",
+    "assertNotVisible",
+}
+# у inputText text — вводимый текст, а не селектор
+NOT_SELECTORS = {"inputText": {"text"}}
+STR_TAG = "tag:yaml.org,2002:str"
+
+
+def value_selectors(step_type, value):
+    # (вид, значение) селекторов одного шага: tapOn: {id: ...},
+    # scrollUntilVisible: {element: {text: ...}}, tapOn: "Login"
+    if isinstance(value, str):
+        if step_type in TEXT_SHORTHAND:
+            yield "text", value
+        return
+    if not isinstance(value, dict):
+        return
+    skip = NOT_SELECTORS.get(step_type, ())
+    for target in (value, value.get("element")):
+        if not isinstance(target, dict):
+            continue
+        for kind in SELECTOR_KINDS:
+            if target is value and kind in skip:
+                continue
+            if isinstance(target.get(kind), str):
+                yield kind, target[kind]
+
+
+def step_selectors(step):
+    data = step.to_dict()
+    if isinstance(data, dict) and len(data) == 1:
+        ((step_type, value),) = data.items()
+        yield from value_selectors(step_type, value)
+
+
+def node_value(mapping, key):
+    for key_node, value_node in mapping.value:
+        if isinstance(key_node, ScalarNode) and key_node.value == key:
+            return value_node
+    return None
+
+
+def node_selectors(step_type, node):
+    # то же, что value_selectors, но по узлам YAML — с позициями в тексте
+    if isinstance(node, ScalarNode):
+        if step_type in TEXT_SHORTHAND and node.tag == STR_TAG:
+            yield "text", node
+        return
+    if not isinstance(node, MappingNode):
+        return
+    skip = NOT_SELECTORS.get(step_type, ())
+    for target in (node, node_value(node, "element")):
+        if not isinstance(target, MappingNode):
+            continue
+        for kind in SELECTOR_KINDS:
+            if target is node and kind in skip:
+                continue
+            value = node_value(target, kind)
+            if isinstance(value, ScalarNode) and value.tag == STR_TAG:
+                yield kind, value
+
+
+def flow_selector_nodes(documents):
+    # (вид, индекс шага, узел); нумерация шагов как в parse_flow
+    if not documents:
+        return
+    header = documents[0]
+    if isinstance(header, MappingNode):
+        value = node_value(header, APP_ID)
+        if isinstance(value, ScalarNode) and value.tag == STR_TAG:
+            yield APP_ID, None, value
+
+    index = 0
+    for document in documents[1:]:
+        items = document.value if isinstance(document, SequenceNode) else [document]
+        for item in items:
+            if isinstance(item, ScalarNode) and item.tag == STR_TAG:
+                index += 1
+            elif isinstance(item, MappingNode) and item.value:
+                if len(item.value) == 1:
+                    key_node, value_node = item.value[0]
+                    for kind, node in node_selectors(key_node.value, value_node):
+                        yield kind, index, node
+                index += 1
+
+
+def scalar_text(value):
+    # запись нового значения на место старого скаляра; перевод строки в
+    # значении — в двойные кавычки, чтобы не получить блочный скаляр
+    text = yaml.dump(
+        {"k": value},
+        Dumper=yaml_backend.PURE_DUMPER,
+        allow_unicode=True,
+        width=float("inf"),
+    )
+    text = text[len("k: ") :].rstrip("\n")
+    # простой скаляр с ,[]{} недопустим внутри {id: ...}
+    flow_unsafe = text[:1] not in ("'", '"') and any(c in text for c in ",[]{}")
+    if "\n" in text or flow_unsafe:
+        return json.dumps(value, ensure_ascii=False)
+    return text
+
+
+def rename_in_text(text, kind, old, new):
+    # меняются только найденные скаляры, остальной текст (комментарии,
+    # порядок ключей, форматирование) остаётся байт в байт
+    documents = list(yaml.compose_all(text, Loader=yaml_backend.PURE_LOADER))
+    nodes = [
+        node
+        for node_kind, _, node in flow_selector_nodes(documents)
+        if node_kind == kind and node.value == old
+    ]
+    if not nodes:
+        return None
+    replacement = scalar_text(new)
+    for node in sorted(nodes, key=lambda node: node.start_mark.index, reverse=True):
+        start, end = node.start_mark.index, node.end_mark.index
+        suffix = "\n" if node.style in ("|", ">") else ""
+        text = text[:start] + replacement + suffix + text[end:]
+    return text
+
+
+def rename_file(full_path, kind, old, new):
+    # выполняется в рабочем процессе
+    with open(full_path, "r", encoding="utf-8", newline="") as f:
+        text = f.read()
+    try:
+        new_text = rename_in_text(text, kind, old, new)
+    except yaml.YAMLError:
+        return None
+    if new_text is None or new_text == text:
+        return None
+    return full_path, text, new_text
+
+
+class FileChange:
+    def __init__(self, path, old_text, new_text):
+        self.path = path
+        self.old_text = old_text
+        self.new_text = new_text
+
+    def diff(self, tests_dir=None):
+        name = os.path.relpath(self.path, tests_dir) if tests_dir else self.path
+        return "".join(
+            difflib.unified_diff(
+                self.old_text.splitlines(keepends=True),
+                self.new_text.splitlines(keepends=True),
+                "a/" + name,
+                "b/" + name,
+            )
+        )
+
+
+class SelectorIndex:
+    PARALLEL_THRESHOLD = 16
+
+    def __init__(self, tests_dir, workers=None):
+        self.tests_dir = tests_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.identities = {}  # path -> (mtime, size) проиндексированной версии
+        self.files = {}  # path -> [(вид, значение, индекс шага), ...]
+        self.postings = {}  # (вид, значение) -> {path: [индекс шага, ...]}
+
+    def sync(self, entries=None):
+        # как FlowGraph.sync: перечитываются только изменившиеся файлы
+        if entries is None:
+            entries = scan_tests(self.tests_dir)
+        for path in list(self.identities):
+            if path not in entries:
+                self.remove_file(path)
+        for path, identity in entries.items():
+            if self.identities.get(path) != tuple(identity):
+                self.update_file(path, tuple(identity))
+
+    def update_file(self, path, identity=None):
+        full_path = os.path.join(self.tests_dir, path)
+        self.remove_file(path)
+        try:
+            if identity is None:
+                stat = os.stat(full_path)
+                identity = (stat.st_mtime, stat.st_size)
+            app_id, steps = flow_cache.load(full_path, copy=False)
+        except Exception:
+            app_id, steps = None, []
+        self.identities[path] = identity
+
+        entries = []
+        if isinstance(app_id, str):
+            entries.append((APP_ID, app_id, None))
+        for index, step in enumerate(steps):
+            for kind, value in step_selectors(step):
+                entries.append((kind, value, index))
+
+        self.files[path] = entries
+        for kind, value, index in entries:
+            self.postings.setdefault((kind, value), {}).setdefault(path, []).append(
+                index
+            )
+
+    def remove_file(self, path):
+        self.identities.pop(path, None)
+        for kind, value, _ in self.files.pop(path, ()):
+            files = self.postings.get((kind, value))
+            if files is None:
+                continue
+            files.pop(path, None)
+            if not files:
+                del self.postings[(kind, value)]
+
+    def usages(self, kind, value):
+        # [(файл, индекс шага)], для appId индекс — None
+        files = self.postings.get((kind, value), {})
+        return [(path, index) for path in sorted(files) for index in files[path]]
+
+    def values(self, kind):
+        return sorted(
+            value for value_kind, value in self.postings if value_kind == kind
+        )
+
+    def plan_rename(self, kind, old, new):
+        # dry run: изменения файлов без записи на диск
+        paths = [
+            os.path.join(self.tests_dir, path)
+            for path in sorted(self.postings.get((kind, old), {}))
+        ]
+        args = (paths, [kind] * len(paths), [old] * len(paths), [new] * len(paths))
+        if len(paths) < self.PARALLEL_THRESHOLD or self.workers < 2:
+            results = map(rename_file, *args)
+        else:
+            # spawn: fork из процесса с потоками Qt может зависнуть
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(self.workers, mp_context=context) as pool:
+                chunksize = max(len(paths) // (self.workers * 4), 1)
+                results = list(pool.map(rename_file, *args, chunksize=chunksize))
+        return [FileChange(*result) for result in results if result]
+
+
+def apply_changes(changes, workers=8):
+    # запись параллельно и атомарно; файл, изменившийся после dry run,
+    # не трогаем. Возвращает (записанные, конфликтные) пути
+    def apply(change):
+        try:
+            with open(change.path, "r", encoding="utf-8", newline="") as f:
+                if f.read() != change.old_text:
+                    return change.path, False
+        except OSError:
+            return change.path, False
+        atomic_write(change.path, change.new_text.encode("utf-8"))
+        return change.path, True
+
+    written, conflicts = [], []
+    with ThreadPoolExecutor(max(min(workers, len(changes)), 1)) as pool:
+        for path, ok in pool.map(apply, changes):
+            (written if ok else conflicts).append(path)
+    return written, conflicts
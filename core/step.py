@@ -1,8 +1,26 @@
+import sys
+from types import MappingProxyType
+
+# общий пустой params для всех шагов без параметров; менять params на месте
+# нельзя — редакторы присваивают новый словарь через set_params
+EMPTY_PARAMS = MappingProxyType({})
+
+
 class MaestroStep:
+    __slots__ = ("step_type", "params", "raw")
+
     def __init__(self, step_type: str, params=None, raw=None):
-        self.step_type = step_type
-        self.params = params or {}
-        self.raw = raw  # оригинальный YAML, если шаг не поддержан
+        self.step_type = sys.intern(step_type)
+        self.params = params or EMPTY_PARAMS
+        self.raw = raw  # оригинальный YAML, если его не восстановить из params
+
+    def set_params(self, params):
+        self.params = params or EMPTY_PARAMS
+        self.raw = None
+
+    def copy(self):
+        params = dict(self.params) if self.params else None
+        return MaestroStep(self.step_type, params=params, raw=self.raw)
 
     def to_dict(self):
         if self.raw is not None:
@@ -31,23 +49,16 @@ class MaestroStep:
 
     @staticmethod
     def from_dict(data: dict):
-        step_type = list(data.keys())[0]
+        step_type = next(iter(data))
         params = data[step_type]
 
-        # поддерживаемые шаги
-        supported = step_type in (
-            "tapOn",
-            "inputText",
-            "launchApp",
-            "assertVisible",
-            "back",
-        )
+        # {шаг: {параметры}} однозначно восстанавливается из params —
+        # исходный словарь не храним, чтобы не держать данные дважды
+        if len(data) == 1 and isinstance(params, dict) and params:
+            return MaestroStep(step_type, params=params)
 
-        if supported:
-            return MaestroStep(
-                step_type, params=params if isinstance(params, dict) else {}
-            )
-        else:
-            return MaestroStep(
-                step_type, raw=data, params=params if isinstance(params, dict) else {}
-            )
+        # строковая форма (runFlow: file.yaml, tapOn: "Login"), пустые
+        # параметры и прочие неподдержанные формы сохраняем как есть
+        return MaestroStep(
+            step_type, raw=data, params=params if isinstance(params, dict) else None
+        )
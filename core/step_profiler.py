@@ -0,0 +1,112 @@
+import re
+import time
+
+# строки maestro вида "Tap on id: login... COMPLETED"; команды внутри runFlow
+# и прочие вложенные печатаются с большим отступом
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+COMMAND_LINE = re.compile(
+    r"^(?P<indent>\s*)(?P<text>\S.*?)\.\.\.\s*"
+    r"(?P<status>RUNNING|COMPLETED|FAILED|SKIPPED|WARNED|PENDING)\s*$"
+)
+FLOW_LINE = re.compile(r"^\s*>\s*Flow\s+(?P<name>.+?)\s*$")
+
+FINAL_STATUSES = ("COMPLETED", "FAILED", "SKIPPED", "WARNED")
+
+
+class StepTiming:
+    __slots__ = ("index", "text", "status", "started", "finished")
+
+    def __init__(self, index, text, started):
+        self.index = index
+        self.text = text
+        self.status = "RUNNING"
+        self.started = started
+        self.finished = None
+
+    @property
+    def duration(self):
+        if self.finished is None:
+            return None
+        return self.finished - self.started
+
+    @property
+    def failed(self):
+        return self.status == "FAILED"
+
+
+class StepProfiler:
+    # разбор вывода построчно, O(1) на строку: шаг верхнего уровня с номером N
+    # — это N-я команда maestro с минимальным отступом
+    def __init__(self, on_step=None, clock=time.monotonic):
+        self.on_step = on_step
+        self.clock = clock
+        self.steps = []
+        self.flow_name = None
+        self.indent = None
+        self.current = None
+        self.started = clock()
+        self.finished = None
+
+    def feed(self, line):
+        if "..." not in line:
+            if self.flow_name is None and "Flow" in line:
+                match = FLOW_LINE.match(line)
+                if match:
+                    self.flow_name = match.group("name")
+            return
+
+        if "\x1b" in line:
+            line = ANSI_ESCAPE.sub("", line)
+        match = COMMAND_LINE.match(line)
+        if not match:
+            return
+
+        indent = len(match.group("indent"))
+        if self.indent is None or indent < self.indent:
+            self.indent = indent
+        if indent > self.indent:
+            return
+
+        status = match.group("status")
+        if status == "PENDING":
+            return
+        text = match.group("text")
+        now = self.clock()
+
+        timing = self.current
+        if timing is None or timing.text != text:
+            # без строки RUNNING шаг начинается с окончания предыдущего
+            started = self.steps[-1].finished if self.steps else self.started
+            timing = StepTiming(len(self.steps), text, now)
+            if status != "RUNNING" and started is not None:
+                timing.started = started
+            self.steps.append(timing)
+            self.current = timing
+
+        if status in FINAL_STATUSES:
+            timing.status = status
+            timing.finished = now
+            self.current = None
+        if self.on_step:
+            self.on_step(timing)
+
+    def finish(self):
+        self.finished = self.clock()
+        if self.current is not None:
+            # процесс завершился посреди шага (упал или был остановлен)
+            self.current.status = "FAILED"
+            self.current.finished = self.finished
+            if self.on_step:
+                self.on_step(self.current)
+            self.current = None
+
+    @property
+    def duration(self):
+        end = self.finished if self.finished is not None else self.clock()
+        return end - self.started
+
+    def failed_step(self):
+        for timing in self.steps:
+            if timing.failed:
+                return timing
+        return None
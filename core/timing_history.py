@@ -0,0 +1,116 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from core.paths import state_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    test TEXT NOT NULL,
+    started REAL NOT NULL,
+    duration REAL NOT NULL,
+    returncode INTEGER,
+    device TEXT,
+    cpu_time REAL,
+    peak_rss INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_test ON runs (test, started);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    idx INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS steps_run ON steps (run_id);
+"""
+
+
+class TimingHistory:
+    FILE_NAME = "timings.sqlite"
+    KEEP_RUNS = 200  # на тест
+
+    def __init__(self, project_dir):
+        self.path = os.path.join(state_dir(project_dir), self.FILE_NAME)
+        with self.connect() as db:
+            db.executescript(SCHEMA)
+            # файлы истории, созданные до появления учёта ресурсов
+            columns = {row[1] for row in db.execute("PRAGMA table_info(runs)")}
+            for column, kind in (("cpu_time", "REAL"), ("peak_rss", "INTEGER")):
+                if column not in columns:
+                    db.execute(f"ALTER TABLE runs ADD COLUMN {column} {kind}")
+
+    @contextmanager
+    def connect(self):
+        # отдельное соединение на вызов: пишут рабочие потоки пула
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA foreign_keys=ON")
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def record(
+        self,
+        test_name,
+        returncode,
+        duration,
+        steps,
+        device=None,
+        cpu_time=None,
+        peak_rss=None,
+    ):
+        with self.connect() as db:
+            run_id = db.execute(
+                "INSERT INTO runs (test, started, duration, returncode, device, "
+                "cpu_time, peak_rss) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    test_name,
+                    time.time() - duration,
+                    duration,
+                    returncode,
+                    device,
+                    cpu_time,
+                    peak_rss,
+                ),
+            ).lastrowid
+            db.executemany(
+                "INSERT INTO steps (run_id, idx, text, status, duration) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (run_id, step.index, step.text, step.status, step.duration)
+                    for step in steps
+                ],
+            )
+            db.execute(
+                "DELETE FROM runs WHERE test = ? AND id NOT IN "
+                "(SELECT id FROM runs WHERE test = ? ORDER BY started DESC LIMIT ?)",
+                (test_name, test_name, self.KEEP_RUNS),
+            )
+        return run_id
+
+    def trend(self, test_name, limit=20):
+        # последние прогоны, от старых к новым: (started, duration, returncode)
+        with self.connect() as db:
+            rows = db.execute(
+                "SELECT started, duration, returncode FROM runs WHERE test = ? "
+                "ORDER BY started DESC LIMIT ?",
+                (test_name, limit),
+            ).fetchall()
+        return rows[::-1]
+
+    def slowest_steps(self, test_name, runs=20, limit=10):
+        # (индекс, текст, среднее, максимум, число прогонов, падения)
+        with self.connect() as db:
+            return db.execute(
+                "SELECT idx, text, AVG(steps.duration), MAX(steps.duration), "
+                "COUNT(*), SUM(status = 'FAILED') FROM steps "
+                "WHERE run_id IN (SELECT id FROM runs WHERE test = ? "
+                "ORDER BY started DESC LIMIT ?) AND steps.duration IS NOT NULL "
+                "GROUP BY idx, text ORDER BY AVG(steps.duration) DESC LIMIT ?",
+                (test_name, runs, limit),
+            ).fetchall()
@@ -0,0 +1,133 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# MAESTRO_EDITOR_TRACE=1 включает запись с самого старта
+ENV_VAR = "MAESTRO_EDITOR_TRACE"
+
+
+class TraceEvent:
+    __slots__ = ("name", "start", "duration", "tid", "args")
+
+    def __init__(self, name, start, duration, tid, args=None):
+        self.name = name
+        self.start = start  # ns, time.perf_counter_ns
+        self.duration = duration  # ns
+        self.tid = tid
+        self.args = args
+
+
+class Tracer:
+    # события в кольцевом буфере: при выключенной записи обёртки стоят
+    # одну проверку флага, при включённой память не растёт
+    def __init__(self, capacity=20000, enabled=False):
+        self.enabled = enabled
+        self.events = deque(maxlen=capacity)
+        self.threads = {}
+        self.origin = time.perf_counter_ns()
+
+    def record(self, name, start, duration, args=None):
+        thread = threading.current_thread()
+        self.threads.setdefault(thread.ident, thread.name)
+        # deque.append атомарен — лок не нужен
+        self.events.append(TraceEvent(name, start, duration, thread.ident, args))
+
+    def recent(self, limit=20):
+        events = list(self.events)
+        return events[-limit:]
+
+    def clear(self):
+        self.events.clear()
+
+    def span(self, name, **args):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, args or None)
+
+    def traced(self, name=None):
+        def decorate(func):
+            label = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(label, start, time.perf_counter_ns() - start)
+
+            return wrapper
+
+        return decorate
+
+    def chrome_trace(self):
+        # формат Trace Event: chrome://tracing, Perfetto; время в мкс
+        pid = os.getpid()
+        trace = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in self.threads.items()
+        ]
+        for event in list(self.events):
+            item = {
+                "name": event.name,
+                "ph": "X",
+                "pid": pid,
+                "tid": event.tid,
+                "ts": (event.start - self.origin) / 1000,
+                "dur": event.duration / 1000,
+            }
+            if event.args:
+                item["args"] = event.args
+            trace.append(item)
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def export_chrome(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+class Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(
+            self.name, self.start, time.perf_counter_ns() - self.start, self.args
+        )
+        return False
+
+
+class NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+tracer = Tracer(enabled=os.environ.get(ENV_VAR) == "1")
+traced = tracer.traced
+span = tracer.span
@@ -0,0 +1,164 @@
+import time
+
+# нет ключа в params — отличаем от значения None
+MISSING = object()
+
+# правки одного поля, идущие подряд с паузами меньше этой, — одна отмена
+COALESCE_SECONDS = 2.0
+
+
+def params_diff(old, new):
+    # только изменившиеся ключи: {ключ: (было, стало)}
+    diff = {}
+    for key in old.keys() | new.keys():
+        before = old.get(key, MISSING)
+        after = new.get(key, MISSING)
+        if before != after:
+            diff[key] = (before, after)
+    return diff
+
+
+def patch_params(params, diff, reverse=False):
+    params = dict(params or {})
+    for key, (before, after) in diff.items():
+        value = before if reverse else after
+        if value is MISSING:
+            params.pop(key, None)
+        else:
+            params[key] = value
+    return params
+
+
+class ParamsChange:
+    def __init__(self, row, diff, old_raw=None):
+        self.row = row
+        self.diff = diff
+        # первая правка неподдержанного шага сбрасывает raw — храним для отмены
+        self.old_raw = old_raw
+        self.at = time.monotonic()
+
+    def undo(self, target):
+        params = patch_params(target.step_at(self.row).params, self.diff, reverse=True)
+        target.set_step_params(self.row, params, self.old_raw)
+        return self.row
+
+    def redo(self, target):
+        params = patch_params(target.step_at(self.row).params, self.diff)
+        target.set_step_params(self.row, params, None)
+        return self.row
+
+    def merge(self, other):
+        # набор в том же поле того же шага склеивается в одну правку
+        if not isinstance(other, ParamsChange) or other.row != self.row:
+            return False
+        if other.diff.keys() != self.diff.keys() or other.old_raw is not None:
+            return False
+        if other.at - self.at > COALESCE_SECONDS:
+            return False
+        diff = {}
+        for key, (before, _) in self.diff.items():
+            after = other.diff[key][1]
+            if before != after:
+                diff[key] = (before, after)
+        # правки могли вернуть поле к исходному значению: пустая дельта,
+        # отмена и повтор ничего не меняют
+        self.diff = diff
+        self.at = other.at
+        return True
+
+    def is_noop(self):
+        # с old_raw отмена ещё возвращает исходный текст неподдержанного шага
+        return not self.diff and self.old_raw is None
+
+
+class InsertStep:
+    def __init__(self, row, step):
+        self.row = row
+        self.step = step
+
+    def undo(self, target):
+        target.remove_step(self.row)
+        return min(self.row, target.step_count() - 1)
+
+    def redo(self, target):
+        target.insert_step(self.row, self.step)
+        return self.row
+
+    def merge(self, other):
+        return False
+
+    def is_noop(self):
+        return False
+
+
+class DeleteStep(InsertStep):
+    def undo(self, target):
+        return InsertStep.redo(self, target)
+
+    def redo(self, target):
+        return InsertStep.undo(self, target)
+
+
+class MoveStep:
+    def __init__(self, from_row, to_row):
+        self.from_row = from_row
+        self.to_row = to_row
+
+    def undo(self, target):
+        target.move_step(self.to_row, self.from_row)
+        return self.from_row
+
+    def redo(self, target):
+        target.move_step(self.from_row, self.to_row)
+        return self.to_row
+
+    def merge(self, other):
+        return False
+
+    def is_noop(self):
+        return False
+
+
+class UndoStack:
+    # команды хранят только дельты; число команд ограничено, старые
+    # отбрасываются, поэтому длинная сессия не растит память
+    def __init__(self, limit=500):
+        self.limit = limit
+        self.done = []
+        self.undone = []
+
+    def push(self, command):
+        self.undone = []
+        if self.done and self.done[-1].merge(command):
+            if self.done[-1].is_noop():
+                self.done.pop()
+            return
+        self.done.append(command)
+        if len(self.done) > self.limit:
+            del self.done[: len(self.done) - self.limit]
+
+    def undo(self, target):
+        if not self.done:
+            return None
+        command = self.done.pop()
+        row = command.undo(target)
+        self.undone.append(command)
+        return row
+
+    def redo(self, target):
+        if not self.undone:
+            return None
+        command = self.undone.pop()
+        row = command.redo(target)
+        self.done.append(command)
+        return row
+
+    def clear(self):
+        self.done = []
+        self.undone = []
+
+    def can_undo(self):
+        return bool(self.done)
+
+    def can_redo(self):
+        return bool(self.undone)
@@ -1,35 +1,249 @@
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from core.flow_graph import flow_reference, resolve_flow_path
+from core.paths import state_dir
+from core.project_index import scan_tests
+from core.step import MaestroStep
+from core.tracing import traced
+from core.yaml_service import parse_flow
+
+
 class ValidationError:
-    def __init__(self, step_index, message):
+    def __init__(self, step_index, message, path=None):
         self.step_index = step_index
         self.message = message
+        self.path = path
 
     def __str__(self):
-        return f"Step {self.step_index + 1}: {self.message}"
+        if self.step_index is None:
+            text = self.message
+        else:
+            text = f"Step {self.step_index + 1}: {self.message}"
+        return f"{self.path}: {text}" if self.path else text
+
+
+class ValidationContext:
+    # путь проверяемого потока и общий кэш stat для проверок между файлами
+    def __init__(self, path, tests_dir, stat_cache=None):
+        self.path = path
+        self.tests_dir = tests_dir
+        self.stat_cache = stat_cache or StatCache()
+
+
+class StatCache:
+    def __init__(self):
+        self.known = {}
+
+    def isfile(self, path):
+        exists = self.known.get(path)
+        if exists is None:
+            exists = self.known[path] = os.path.isfile(path)
+        return exists
+
+
+def has_selector(step):
+    # tapOn: "Login" — короткая форма с текстом
+    return bool(step.params) or isinstance(step_value(step), str)
+
+
+def step_value(step):
+    if step.raw is not None and isinstance(step.raw, dict):
+        return step.raw.get(step.step_type)
+    return None
+
+
+def check_tap_on(step, context):
+    if not has_selector(step):
+        return "tapOn требует id или text"
+
+
+def check_input_text_text(step, context):
+    if "text" not in step.params:
+        return "inputText требует text"
+
+
+def check_input_text_target(step, context):
+    if not any(k in step.params for k in ("id", "text")):
+        return "inputText требует цель (id)"
+
+
+def check_assert_visible(step, context):
+    if not step.params.get("id") and not step.params.get("text"):
+        if not isinstance(step_value(step), str):
+            return "assertVisible требует указать id или text"
+
+
+def check_run_flow_file(step, context):
+    if not flow_reference(step):
+        return "runFlow требует указать file"
+
+
+def check_run_flow_target(step, context):
+    ref = flow_reference(step)
+    if not ref or context is None:
+        return None
+    target = resolve_flow_path(
+        ref, context.path, context.tests_dir, context.stat_cache.isfile
+    )
+    if not context.stat_cache.isfile(target):
+        return f"runFlow: файл не найден: {ref}"
+
+
+# правила на один шаг; проверки между файлами вынесены отдельно, чтобы
+# результат по шагам можно было кэшировать по хэшу содержимого файла
+STEP_RULES = {
+    "tapOn": [check_tap_on],
+    "inputText": [check_input_text_text, check_input_text_target],
+    "assertVisible": [check_assert_visible],
+    "runFlow": [check_run_flow_file],
+}
+
+CROSS_FILE_RULES = {
+    "runFlow": [check_run_flow_target],
+}
 
 
 class StepValidator:
     @staticmethod
-    def validate(steps):
+    @traced("StepValidator.validate")
+    def validate(steps, context=None):
         errors = []
-
         for i, step in enumerate(steps):
-            if step.step_type == "tapOn":
-                if not step.params:
-                    errors.append(ValidationError(i, "tapOn требует id или text"))
-
-            if step.step_type == "inputText":
-                if "text" not in step.params:
-                    errors.append(ValidationError(i, "inputText требует text"))
-                if not any(k in step.params for k in ("id", "text")):
-                    errors.append(ValidationError(i, "inputText требует цель (id)"))
-
-            if step.step_type == "assertVisible":
-                if not step.params.get("id") and not step.params.get("text"):
-                    errors.append(
-                        ValidationError(i, "assertVisible требует указать id или text")
-                    )
-            if step.step_type == "runFlow":
-                if not step.params.get("file"):
-                    errors.append(ValidationError(i, "runFlow требует указать file"))
+            errors += StepValidator.check(i, step, STEP_RULES, None)
+            if context is not None:
+                errors += StepValidator.check(i, step, CROSS_FILE_RULES, context)
+        return errors
+
+    @staticmethod
+    def check(index, step, rules, context):
+        errors = []
+        for rule in rules.get(step.step_type, ()):
+            message = rule(step, context)
+            if message:
+                errors.append(ValidationError(index, message))
+        return errors
+
+
+def validate_file(full_path):
+    # выполняется в рабочем процессе: разбор и проверки одного файла
+    with open(full_path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha1(data).hexdigest()
+    try:
+        _, steps = parse_flow(data.decode("utf-8"))
+    except Exception as e:
+        message = " ".join(str(e).split())
+        return digest, [[None, f"YAML не разобран: {message}"]], []
+
+    errors = [[e.step_index, e.message] for e in StepValidator.validate(steps)]
+    refs = []
+    for i, step in enumerate(steps):
+        if step.step_type in CROSS_FILE_RULES:
+            refs.append([i, step.to_dict()])
+    return digest, errors, refs
+
 
+class ProjectValidator:
+    CACHE_FILE = "validation.json"
+    VERSION = 1
+    # на мелких проектах запуск процессов дороже самой проверки
+    PARALLEL_THRESHOLD = 16
+
+    def __init__(self, project_dir, tests_dir, workers=None):
+        self.tests_dir = tests_dir
+        self.cache_path = os.path.join(state_dir(project_dir), self.CACHE_FILE)
+        self.workers = workers or os.cpu_count() or 1
+        self.results = {}
+        self.revalidated = 0
+
+    def load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != self.VERSION:
+            return {}
+        return data.get("files", {})
+
+    def save_cache(self):
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.VERSION, "files": self.results}, f, default=str)
+        os.replace(tmp_path, self.cache_path)
+
+    def validate(self, entries=None):
+        if entries is None:
+            entries = scan_tests(self.tests_dir)
+        cached = self.load_cache()
+        self.results = {}
+
+        # файл с теми же mtime/size не читаем; иначе сверяем хэш содержимого
+        pending = []
+        for path, identity in entries.items():
+            result = cached.get(path)
+            if result and result["identity"] == list(identity):
+                self.results[path] = result
+                continue
+            full_path = os.path.join(self.tests_dir, path)
+            if result and result["digest"] == file_digest(full_path):
+                result["identity"] = list(identity)
+                self.results[path] = result
+                continue
+            pending.append(path)
+
+        self.revalidated = len(pending)
+        for path, (digest, errors, refs) in zip(pending, self.run(pending)):
+            self.results[path] = {
+                "identity": list(entries[path]),
+                "digest": digest,
+                "errors": errors,
+                "refs": refs,
+            }
+        self.save_cache()
+        return self.collect_errors()
+
+    def run(self, paths):
+        full_paths = [os.path.join(self.tests_dir, path) for path in paths]
+        if len(full_paths) < self.PARALLEL_THRESHOLD or self.workers < 2:
+            return [validate_file(path) for path in full_paths]
+        # spawn: fork из процесса с потоками Qt может зависнуть
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(self.workers, mp_context=context) as pool:
+            chunksize = max(len(full_paths) // (self.workers * 4), 1)
+            return list(pool.map(validate_file, full_paths, chunksize=chunksize))
+
+    def collect_errors(self):
+        errors = []
+        stat_cache = StatCache()
+        for path in sorted(self.results):
+            result = self.results[path]
+            for index, message in result["errors"]:
+                errors.append(ValidationError(index, message, path))
+
+            context = ValidationContext(
+                os.path.join(self.tests_dir, path), self.tests_dir, stat_cache
+            )
+            for index, data in result["refs"]:
+                if isinstance(data, dict):
+                    step = MaestroStep.from_dict(data)
+                else:
+                    step = MaestroStep(data)
+                for error in StepValidator.check(
+                    index, step, CROSS_FILE_RULES, context
+                ):
+                    error.path = path
+                    errors.append(error)
         return errors
+
+
+def file_digest(path):
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
@@ -0,0 +1,102 @@
+import yaml
+from yaml.composer import Composer
+from yaml.constructor import SafeConstructor
+from yaml.events import SequenceEndEvent, SequenceStartEvent, StreamEndEvent
+from yaml.resolver import Resolver
+
+# libyaml ускоряет разбор и запись в разы; без него — чистый Python
+try:
+    from yaml import CSafeDumper as Dumper
+    from yaml import CSafeLoader as Loader
+    from yaml._yaml import CParser
+
+    class EventLoader(CParser, Composer, SafeConstructor, Resolver):
+        # события от libyaml, узлы собираются по одному элементу
+        def __init__(self, stream):
+            CParser.__init__(self, stream)
+            Composer.__init__(self)
+            SafeConstructor.__init__(self)
+            Resolver.__init__(self)
+
+    LIBYAML = True
+except ImportError:
+    from yaml import SafeDumper as Dumper
+    from yaml import SafeLoader as Loader
+
+    EventLoader = yaml.SafeLoader
+
+    LIBYAML = False
+
+PURE_LOADER = yaml.SafeLoader
+PURE_DUMPER = yaml.SafeDumper
+
+
+def load(stream, loader=None):
+    return yaml.load(stream, Loader=loader or Loader)
+
+
+def load_all(stream, loader=None):
+    return list(yaml.load_all(stream, Loader=loader or Loader))
+
+
+def iter_items(stream, loader=None):
+    # потоковый разбор: (номер документа, значение, элемент_ли). Документ,
+    # который целиком является списком, отдаётся поэлементно, не дожидаясь
+    # конца документа
+    loader = (loader or EventLoader)(stream)
+    try:
+        loader.get_event()  # StreamStartEvent
+        index = 0
+        while not loader.check_event(StreamEndEvent):
+            loader.get_event()  # DocumentStartEvent
+            if loader.check_event(SequenceStartEvent):
+                loader.get_event()
+                while not loader.check_event(SequenceEndEvent):
+                    node = loader.compose_node(None, None)
+                    yield index, loader.construct_document(node), True
+                loader.get_event()
+            else:
+                node = loader.compose_node(None, None)
+                yield index, loader.construct_document(node), False
+            loader.get_event()  # DocumentEndEvent
+            loader.anchors = {}
+            index += 1
+    finally:
+        loader.dispose()
+
+
+def dump(data, stream=None, dumper=None):
+    return write(yaml.dump, data, stream, dumper)
+
+
+def dump_list(items, dumper=None):
+    dumper = dumper or Dumper
+    text = yaml.dump(items, Dumper=dumper, sort_keys=False, allow_unicode=True)
+    if needs_pure_dump(text, dumper):
+        # на чистый Python переписываем только затронутые элементы;
+        # склейка дампов элементов совпадает с дампом всего списка
+        text = "".join(dump([item], dumper=dumper) for item in items)
+    return text
+
+
+def dump_all(documents, stream=None, dumper=None):
+    return write(yaml.dump_all, documents, stream, dumper, explicit_start=False)
+
+
+def write(dump_func, data, stream, dumper, **options):
+    dumper = dumper or Dumper
+    options.update(sort_keys=False, allow_unicode=True)
+    text = dump_func(data, Dumper=dumper, **options)
+    if needs_pure_dump(text, dumper):
+        text = dump_func(data, Dumper=PURE_DUMPER, **options)
+
+    if stream is None:
+        return text
+    stream.write(text)
+
+
+def needs_pure_dump(text, dumper):
+    # libyaml иначе переносит длинные строки в двойных кавычках и экранирует
+    # символы вне BMP (эмодзи); такие документы пишем чистым Python,
+    # чтобы файл не зависел от наличия libyaml
+    return dumper is not PURE_DUMPER and '"' in text
@@ -1,20 +1,76 @@
 import os
-import tempfile
-
-import yaml
 
+from core import yaml_backend
+from core.files import write_if_changed
+from core.flow_cache import FlowCache, content_digest
 from core.step import MaestroStep
+from core.tracing import span, traced
+
+
+def steps_to_yaml(steps, dumper=None):
+    return yaml_backend.dump_list([step.to_dict() for step in steps], dumper=dumper)
+
+
+def yaml_header(app_id, dumper=None):
+    return yaml_backend.dump({"appId": app_id}, dumper=dumper) + "---\n"
+
+
+def flow_to_yaml(app_id, steps, dumper=None):
+    # Первый документ — appId, второй — шаги
+    text = steps_to_yaml(steps, dumper=dumper)
+    if app_id:
+        return yaml_header(app_id, dumper=dumper) + text
+    return text
+
+
+def step_to_yaml(step):
+    # фрагмент одного шага; склейка фрагментов совпадает с дампом всего списка
+    return yaml_backend.dump([step.to_dict()])
+
+
+class StepYamlCache:
+    def __init__(self):
+        self.fragments = {}
+
+    def invalidate(self, step):
+        self.fragments.pop(step, None)
 
+    def clear(self):
+        self.fragments = {}
 
-def steps_to_yaml(steps):
-    return yaml.dump(
-        [step.to_dict() for step in steps], sort_keys=False, allow_unicode=True
-    )
+    def flow_fragments(self, app_id, steps):
+        fragments = []
+        if app_id:
+            fragments.append(yaml_header(app_id))
+
+        if not steps:
+            fragments.append("[]\n")
+            self.fragments = {}
+            return fragments
+
+        # собираем заново, чтобы не держать фрагменты удалённых шагов
+        cached = self.fragments
+        self.fragments = {}
+        for step in steps:
+            fragment = cached.get(step)
+            if fragment is None:
+                fragment = step_to_yaml(step)
+            self.fragments[step] = fragment
+            fragments.append(fragment)
+        return fragments
 
 
 def yaml_to_steps(text):
+    return flow_cache.parse(text)
+
+
+def load_flow(path):
+    return flow_cache.load(path)
+
+
+def parse_flow(text, loader=None):
     steps = []
-    docs = list(yaml.safe_load_all(text))
+    docs = yaml_backend.load_all(text, loader=loader)
 
     if not docs:
         return None, steps
@@ -25,57 +81,75 @@ def yaml_to_steps(text):
 
     # Остальные документы — список шагов
     for doc in docs[1:]:
-        if isinstance(doc, list):
-            for item in doc:
-                if isinstance(item, dict):
-                    steps.append(MaestroStep.from_dict(item))
-                elif isinstance(item, str):
-                    # простой шаг без параметров
-                    steps.append(MaestroStep(item, params={}))
-        elif isinstance(doc, dict):
-            steps.append(MaestroStep.from_dict(doc))
-        elif isinstance(doc, str):
-            steps.append(MaestroStep(doc, params={}))
+        items = doc if isinstance(doc, list) else [doc]
+        for item in items:
+            step = item_to_step(item)
+            if step is not None:
+                steps.append(step)
 
     return app_id, steps
 
 
-def steps_to_temp_yaml(steps, app_id, project_dir):
-    fd, path = tempfile.mkstemp(suffix=".yaml")
-    os.close(fd)
+def item_to_step(item):
+    if isinstance(item, dict):
+        return MaestroStep.from_dict(item)
+    if isinstance(item, str):
+        # простой шаг без параметров
+        return MaestroStep(item, params={})
+    return None
 
-    documents = []
 
-    # 1️⃣ appId как первый документ
-    if app_id:
-        documents.append({"appId": app_id})
-
-    # 2️⃣ список шагов как ВТОРОЙ документ
-    step_docs = []
-    for step in steps:
-        step_docs.append(step.to_dict())
-
-    documents.append(step_docs)
+STREAM_CHUNK = 200
 
-    with open(path, "w", encoding="utf-8") as f:
-        yaml.safe_dump_all(
-            documents,
-            f,
-            sort_keys=False,
-            allow_unicode=True,
-            explicit_start=False,  # важно!
-        )
 
-    return path
+def stream_flow(path, chunk_size=STREAM_CHUNK):
+    # отдаёт (app_id, порция шагов) по мере разбора; последняя порция может
+    # быть пустой. Полностью прочитанный поток попадает в flow_cache, брошенный
+    # на середине (генератор закрыт) — нет
+    stat = os.stat(path)
+    flow = flow_cache.find(path, stat)
+    if flow is None:
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = content_digest(data)
+        flow = flow_cache.find_digest(digest)
 
+    if flow is not None:
+        for start in range(0, len(flow.steps), chunk_size):
+            chunk = flow.steps[start : start + chunk_size]
+            yield flow.app_id, [step.copy() for step in chunk]
+        yield flow.app_id, []
+        flow_cache.remember(path, stat, flow)
+        return
 
+    app_id = None
+    steps = []
+    chunk = []
+    for index, value, is_item in yaml_backend.iter_items(data.decode("utf-8")):
+        if index == 0:
+            # первый документ — appId, шаги в нём не ищем
+            if not is_item and isinstance(value, dict):
+                app_id = value.get("appId")
+            continue
+        step = item_to_step(value)
+        if step is None:
+            continue
+        steps.append(step)
+        chunk.append(step.copy())
+        if len(chunk) >= chunk_size:
+            yield app_id, chunk
+            chunk = []
+    yield app_id, chunk
+
+    flow = flow_cache.add(digest, app_id, steps, len(data))
+    flow_cache.remember(path, stat, flow)
+
+
+flow_cache = FlowCache(parse_flow)
+
+
+@traced()
 def save_maestro_yaml(file_path: str, app_id: str, steps: list):
-    with open(file_path, "w", encoding="utf-8") as f:
-        # Первый документ — appId
-        if app_id:
-            yaml.dump({"appId": app_id}, f, sort_keys=False, allow_unicode=True)
-            f.write("---\n")
-
-        # Второй документ — шаги
-        step_list = [step.to_dict() for step in steps]
-        yaml.dump(step_list, f, sort_keys=False, allow_unicode=True)
+    with span("flow_to_yaml", steps=len(steps)):
+        text = flow_to_yaml(app_id, steps)
+    return write_if_changed(file_path, text.encode("utf-8"))
@@ -1,11 +1,22 @@
 import sys
 
-from PyQt5.QtWidgets import QApplication
+from core.cli import COMMANDS
 
-from ui.main_window import MainWindow
 
-if __name__ == "__main__":
+def run_gui():
+    from PyQt5.QtWidgets import QApplication
+
+    from ui.main_window import MainWindow
+
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
-    sys.exit(app.exec_())
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] and sys.argv[1] in COMMANDS:
+        from core.cli import main
+
+        sys.exit(main(sys.argv[1:]))
+    sys.exit(run_gui())
@@ -0,0 +1,100 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUB_DIR = os.path.join(ROOT, "benchmarks", "stub")
+
+pytestmark = pytest.mark.skipif(
+    os.name != "posix", reason="process groups and killpg are POSIX only"
+)
+
+
+def wait_for(condition, timeout=15):
+    deadline = time.monotonic() + timeout
+    while True:
+        value = condition()
+        if value:
+            return value
+        if time.monotonic() > deadline:
+            raise TimeoutError("condition not met")
+        time.sleep(0.05)
+
+
+def process_groups():
+    # {pgid: [pid, ...]} по /proc, без psutil
+    groups = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            pgid = os.getpgid(int(name))
+        except (ProcessLookupError, PermissionError):
+            continue
+        groups.setdefault(pgid, []).append(int(name))
+    return groups
+
+
+def children(pid):
+    result = []
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", "r") as f:
+                # pid (comm) state ppid ...
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            result.append(int(name))
+    return result
+
+
+def group_alive(pgid):
+    try:
+        os.killpg(pgid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+@pytest.mark.parametrize("signum", [signal.SIGTERM, signal.SIGHUP])
+def test_stop_signal_kills_maestro_process_group(tmp_path, signum):
+    tests_dir = tmp_path / "tests"
+    tests_dir.mkdir()
+    # заглушка зависает на втором шаге "hang"-потока, запустив дочерний процесс
+    (tests_dir / "hang.yaml").write_text("appId: x\n---\n- launchApp\n- back\n")
+    (tests_dir / "ok.yaml").write_text("appId: x\n---\n- launchApp\n")
+
+    env = dict(os.environ)
+    env["PATH"] = STUB_DIR + os.pathsep + env.get("PATH", "")
+    env["PYTHONPATH"] = ROOT
+    cli = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "main.py"), "run"]
+        + ["--project", str(tmp_path), "hang.yaml", "ok.yaml"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=env,
+    )
+    maestro = None
+    try:
+        # maestro запущен в своей сессии: его pgid равен его pid
+        maestro = wait_for(lambda: children(cli.pid))[0]
+        wait_for(lambda: len(process_groups().get(maestro, [])) >= 2)
+
+        cli.send_signal(signum)
+        code = cli.wait(timeout=15)
+        # сироты достаются init, ему нужно мгновение, чтобы их собрать
+        wait_for(lambda: not group_alive(maestro), timeout=2)
+        assert code == 128 + signum
+    finally:
+        if cli.poll() is None:
+            cli.kill()
+        if maestro is not None and group_alive(maestro):
+            os.killpg(maestro, signal.SIGKILL)
@@ -0,0 +1,67 @@
+from core.step import MaestroStep
+from core.undo import ParamsChange, UndoStack, params_diff
+
+
+class Target:
+    # то же, что MainWindow отдаёт командам отмены, без Qt
+    def __init__(self, steps):
+        self.steps = steps
+
+    def step_at(self, row):
+        return self.steps[row]
+
+    def set_step_params(self, row, params, raw):
+        self.steps[row].set_params(params)
+        self.steps[row].raw = raw
+
+
+def type_text(stack, step, *values):
+    # каждое значение — как один набранный символ в поле id
+    for value in values:
+        old = step.params
+        step.set_params({"id": value})
+        stack.push(ParamsChange(0, params_diff(old, step.params)))
+
+
+def test_coalesced_edits_that_cancel_out_leave_nothing_to_undo():
+    step = MaestroStep("tapOn", {"id": "a"})
+    target = Target([step])
+    stack = UndoStack()
+
+    type_text(stack, step, "ab", "a")
+
+    assert not stack.can_undo()
+    assert stack.undo(target) is None
+    assert stack.redo(target) is None
+    assert dict(step.params) == {"id": "a"}
+
+
+def test_cancelled_edit_does_not_merge_into_later_typing():
+    step = MaestroStep("tapOn", {"id": "a"})
+    target = Target([step])
+    stack = UndoStack()
+
+    type_text(stack, step, "ab", "a", "ac")
+    stack.undo(target)
+    assert dict(step.params) == {"id": "a"}
+    stack.redo(target)
+    assert dict(step.params) == {"id": "ac"}
+
+
+def test_empty_merge_keeps_command_that_restores_raw():
+    step = MaestroStep("tapOn", {"id": "a"}, raw={"tapOn": {"id": "a"}})
+    target = Target([step])
+    stack = UndoStack()
+
+    old = step.params
+    step.set_params({"id": "ab"})
+    stack.push(ParamsChange(0, params_diff(old, step.params), {"tapOn": {"id": "a"}}))
+    type_text(stack, step, "a")
+
+    assert stack.can_undo()
+    stack.undo(target)
+    assert step.raw == {"tapOn": {"id": "a"}}
+    assert dict(step.params) == {"id": "a"}
+    stack.redo(target)
+    assert step.raw is None
+    assert dict(step.params) == {"id": "a"}
@@ -0,0 +1,36 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from core.yaml_service import stream_flow
+
+
+class FlowLoader(QThread):
+    chunk = pyqtSignal(object, list)  # app_id, шаги
+    loaded = pyqtSignal(int)
+    failed = pyqtSignal(str)
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.cancelled = False
+
+    def cancel(self):
+        # проверяется между порциями; недочитанный поток в кэш не попадает
+        self.cancelled = True
+
+    def run(self):
+        count = 0
+        chunks = stream_flow(self.path)
+        try:
+            for app_id, steps in chunks:
+                if self.cancelled:
+                    return
+                count += len(steps)
+                self.chunk.emit(app_id, steps)
+        except Exception as e:
+            if not self.cancelled:
+                self.failed.emit(str(e))
+            return
+        finally:
+            chunks.close()
+        if not self.cancelled:
+            self.loaded.emit(count)
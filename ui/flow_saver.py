@@ -0,0 +1,73 @@
+from collections import OrderedDict
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from core.yaml_service import save_maestro_yaml
+from ui.worker import FunctionThread
+
+
+class FlowSaver(QObject):
+    saved = pyqtSignal(str, bool)  # путь, был ли файл переписан
+    failed = pyqtSignal(str, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.thread = None
+        self.current = None
+        self.result = None
+        # путь -> (app_id, шаги, колбэки); повторное сохранение того же файла,
+        # пока предыдущее ждёт очереди, заменяет его
+        self.pending = OrderedDict()
+
+    def save(self, path, app_id, steps, callback=None):
+        # снимок шагов: правки в UI во время записи не попадают в файл наполовину
+        snapshot = [step.copy() for step in steps]
+        _, _, callbacks = self.pending.pop(path, (None, None, []))
+        if callback:
+            callbacks.append(callback)
+        self.pending[path] = (app_id, snapshot, callbacks)
+        self.start_next()
+
+    def is_busy(self):
+        return self.thread is not None or bool(self.pending)
+
+    def start_next(self):
+        if self.thread is not None or not self.pending:
+            return
+        path, (app_id, steps, callbacks) = self.pending.popitem(last=False)
+        self.current = (path, callbacks)
+        self.result = None
+        self.thread = FunctionThread(save_maestro_yaml, path, app_id, steps)
+        self.thread.done.connect(self.on_done)
+        self.thread.failed.connect(self.on_failed)
+        self.thread.finished.connect(self.on_thread_finished)
+        self.thread.start()
+
+    def on_done(self, written):
+        self.result = (True, written)
+
+    def on_failed(self, message):
+        self.result = (False, message)
+
+    def on_thread_finished(self):
+        # ссылку на поток держим до finished, иначе QThread удалится живым
+        path, callbacks = self.current
+        ok, value = self.result or (False, "save thread stopped")
+        self.thread = None
+        self.current = None
+
+        if ok:
+            self.saved.emit(path, value)
+            for callback in callbacks:
+                callback(value)
+        else:
+            self.failed.emit(path, value)
+        self.start_next()
+
+    def flush(self):
+        # при закрытии окна: дожидаемся записи и дописываем очередь сразу
+        if self.thread is not None:
+            self.thread.wait()
+        while self.pending:
+            path, (app_id, steps, _) = self.pending.popitem(last=False)
+            save_maestro_yaml(path, app_id, steps)
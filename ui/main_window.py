@@ -1,13 +1,15 @@
 import os
+import shutil
 import sys
 
-import yaml
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import QModelIndex
 from PyQt5.QtGui import QIcon, QKeySequence
 from PyQt5.QtWidgets import (
     QAbstractItemView,
+    QDialog,
     QFileDialog,
     QHBoxLayout,
+    QInputDialog,
     QLabel,
     QLineEdit,
     QListWidget,
@@ -16,17 +18,53 @@ from PyQt5.QtWidgets import (
     QMessageBox,
     QPushButton,
     QShortcut,
-    QTextEdit,
     QVBoxLayout,
     QWidget,
 )
 
-from core.runner import MaestroRunner
+from core import yaml_backend
+from core.config import load_config, run_devices, run_limits
+from core.flow_compiler import CompileError, FlowCompiler
+from core.flow_graph import FlowGraph
+from core.matrix import MatrixError, make_job, matrix_jobs
+from core.paths import log_file_name, new_run_log_dir
+from core.project_index import ProjectIndex
+from core.run_queue import DurationHistory
+from core.run_report import LastRun, job_status, write_junit
+from core.selector_index import APP_ID, SelectorIndex, apply_changes, step_selectors
 from core.step import MaestroStep
-from core.validator import StepValidator
-from core.yaml_service import save_maestro_yaml
-from ui.step_editors.factory import StepEditorFactory
+from core.timing_history import TimingHistory
+from core.tracing import ENV_VAR, tracer, traced
+from core.undo import (
+    DeleteStep,
+    InsertStep,
+    MoveStep,
+    ParamsChange,
+    UndoStack,
+    params_diff,
+)
+from core.validator import ProjectValidator, StepValidator, ValidationContext
+from core.yaml_service import (
+    StepYamlCache,
+    flow_cache,
+    save_maestro_yaml,
+)
+from ui.flow_loader import FlowLoader
+from ui.flow_saver import FlowSaver
+from ui.project_watcher import ProjectWatcher
+from ui.runners import MaestroRunner, RunQueue
+from ui.stall_monitor import StallMonitor
+from ui.step_editors.pool import StepEditorPool
+from ui.step_list import StepListModel, StepListView
 from ui.widgets.log_view import LogView
+from ui.widgets.matrix_report import MatrixReport
+from ui.widgets.memory_report import MemoryReport
+from ui.worker import FunctionThread
+from ui.widgets.run_results import RunResultsView
+from ui.widgets.selector_usages import RenamePreviewDialog, SelectorUsagesDialog
+from ui.widgets.timing_report import TimingReport
+from ui.widgets.trace_overlay import TraceOverlay
+from ui.widgets.yaml_preview import YamlPreview
 
 
 class MainWindow(QMainWindow):
@@ -38,6 +76,27 @@ class MainWindow(QMainWindow):
         self.project_dir = None
         self.tests_dir = None
         self.current_test_name = None
+        self.config = {}
+        self.run_queue = None
+        self.project_index = None
+        self.project_watcher = None
+        self.flow_graph = None
+        self.validation_thread = None
+        self.flow_loader = None
+        self.timings = None
+        self.last_run = None
+        self.flow_compiler = None
+        self.selector_index = None
+        self.rename_thread = None
+        self.usages_dialog = None
+        self.pending_step_row = None
+        self.runner = None
+        self.memory_report = None
+        self.matrix_report = None
+        self.flow_saver = FlowSaver(self)
+        self.flow_saver.saved.connect(self.on_test_saved)
+        self.flow_saver.failed.connect(self.on_test_save_failed)
+        self.test_items = {}
 
         self.central_widget = QWidget()
         self.setCentralWidget(self.central_widget)
@@ -56,6 +115,8 @@ class MainWindow(QMainWindow):
         # ==== Список тестов ====
         self.test_list_widget = QListWidget()
         self.test_list_widget.itemClicked.connect(self.on_test_selected)
+        self.test_list_widget.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.test_list_widget.setSortingEnabled(True)
         layout.addWidget(QLabel("Tests:"))
         layout.addWidget(self.test_list_widget)
 
@@ -96,15 +157,11 @@ class MainWindow(QMainWindow):
         btn_layout.addWidget(self.save_btn)
 
         # ==== Список шагов ====
-        self.step_list = QListWidget()
-        self.step_list.itemClicked.connect(self.on_step_selected)
-        self.step_list.setDragEnabled(True)
-        self.step_list.setAcceptDrops(True)
-        self.step_list.setDropIndicatorShown(True)
-        self.step_list.setDefaultDropAction(Qt.MoveAction)
-        self.step_list.setDragDropMode(QAbstractItemView.InternalMove)
-        self.step_list.setCursor(Qt.OpenHandCursor)
-        self.step_list.model().rowsMoved.connect(lambda *_: self.update_yaml())
+        self.step_model = StepListModel()
+        self.step_model.rowsMoved.connect(self.on_step_moved)
+        self.step_list = StepListView()
+        self.step_list.setModel(self.step_model)
+        self.step_list.selectionModel().currentRowChanged.connect(self.on_step_selected)
         layout.addWidget(QLabel("Steps:"))
         layout.addWidget(self.step_list)
 
@@ -151,24 +208,98 @@ class MainWindow(QMainWindow):
         self.delete_step_btn.setToolTip(tooltip)
         btn_layout.addWidget(self.delete_step_btn)
 
+        # ==== Undo / redo ====
+        self.undo_stack = UndoStack()
+        # (шаг, params, raw) на момент последней правки в редакторе
+        self.edit_base = None
+        self.replaying = False
+        self.add_shortcut(QKeySequence.Undo, self.undo, "Undo")
+        self.add_shortcut(QKeySequence.Redo, self.redo, "Redo")
+        self.add_shortcut("Ctrl+Y", self.redo, "Redo")
+
         # ==== Editor panel ====
-        self.editor_widget = QWidget()
-        self.editor_layout = QVBoxLayout()
-        self.editor_widget.setLayout(self.editor_layout)
-        layout.addWidget(QLabel("Step Editor:"))
-        layout.addWidget(self.editor_widget)
+        self.editor_pool = StepEditorPool()
+        self.editor_pool.changed.connect(self.on_step_edited)
+        self.find_usages_btn = QPushButton("Find usages")
+        self.find_usages_btn.clicked.connect(self.find_usages)
+        tooltip = self.add_shortcut("Alt+F7", self.find_usages, "Find usages")
+        self.find_usages_btn.setToolTip(tooltip)
+
+        editor_header = QHBoxLayout()
+        editor_header.addWidget(QLabel("Step Editor:"))
+        editor_header.addStretch()
+        editor_header.addWidget(self.find_usages_btn)
+        layout.addLayout(editor_header)
+        layout.addWidget(self.editor_pool)
 
         self.run_btn = QPushButton(" Run Maestro")
         self.run_btn.setIcon(self.icon("circle-play.svg"))
         self.run_btn.clicked.connect(self.run_maestro)
         tooltip = self.add_shortcut("Ctrl+R", self.run_maestro, "Run test")
         self.run_btn.setToolTip(tooltip)
-        layout.addWidget(self.run_btn)
+
+        self.run_selected_btn = QPushButton("Run Selected")
+        self.run_selected_btn.clicked.connect(self.run_selected_tests)
+        self.run_selected_btn.setToolTip("Run selected tests in parallel")
+
+        self.stop_btn = QPushButton("⏹ Stop")
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self.stop_run)
+        tooltip = self.add_shortcut("Ctrl+.", self.stop_run, "Stop the run")
+        self.stop_btn.setToolTip(tooltip)
+
+        self.run_all_btn = QPushButton("Run All")
+        self.run_all_btn.clicked.connect(self.run_all_tests)
+        self.run_all_btn.setToolTip("Run all tests in parallel")
+
+        self.run_matrix_btn = QPushButton("Run Matrix")
+        self.run_matrix_btn.clicked.connect(self.run_matrix_tests)
+        self.run_matrix_btn.setToolTip(
+            "Run selected tests once per parameter set from config.yaml matrix"
+        )
+
+        self.rerun_failed_btn = QPushButton("Rerun Failed")
+        self.rerun_failed_btn.clicked.connect(self.rerun_failed_tests)
+        self.rerun_failed_btn.setToolTip(
+            "Run only tests that failed or were stopped in their last run"
+        )
+
+        self.select_impacted_btn = QPushButton("Select Impacted")
+        self.select_impacted_btn.clicked.connect(self.select_impacted_tests)
+        self.select_impacted_btn.setToolTip(
+            "Select top-level tests that call the selected flows via runFlow"
+        )
+
+        run_layout = QHBoxLayout()
+        run_layout.addWidget(self.run_btn)
+        run_layout.addWidget(self.stop_btn)
+        run_layout.addWidget(self.run_selected_btn)
+        run_layout.addWidget(self.run_all_btn)
+        run_layout.addWidget(self.run_matrix_btn)
+        run_layout.addWidget(self.rerun_failed_btn)
+        run_layout.addWidget(self.select_impacted_btn)
+
+        self.validate_project_btn = QPushButton("Validate Project")
+        self.validate_project_btn.clicked.connect(self.validate_project)
+        self.validate_project_btn.setToolTip("Validate every flow in the project")
+        run_layout.addWidget(self.validate_project_btn)
+
+        self.timings_btn = QPushButton("Timings")
+        self.timings_btn.clicked.connect(self.show_timings)
+        self.timings_btn.setToolTip("Slowest steps and run durations of this test")
+        run_layout.addWidget(self.timings_btn)
+
+        self.memory_btn = QPushButton("Memory")
+        self.memory_btn.clicked.connect(self.show_memory)
+        tooltip = self.add_shortcut("Ctrl+Shift+M", self.show_memory, "Memory usage")
+        self.memory_btn.setToolTip(tooltip)
+        run_layout.addWidget(self.memory_btn)
+        layout.addLayout(run_layout)
 
         # ==== Live YAML preview ====
 
-        self.yaml_preview = QTextEdit()
-        self.yaml_preview.setReadOnly(True)
+        self.yaml_cache = StepYamlCache()
+        self.yaml_preview = YamlPreview(source=self.yaml_fragments)
         # self.yaml_preview.setReadOnly(False)
         # self.yaml_preview.textChanged.connect(self.on_yaml_edited)
         layout.addWidget(QLabel("Live YAML Preview:"))
@@ -178,33 +309,88 @@ class MainWindow(QMainWindow):
         layout.addWidget(QLabel("Maestro output:"))
         layout.addWidget(self.log_view)
 
+        self.run_results = RunResultsView()
+        self.run_results.itemClicked.connect(self.on_run_result_selected)
+        layout.addWidget(QLabel("Suite results:"))
+        layout.addWidget(self.run_results)
+
+        # ==== Трассировка ====
+        self.stall_monitor = StallMonitor(self)
+        self.trace_overlay = TraceOverlay(self.central_widget)
+        self.add_shortcut("Ctrl+Shift+T", self.toggle_trace_overlay)
+        self.add_shortcut("Ctrl+Shift+E", self.export_trace)
+        if tracer.enabled:
+            self.stall_monitor.start()
+
     # ==== Project methods ====
     def open_project(self):
         project_dir = QFileDialog.getExistingDirectory(self, "Open Maestro Project")
-        if not project_dir:
-            return
+        if project_dir:
+            self.load_project(project_dir)
 
-        config_path = os.path.join(project_dir, "config.yaml")
-        if os.path.exists(config_path):
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = yaml.safe_load(f)
-                self.app_id_input.setText(config.get("appId", ""))
-        else:
-            self.app_id_input.setText("")
+    def load_project(self, project_dir):
+        config = load_config(project_dir)
+        self.app_id_input.setText(config.get("appId", ""))
+
+        self.config = config
+        flow_cache.max_bytes = int(config.get("flow_cache_mb", 64)) * 1024 * 1024
+        self.log_view.set_max_lines(int(config.get("log_max_lines", 5000)))
 
         self.project_dir = project_dir
         self.tests_dir = os.path.join(project_dir, "tests")
+        self.editor_pool.set_project_dir(project_dir)
         os.makedirs(self.tests_dir, exist_ok=True)
+
+        if self.project_watcher:
+            self.project_watcher.stop()
+        self.project_index = ProjectIndex(project_dir, self.tests_dir)
+        self.timings = TimingHistory(project_dir)
+        self.last_run = LastRun(project_dir)
+        self.flow_compiler = FlowCompiler(project_dir, self.tests_dir)
+        self.selector_index = SelectorIndex(self.tests_dir)
+        self.project_index.load()
+        self.flow_graph = FlowGraph(self.tests_dir)
         self.load_test_list()
 
+        self.project_watcher = ProjectWatcher(self.project_index)
+        self.project_watcher.changed.connect(self.apply_index_delta)
+        self.project_watcher.start()
+
+    @traced()
     def load_test_list(self):
         self.test_list_widget.clear()
-        for root, _, files in os.walk(self.tests_dir):
-            for file in files:
-                if file.endswith((".yaml", ".yml")):
-                    full_path = os.path.join(root, file)
-                    rel_path = os.path.relpath(full_path, self.tests_dir)
-                    self.test_list_widget.addItem(rel_path)
+        self.test_items = {}
+        for rel_path in self.project_index.tests():
+            self.add_test_item(rel_path)
+
+    def add_test_item(self, rel_path):
+        item = QListWidgetItem(rel_path)
+        self.test_items[rel_path] = item
+        self.test_list_widget.addItem(item)
+
+    def apply_index_delta(self, delta):
+        for rel_path in delta.removed:
+            item = self.test_items.pop(rel_path, None)
+            if item is not None:
+                self.test_list_widget.takeItem(self.test_list_widget.row(item))
+
+        for old_path, new_path in delta.renamed:
+            item = self.test_items.pop(old_path, None)
+            if item is None:
+                self.add_test_item(new_path)
+                continue
+            item.setText(new_path)
+            self.test_items[new_path] = item
+            if self.current_test_name == old_path:
+                self.current_test_name = new_path
+
+        for rel_path in delta.added:
+            if rel_path not in self.test_items:
+                self.add_test_item(rel_path)
+
+    def refresh_test_dir(self, path):
+        if self.project_watcher:
+            self.project_watcher.rescan(os.path.dirname(path))
 
     def on_test_selected(self, item: QListWidgetItem):
         self.current_test_name = item.text()
@@ -222,13 +408,16 @@ class MainWindow(QMainWindow):
         if not file_name.lower().endswith((".yaml", ".yml")):
             file_name += ".yaml"
 
-        self.current_test_name = os.path.basename(file_name)
+        if self.tests_dir:
+            self.current_test_name = os.path.relpath(file_name, self.tests_dir)
+        else:
+            self.current_test_name = os.path.basename(file_name)
         save_maestro_yaml(file_name, self.app_id_input.text(), [])
-        self.load_test_list()
-        items = self.test_list_widget.findItems(self.current_test_name, Qt.MatchExactly)
-        if items:
-            self.test_list_widget.setCurrentItem(items[0])
-            self.on_test_selected(items[0])
+        self.refresh_test_dir(file_name)
+        item = self.test_items.get(self.current_test_name)
+        if item:
+            self.test_list_widget.setCurrentItem(item)
+            self.on_test_selected(item)
 
     def delete_test(self):
         if not self.confirm(
@@ -237,9 +426,9 @@ class MainWindow(QMainWindow):
             return
         path = os.path.join(self.tests_dir, self.current_test_name)
         os.remove(path)
-        self.load_test_list()
-        self.step_list.clear()
-        pass
+        self.refresh_test_dir(path)
+        self.step_model.set_steps([])
+        self.undo_stack.clear()
 
     def confirm(self, title, text):
         reply = QMessageBox.question(
@@ -250,148 +439,349 @@ class MainWindow(QMainWindow):
     # ==== Steps methods ====
     def add_step(self, step_type):
         step = MaestroStep(step_type, params={})
-        item = QListWidgetItem(step.display_name())
-        item.setData(1, step)
-        self.step_list.addItem(item)
-        self.step_list.setCurrentItem(item)
-        self.on_step_selected(item)
+        row = self.step_model.append(step)
+        self.undo_stack.push(InsertStep(row, step))
+        self.step_list.set_current_row(row)
         self.update_yaml()
 
-    def on_step_selected(self, item):
+    def current_step(self):
+        row = self.step_list.current_row()
+        if row < 0:
+            return None
+        return self.step_model.steps[row]
+
+    @traced()
+    def on_step_selected(self, current, previous=None):
         self.clear_editor()
-        step = item.data(1)
-        editor = StepEditorFactory.create(step, self.project_dir)
-        if editor:
-            self.wrap_editor_with_update(editor)
-            self.editor_layout.addWidget(editor)
+        if not current.isValid():
+            return
+        step = self.step_model.steps[current.row()]
+        self.editor_pool.show_step(step)
+        self.edit_base = (step, step.params, step.raw)
         self.delete_step_btn.setEnabled(True)
-        self.update_yaml()
 
     def clear_editor(self):
-        for i in reversed(range(self.editor_layout.count())):
-            widget = self.editor_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
+        self.editor_pool.clear()
+        self.edit_base = None
         self.delete_step_btn.setEnabled(False)
 
     def delete_selected_step(self):
-        row = self.step_list.currentRow()
+        row = self.step_list.current_row()
         if row < 0:
             return
 
-        step = self.step_list.currentItem().data(1)
+        step = self.step_model.steps[row]
 
         if not self.confirm("Delete step", f"Удалить шаг:\n\n{step.display_name()} ?"):
             return
 
-        self.step_list.takeItem(row)
+        self.step_model.remove(row)
+        self.undo_stack.push(DeleteStep(row, step))
 
-        count = self.step_list.count()
+        count = self.step_model.rowCount()
 
         if count == 0:
             # шагов больше нет
             self.clear_editor()
-            self.delete_step_btn.setEnabled(False)
             self.update_yaml()
             return
 
         # выбираем новый активный шаг
-        if row < count:
-            new_row = row
-        else:
-            new_row = count - 1
+        self.step_list.set_current_row(min(row, count - 1))
+        self.update_yaml()
 
-        self.step_list.setCurrentRow(new_row)
-        item = self.step_list.currentItem()
-        if item:
-            self.on_step_selected(item)
+    def on_step_edited(self):
+        # обновляем отображение шага в списке
+        row = self.step_list.current_row()
+        if row >= 0:
+            step = self.step_model.steps[row]
+            self.record_params_change(row, step)
+            self.yaml_cache.invalidate(step)
+            self.step_model.step_changed(row)
+        self.update_yaml()
 
+    def record_params_change(self, row, step):
+        # params не меняются на месте (set_params), поэтому хватает ссылок
+        # на прошлый словарь; в стек уходит только разница
+        base = self.edit_base
+        self.edit_base = (step, step.params, step.raw)
+        if base is None or base[0] is not step:
+            return
+        _, old_params, old_raw = base
+        diff = params_diff(old_params or {}, step.params or {})
+        if diff or old_raw is not None:
+            self.undo_stack.push(ParamsChange(row, diff, old_raw))
+
+    def on_step_moved(self, parent, start, end, destination, row):
+        if not self.replaying:
+            # перетаскивание двигает по одной строке
+            self.undo_stack.push(MoveStep(start, row - 1 if row > start else row))
         self.update_yaml()
 
-    def wrap_editor_with_update(self, editor):
+    # ==== Undo / redo ====
+    def undo(self):
+        self.replay(self.undo_stack.undo)
+
+    def redo(self):
+        self.replay(self.undo_stack.redo)
+
+    def replay(self, action):
+        if self.is_flow_loading():
+            return
+        self.replaying = True
         try:
-            original_change = editor.on_change
-
-            def wrapped():
-                original_change()
-                # обновляем отображение шага в списке
-                current_item = self.step_list.currentItem()
-                if current_item:
-                    step = current_item.data(1)
-                    current_item.setText(step.display_name())
-                self.update_yaml()
-
-            editor.on_change = wrapped
-        except Exception as e:
-            pass
+            row = action(self)
+        finally:
+            self.replaying = False
+        if row is None:
+            return
+        if row < 0:
+            self.clear_editor()
+        elif row == self.step_list.current_row():
+            # та же строка — редактор надо перечитать из шага
+            self.on_step_selected(self.step_model.index(row))
+        else:
+            self.step_list.set_current_row(row)
+        self.update_yaml()
+
+    # цель команд из core.undo
+    def step_at(self, row):
+        return self.step_model.steps[row]
+
+    def step_count(self):
+        return self.step_model.rowCount()
+
+    def insert_step(self, row, step):
+        self.step_model.insert(row, step)
+
+    def remove_step(self, row):
+        self.yaml_cache.invalidate(self.step_model.remove(row))
+
+    def move_step(self, from_row, to_row):
+        dest_row = to_row + 1 if to_row > from_row else to_row
+        self.step_model.moveRow(QModelIndex(), from_row, QModelIndex(), dest_row)
+
+    def set_step_params(self, row, params, raw):
+        step = self.step_model.steps[row]
+        step.set_params(params)
+        step.raw = raw
+        self.yaml_cache.invalidate(step)
+        self.step_model.step_changed(row)
+
+    # ==== Selector usages ====
+    def current_selectors(self):
+        step = self.current_step()
+        selectors = list(step_selectors(step)) if step else []
+        if self.app_id_input.text():
+            selectors.append((APP_ID, self.app_id_input.text()))
+        return selectors
+
+    def find_usages(self):
+        if not self.project_index:
+            QMessageBox.warning(self, "Find usages", "Project is not opened")
+            return
+        selectors = self.current_selectors()
+        if not selectors:
+            self.statusBar().showMessage("No selectors in this step")
+            return
+
+        # индекс перечитывает только файлы, изменившиеся с прошлого раза
+        self.selector_index.sync(self.project_index.entries)
+        self.usages_dialog = SelectorUsagesDialog(selectors, self.selector_index, self)
+        self.usages_dialog.usage_activated.connect(self.open_usage)
+        self.usages_dialog.rename_requested.connect(self.rename_selector)
+        self.usages_dialog.exec_()
+        self.usages_dialog = None
+
+    def open_usage(self, path, step_index):
+        item = self.test_items.get(path)
+        if item is not None:
+            self.test_list_widget.setCurrentItem(item)
+        self.current_test_name = path
+        self.open_yaml(os.path.join(self.tests_dir, path), select_row=step_index)
+
+    def rename_selector(self, kind, old):
+        new, ok = QInputDialog.getText(
+            self, "Rename", f"New {kind} for “{old}”:", text=old
+        )
+        if not ok or new == old:
+            return
+
+        def plan(written=False):
+            # dry run в фоне: для большого проекта — в нескольких процессах
+            self.selector_index.sync(self.project_index.entries)
+            self.rename_thread = FunctionThread(
+                self.selector_index.plan_rename, kind, old, new
+            )
+            self.rename_thread.done.connect(self.on_rename_planned)
+            self.rename_thread.failed.connect(self.on_rename_failed)
+            self.rename_thread.start()
+
+        # несохранённые правки сначала попадают на диск
+        if not self.current_test_name or not self.save_current_test(False, plan):
+            plan()
+
+    def on_rename_planned(self, changes):
+        diff = "".join(change.diff(self.tests_dir) for change in changes)
+        preview = RenamePreviewDialog(diff, len(changes), self)
+        if preview.exec_() != QDialog.Accepted:
+            return
+        self.rename_thread = FunctionThread(apply_changes, changes)
+        self.rename_thread.done.connect(self.on_rename_applied)
+        self.rename_thread.failed.connect(self.on_rename_failed)
+        self.rename_thread.start()
+
+    def on_rename_applied(self, result):
+        written, conflicts = result
+        names = [os.path.relpath(path, self.tests_dir) for path in written]
+        for name in names:
+            if self.project_watcher:
+                self.project_watcher.refresh_file(name)
+            self.selector_index.update_file(name)
+        if self.current_test_name in names:
+            self.open_yaml(os.path.join(self.tests_dir, self.current_test_name))
+        if self.usages_dialog:
+            self.usages_dialog.show_usages()
+
+        text = f"{len(written)} files rewritten"
+        if conflicts:
+            text += (
+                f"\n{len(conflicts)} files changed since the preview and were skipped"
+            )
+        QMessageBox.information(self, "Rename", text)
+
+    def on_rename_failed(self, message):
+        QMessageBox.critical(self, "Rename", message)
 
     # ==== YAML methods ====
     def update_yaml(self):
-        import io
-
-        output = io.StringIO()
-        app_id = self.app_id_input.text()
-        if app_id:
-            yaml.dump({"appId": app_id}, output, sort_keys=False, allow_unicode=True)
-            output.write("---\n")
-        step_list = [
-            self.step_list.item(i).data(1).to_dict()
-            for i in range(self.step_list.count())
-        ]
-        yaml.dump(step_list, output, sort_keys=False, allow_unicode=True)
-        self.yaml_preview.setPlainText(output.getvalue())
+        self.yaml_preview.schedule()
+
+    def yaml_fragments(self):
+        return self.yaml_cache.flow_fragments(
+            self.app_id_input.text(), self.get_steps()
+        )
 
-    def save_current_test(self, show_message: bool = True):
+    def save_current_test(self, show_message: bool = True, then=None):
+        # запись идёт в фоне; then(written) вызывается после неё.
+        # Возвращает False, если сохранение не запущено
+        if self.is_flow_loading():
+            # недогруженный список шагов перезаписал бы файл обрезанным
+            self.statusBar().showMessage("Flow is still loading, not saved")
+            return False
         if not self.current_test_name:
             file_name, _ = QFileDialog.getSaveFileName(
                 self, "Save Test", self.tests_dir, "YAML Files (*.yaml *.yml)"
             )
             if not file_name:
-                return
-            self.current_test_name = os.path.basename(file_name)
+                return False
+            if self.tests_dir:
+                self.current_test_name = os.path.relpath(file_name, self.tests_dir)
+            else:
+                self.current_test_name = os.path.basename(file_name)
         else:
             file_name = os.path.join(self.tests_dir, self.current_test_name)
 
-        steps = [self.step_list.item(i).data(1) for i in range(self.step_list.count())]
-        save_maestro_yaml(file_name, self.app_id_input.text(), steps)
-        if show_message:
-            QMessageBox.information(self, "Saved", f"YAML сохранён: {file_name}")
+        def saved(written):
+            if show_message:
+                text = "YAML сохранён" if written else "Без изменений"
+                QMessageBox.information(self, "Saved", f"{text}: {file_name}")
+            if then:
+                then(written)
 
-    def open_yaml(self, path):
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                docs = list(yaml.safe_load_all(f))
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        self.flow_saver.save(
+            file_name, self.app_id_input.text(), self.get_steps(), saved
+        )
+        return True
+
+    def on_test_saved(self, path, written):
+        if not written:
+            self.statusBar().showMessage(f"No changes: {os.path.basename(path)}")
             return
+        self.statusBar().showMessage(f"Saved {os.path.basename(path)}")
+        if self.project_watcher and self.tests_dir:
+            self.project_watcher.refresh_file(os.path.relpath(path, self.tests_dir))
+
+    def on_test_save_failed(self, path, message):
+        QMessageBox.critical(self, "Save failed", f"{path}\n\n{message}")
+
+    @traced()
+    def open_yaml(self, path, select_row=None):
+        # разбор идёт в фоне порциями; выбор другого теста отменяет загрузку
+        self.cancel_flow_load()
+        self.pending_step_row = select_row
+        self.clear_editor()
+        self.step_model.set_steps([])
+        self.undo_stack.clear()
+        self.update_yaml()
 
-        # Первый документ — appId
-        first_doc = docs[0] if docs else {}
-        if isinstance(first_doc, dict) and "appId" in first_doc:
-            self.app_id_input.setText(first_doc["appId"])
-        else:
-            self.app_id_input.setText("")
-
-        # Остальные документы — шаги
-        self.step_list.clear()
-        for doc in docs[1:]:
-            if isinstance(doc, list):
-                for item in doc:
-                    if isinstance(item, dict):
-                        step = MaestroStep.from_dict(item)
-                    elif isinstance(item, str):
-                        step = MaestroStep(item, params={})
-                    else:
-                        continue
-                    item_widget = QListWidgetItem(step.display_name())
-                    item_widget.setData(1, step)
-                    self.step_list.addItem(item_widget)
+        loader = FlowLoader(path, parent=self)
+        loader.chunk.connect(self.on_flow_chunk)
+        loader.loaded.connect(self.on_flow_loaded)
+        loader.failed.connect(self.on_flow_load_failed)
+        loader.finished.connect(loader.deleteLater)
+        self.flow_loader = loader
+        self.statusBar().showMessage(f"Loading {os.path.basename(path)}…")
+        loader.start()
+
+    def cancel_flow_load(self):
+        if self.flow_loader is not None:
+            self.flow_loader.cancel()
+            self.flow_loader = None
+
+    def is_flow_loading(self):
+        return self.flow_loader is not None
+
+    @traced()
+    def on_flow_chunk(self, app_id, steps):
+        # сигналы отменённого загрузчика могут прийти уже после отмены
+        if self.sender() is not self.flow_loader:
+            return
+        if not self.step_model.steps:
+            self.app_id_input.setText(app_id or "")
+        self.step_model.extend(steps)
         self.update_yaml()
+        row = self.pending_step_row
+        if row is not None and row < self.step_model.rowCount():
+            self.pending_step_row = None
+            self.step_list.set_current_row(row)
+
+    def on_flow_load_failed(self, message):
+        if self.sender() is not self.flow_loader:
+            return
+        self.flow_loader = None
+        self.statusBar().clearMessage()
+        QMessageBox.critical(self, "Error", message)
+
+    def on_flow_loaded(self, count):
+        if self.sender() is not self.flow_loader:
+            return
+        self.flow_loader = None
+        stats = flow_cache.stats()
+        self.statusBar().showMessage(
+            f"Flow cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['flows']} flows, {stats['used_bytes'] // 1024} KiB"
+        )
+
+    def closeEvent(self, event):
+        loader = self.flow_loader
+        self.cancel_flow_load()
+        if loader is not None:
+            loader.wait()
+        if self.is_run_active():
+            # не оставляем maestro и JVM работать после выхода
+            self.stop_run()
+            if self.runner is not None:
+                self.runner.wait()
+            if self.run_queue is not None and self.run_queue.thread is not None:
+                self.run_queue.thread.wait()
+        self.flow_saver.flush()
+        super().closeEvent(event)
 
     def on_yaml_edited(self):
         text = self.yaml_preview.toPlainText()
         try:
-            docs = list(yaml.safe_load_all(text))
+            docs = yaml_backend.load_all(text)
             if not docs:
                 return
 
@@ -403,43 +793,55 @@ class MainWindow(QMainWindow):
                 self.app_id_input.blockSignals(False)
 
             # Остальные документы — шаги
-            self.step_list.clear()
+            steps = []
             for doc in docs[1:]:
                 if isinstance(doc, list):
                     for item in doc:
                         if isinstance(item, dict):
-                            step = MaestroStep.from_dict(item)
+                            steps.append(MaestroStep.from_dict(item))
                         elif isinstance(item, str):
-                            step = MaestroStep(item, params={})
-                        else:
-                            continue
-                        item_widget = QListWidgetItem(step.display_name())
-                        item_widget.setData(1, step)
-                        self.step_list.addItem(item_widget)
+                            steps.append(MaestroStep(item, params={}))
                 elif isinstance(doc, dict):
-                    step = MaestroStep.from_dict(doc)
-                    item_widget = QListWidgetItem(step.display_name())
-                    item_widget.setData(1, step)
-                    self.step_list.addItem(item_widget)
+                    steps.append(MaestroStep.from_dict(doc))
+            self.step_model.set_steps(steps)
         except Exception:
             # Ошибки синтаксиса YAML игнорируем временно
             pass
 
     def get_steps(self):
-        steps = []
-        for i in range(self.step_list.count()):
-            steps.append(self.step_list.item(i).data(1))
-        return steps
+        return self.step_model.steps
+
+    def is_run_active(self):
+        runner_active = self.runner is not None and self.runner.isRunning()
+        queue_active = self.run_queue is not None and self.run_queue.is_running()
+        return runner_active or queue_active
+
+    def stop_run(self):
+        if self.runner is not None and self.runner.isRunning():
+            self.runner.cancel()
+        if self.run_queue is not None and self.run_queue.is_running():
+            self.run_queue.cancel()
+        self.statusBar().showMessage("Stopping the run…")
 
     def run_maestro(self):
+        if self.is_run_active():
+            # повторный Ctrl+R не запускает второй maestro
+            self.statusBar().showMessage("A run is already in progress")
+            return
         if not self.current_test_name:
             QMessageBox.warning(self, "Run", "Test file is not selected")
             return
+        if self.is_flow_loading():
+            QMessageBox.warning(self, "Run", "Test is still loading")
+            return
 
         steps = self.get_steps()
 
         # 1️⃣ Валидация шагов
-        errors = StepValidator.validate(steps)
+        yaml_path = os.path.join(self.tests_dir, self.current_test_name)
+        errors = StepValidator.validate(
+            steps, ValidationContext(yaml_path, self.tests_dir)
+        )
 
         self.log_view.clear()
 
@@ -449,26 +851,364 @@ class MainWindow(QMainWindow):
                 self.log_view.append_line(str(err))
             return
 
-        # 2️⃣ Сохраняем текущий тест перед запуском
-        self.save_current_test(False)
+        # 2️⃣ Сохраняем текущий тест перед запуском, запуск — после записи
+        self.save_current_test(False, lambda written: self.start_maestro(yaml_path))
 
+    def start_maestro(self, yaml_path):
+        if self.is_run_active():
+            return
         # 3️⃣ Запускаем АКТИВНЫЙ файл
-        yaml_path = os.path.join(self.tests_dir, self.current_test_name)
-
+        test_name = os.path.relpath(yaml_path, self.tests_dir)
         self.log_view.append_line("▶ Running Maestro")
-        self.log_view.append_line(f"File: {self.current_test_name}")
-
-        self.runner = MaestroRunner(yaml_path=yaml_path)
+        self.log_view.append_line(f"File: {test_name}")
+
+        run_path = yaml_path
+        log_path = None
+        if self.project_dir:
+            # цепочки runFlow встраиваются в один файл; его копия остаётся
+            # рядом с логом, чтобы прогон можно было повторить
+            try:
+                compiled = self.flow_compiler.compile(yaml_path)
+            except CompileError as e:
+                self.log_view.append_line(f"❌ Compile error: {e}")
+                return
+            run_path = compiled.path
+            state = "cached" if compiled.cached else f"{len(compiled.files)} files"
+            self.log_view.append_line(f"Compiled: {compiled.key[:12]} ({state})")
+
+            log_dir = new_run_log_dir(self.project_dir)
+            log_path = os.path.join(log_dir, log_file_name(test_name))
+            shutil.copyfile(run_path, log_path[: -len(".log")] + ".flow.yaml")
+            self.log_view.append_line(f"Log: {log_path}")
+
+        self.step_model.clear_run_status()
+        if self.runner is not None:
+            # прошлый прогон: поток уже отдал finished, дожидаемся выхода из
+            # run() и освобождаем его вместе с профилировщиком
+            self.runner.wait()
+            self.runner.deleteLater()
+        timeout, idle_timeout = run_limits(self.config)
+        self.runner = MaestroRunner(
+            yaml_path=run_path,
+            log_path=log_path,
+            timings=self.timings,
+            test_name=test_name,
+            timeout=timeout,
+            idle_timeout=idle_timeout,
+        )
+        self.runner.step.connect(self.step_model.set_run_status)
 
-        self.runner.log.connect(self.log_view.append_line)
+        self.runner.log.connect(self.log_view.append_lines)
         self.runner.finished.connect(self.on_run_finished)
         self.runner.start()
+        self.stop_btn.setEnabled(True)
 
     def on_run_finished(self, code):
+        self.stop_btn.setEnabled(False)
+        self.statusBar().clearMessage()
+        profiler = self.runner.profiler
+        flow_run = self.runner.flow_run
         if code == 0:
-            self.log_view.append_line("✅ Finished successfully")
+            self.log_view.append_line(
+                f"✅ Finished successfully in {profiler.duration:.1f}s"
+            )
+        else:
+            if not flow_run.stop_reason:
+                # о причине остановки прогон уже написал в лог сам
+                self.log_view.append_line(f"❌ Finished with code {code}")
+            failed = profiler.failed_step()
+            if failed:
+                self.log_view.append_line(f"❌ Step {failed.index + 1}: {failed.text}")
+
+        timed = [step for step in profiler.steps if step.duration is not None]
+        if timed:
+            slowest = max(timed, key=lambda step: step.duration)
+            self.log_view.append_line(
+                f"Slowest step {slowest.index + 1}: {slowest.text} "
+                f"({slowest.duration:.1f}s)"
+            )
+        if flow_run.cpu_time is not None:
+            self.log_view.append_line(
+                f"CPU {flow_run.cpu_time:.1f}s, "
+                f"peak RSS {flow_run.peak_rss / 2**20:.0f} MiB"
+            )
+
+    def show_timings(self):
+        if not self.timings or not self.current_test_name:
+            QMessageBox.warning(self, "Timings", "Test file is not selected")
+            return
+        TimingReport(self.current_test_name, self.timings, self).exec_()
+
+    def show_memory(self):
+        if self.memory_report is None:
+            self.memory_report = MemoryReport(self)
+        self.memory_report.refresh()
+        self.memory_report.show()
+        self.memory_report.raise_()
+
+    # ==== Tracing ====
+    def toggle_trace_overlay(self):
+        active = not self.trace_overlay.isVisible()
+        # запись идёт, пока открыт оверлей или задан MAESTRO_EDITOR_TRACE
+        tracer.enabled = active or os.environ.get(ENV_VAR) == "1"
+        if tracer.enabled and not self.stall_monitor.is_running():
+            self.stall_monitor.start()
+        elif not tracer.enabled:
+            self.stall_monitor.stop()
+        self.trace_overlay.set_active(active)
+
+    def export_trace(self):
+        if not tracer.events:
+            self.statusBar().showMessage(
+                "No trace events, enable tracing with Ctrl+Shift+T"
+            )
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Chrome trace", "trace.json", "Trace (*.json)"
+        )
+        if not path:
+            return
+        try:
+            tracer.export_chrome(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Export failed", str(e))
+            return
+        self.statusBar().showMessage(
+            f"{len(tracer.events)} events exported to {os.path.basename(path)}"
+        )
+
+    # ==== Suite run methods ====
+    def run_selected_tests(self):
+        names = [item.text() for item in self.test_list_widget.selectedItems()]
+        if not names:
+            QMessageBox.warning(self, "Run", "No tests selected")
+            return
+        self.run_suite(self.test_jobs(names))
+
+    def run_all_tests(self):
+        names = [
+            self.test_list_widget.item(i).text()
+            for i in range(self.test_list_widget.count())
+        ]
+        if not names:
+            QMessageBox.warning(self, "Run", "Project has no tests")
+            return
+        self.run_suite(self.test_jobs(names))
+
+    def run_matrix_tests(self):
+        names = [item.text() for item in self.test_list_widget.selectedItems()]
+        if not names and self.current_test_name:
+            names = [self.current_test_name]
+        if not names:
+            QMessageBox.warning(self, "Run Matrix", "No tests selected")
+            return
+        try:
+            jobs = matrix_jobs(self.config, self.tests_dir, names)
+        except MatrixError as e:
+            QMessageBox.warning(self, "Run Matrix", str(e))
+            return
+        if not any(job.env for job in jobs):
+            QMessageBox.information(
+                self,
+                "Run Matrix",
+                "No matrix for the selected tests: add matrix or test_matrix "
+                "to config.yaml",
+            )
+            return
+        self.run_suite(jobs)
+
+    def rerun_failed_tests(self):
+        if not self.last_run:
+            QMessageBox.warning(self, "Run", "Project is not opened")
+            return
+        # ячейки матриц перезапускаются с теми же параметрами
+        jobs = self.last_run.failed_jobs(self.tests_dir)
+        if not jobs:
+            QMessageBox.information(self, "Run", "No failed tests in the last run")
+            return
+        self.run_suite(jobs)
+
+    def test_jobs(self, test_names):
+        return [make_job(self.tests_dir, name) for name in test_names]
+
+    def run_suite(self, jobs):
+        if self.is_run_active():
+            QMessageBox.warning(self, "Run", "A run is already in progress")
+            return
+
+        def start(written=False):
+            self.start_suite(jobs)
+
+        if not self.current_test_name or not self.save_current_test(False, start):
+            start()
+
+    def start_suite(self, jobs):
+        if self.is_run_active():
+            return
+
+        timeout, idle_timeout = run_limits(self.config)
+        self.run_queue = RunQueue(
+            run_devices(self.config),
+            history=DurationHistory(self.project_dir),
+            timings=self.timings,
+            log_dir=new_run_log_dir(self.project_dir),
+            batch_size=self.config.get("batch_size", 1),
+            timeout=timeout,
+            idle_timeout=idle_timeout,
+            retries=self.config.get("retries", 0),
+        )
+        self.run_queue.job_started.connect(self.run_results.refresh)
+        self.run_queue.job_log.connect(self.on_job_log)
+        self.run_queue.job_step.connect(self.on_job_step)
+        self.run_queue.job_retry.connect(self.on_job_retry)
+        self.run_queue.job_finished.connect(self.run_results.refresh)
+        self.run_queue.all_finished.connect(self.on_suite_finished)
+
+        self.log_view.clear()
+        self.log_view.append_line(
+            f"▶ Running {len(jobs)} tests on {self.run_queue.workers()} workers"
+        )
+        self.run_results.show_jobs(jobs)
+        self.step_model.clear_run_status()
+        if any(job.env for job in jobs):
+            self.show_matrix_report(jobs)
+        self.run_queue.start(jobs)
+        self.stop_btn.setEnabled(True)
+
+    def on_job_step(self, job, index, status, duration):
+        # подсветка шагов, если в редакторе открыт выполняемый тест
+        if job.source == self.current_test_name:
+            self.step_model.set_run_status(index, status, duration)
+
+    def on_job_retry(self, job):
+        self.run_results.refresh(job)
+        attempt = job.attempts[-1]
+        self.log_view.append_line(
+            f"↻ {job.test_name} failed (code {attempt.returncode}), "
+            f"retry {len(job.attempts)}"
+        )
+
+    def show_matrix_report(self, jobs):
+        # отчёт прошлой матрицы заменяется, события идут только текущему
+        if self.matrix_report is not None:
+            self.matrix_report.close()
+            self.matrix_report.deleteLater()
+        self.matrix_report = MatrixReport(jobs, self.show_job_log, self)
+        for signal in (
+            self.run_queue.job_started,
+            self.run_queue.job_retry,
+            self.run_queue.job_finished,
+        ):
+            signal.connect(self.matrix_report.refresh)
+        self.matrix_report.show()
+        self.matrix_report.raise_()
+
+    def on_job_log(self, job, lines):
+        prefix = f"[{job.test_name}] "
+        self.log_view.append_lines([prefix + line for line in lines])
+
+    def on_suite_finished(self):
+        self.stop_btn.setEnabled(False)
+        self.statusBar().clearMessage()
+        jobs = self.run_queue.jobs
+        for job in jobs:
+            # тесты, не запущенные из-за остановки, событий не получали
+            self.run_results.refresh(job)
+            if self.matrix_report is not None:
+                self.matrix_report.refresh(job)
+        statuses = [job_status(job) for job in jobs]
+        self.last_run.record(jobs)
+        junit_path = os.path.join(self.run_queue.log_dir, "junit.xml")
+        try:
+            self.last_run.save()
+            write_junit(junit_path, jobs)
+        except OSError as e:
+            self.log_view.append_line(f"❌ Run report not saved: {e}")
         else:
-            self.log_view.append_line(f"❌ Finished with code {code}")
+            self.log_view.append_line(f"JUnit report: {junit_path}")
+
+        stopped = statuses.count("stopped")
+        failed = statuses.count("failed")
+        flaky = statuses.count("flaky")
+        if flaky:
+            self.log_view.append_line(f"⚠️ {flaky} flaky tests passed on retry")
+        if stopped:
+            self.log_view.append_line(f"⏹ {stopped} tests stopped or not run")
+        if failed:
+            self.log_view.append_line(f"❌ {failed} of {len(jobs)} tests failed")
+        elif not stopped:
+            self.log_view.append_line(f"✅ All {len(jobs)} tests passed")
+
+    def select_impacted_tests(self):
+        changed = [item.text() for item in self.test_list_widget.selectedItems()]
+        if not self.flow_graph or not changed:
+            QMessageBox.warning(self, "Impacted tests", "No flows selected")
+            return
+
+        # граф обновляется только по изменившимся с прошлого раза файлам
+        self.flow_graph.sync(self.project_index.entries)
+        impacted = self.flow_graph.impacted(changed)
+
+        self.test_list_widget.clearSelection()
+        for rel_path in impacted:
+            item = self.test_items.get(rel_path)
+            if item:
+                item.setSelected(True)
+
+        self.log_view.clear()
+        self.log_view.append_line(
+            f"{len(impacted)} tests impacted by {len(changed)} selected flows"
+        )
+        self.log_view.append_lines(impacted)
+        problems = self.flow_graph.problems()
+        if problems:
+            self.log_view.append_line("⚠ runFlow problems:")
+            self.log_view.append_lines(problems)
+
+    def validate_project(self):
+        if not self.project_index:
+            QMessageBox.warning(self, "Validate", "Project is not opened")
+            return
+        if self.validation_thread and self.validation_thread.isRunning():
+            return
+
+        validator = ProjectValidator(self.project_dir, self.tests_dir)
+        self.log_view.clear()
+        self.log_view.append_line("▶ Validating project")
+        self.validate_project_btn.setEnabled(False)
+
+        # разбор файлов идёт в рабочих процессах, UI не блокируется
+        self.validation_thread = FunctionThread(
+            lambda entries: (validator, validator.validate(entries)),
+            dict(self.project_index.entries),
+        )
+        self.validation_thread.done.connect(self.on_project_validated)
+        self.validation_thread.failed.connect(self.on_project_validation_failed)
+        self.validation_thread.start()
+
+    def on_project_validated(self, result):
+        validator, errors = result
+        self.validate_project_btn.setEnabled(True)
+        self.log_view.append_lines([str(error) for error in errors])
+        summary = (
+            f"{len(validator.results)} files, "
+            f"{validator.revalidated} revalidated, {len(errors)} errors"
+        )
+        if errors:
+            self.log_view.append_line(f"❌ {summary}")
+        else:
+            self.log_view.append_line(f"✅ {summary}")
+
+    def on_project_validation_failed(self, message):
+        self.validate_project_btn.setEnabled(True)
+        self.log_view.append_line(f"❌ Validation failed: {message}")
+
+    def on_run_result_selected(self, item):
+        self.show_job_log(item.data(1))
+
+    def show_job_log(self, job):
+        if job.log_path:
+            self.log_view.load_file(job.log_path)
 
     def icon(self, name):
         return QIcon(resource_path(f"ui/icons/{name}"))
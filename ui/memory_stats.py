@@ -0,0 +1,46 @@
+from PyQt5.QtWidgets import QApplication
+
+from core.memory import live_counts, rss_bytes
+from core.step import MaestroStep
+from core.tracing import tracer
+from core.yaml_service import flow_cache
+from ui.flow_loader import FlowLoader
+from ui.runners import MaestroRunner, PoolThread, RunQueue
+from ui.step_editors.base import BaseStepEditor
+from ui.worker import FunctionThread
+
+LIVE_TYPES = (
+    MaestroStep,
+    BaseStepEditor,
+    MaestroRunner,
+    RunQueue,
+    PoolThread,
+    FlowLoader,
+    FunctionThread,
+)
+
+
+def memory_counts(window):
+    # что держит окно и сколько таких объектов живо во всём процессе
+    live = live_counts(LIVE_TYPES)
+    cache = flow_cache.stats()
+    return {
+        "rss_kib": (rss_bytes() or 0) // 1024,
+        "steps (flow)": window.step_model.rowCount(),
+        "steps (live)": live["MaestroStep"],
+        "editors (live)": sum(
+            count
+            for name, count in live.items()
+            if name.endswith("Editor") and name != "BaseStepEditor"
+        ),
+        "runners (live)": live["MaestroRunner"],
+        "run queues (live)": live["RunQueue"] + live["PoolThread"],
+        "worker threads (live)": live["FlowLoader"] + live["FunctionThread"],
+        "widgets": len(QApplication.allWidgets()),
+        "log lines": window.log_view.blockCount(),
+        "yaml fragments": len(window.yaml_cache.fragments),
+        "undo commands": len(window.undo_stack.done) + len(window.undo_stack.undone),
+        "flow cache flows": cache["flows"],
+        "flow cache kib": cache["used_bytes"] // 1024,
+        "trace events": len(tracer.events),
+    }
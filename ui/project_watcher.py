@@ -0,0 +1,97 @@
+import os
+
+from PyQt5.QtCore import QFileSystemWatcher, QObject, QThread, QTimer, pyqtSignal
+
+from core.project_index import scan_tests
+
+
+class IndexScanThread(QThread):
+    scanned = pyqtSignal(object)
+
+    def __init__(self, tests_dir):
+        super().__init__()
+        self.tests_dir = tests_dir
+
+    def run(self):
+        self.scanned.emit(scan_tests(self.tests_dir))
+
+
+class ProjectWatcher(QObject):
+    changed = pyqtSignal(object)
+
+    DEBOUNCE_MS = 200
+
+    def __init__(self, index):
+        super().__init__()
+        self.index = index
+        self.dirty = set()
+        self.scan_thread = None
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+        tests_dir = index.tests_dir
+        self.watch([tests_dir])
+        self.watch(os.path.join(tests_dir, d) for d in index.directories())
+
+    def start(self):
+        # индекс с диска уже показан, сверяем его с файловой системой в фоне
+        self.scan_thread = IndexScanThread(self.index.tests_dir)
+        self.scan_thread.scanned.connect(self.on_scanned)
+        self.scan_thread.start()
+
+    def stop(self):
+        self.timer.stop()
+        paths = self.watcher.directories()
+        if paths:
+            self.watcher.removePaths(paths)
+        if self.scan_thread:
+            self.scan_thread.scanned.disconnect()
+            self.scan_thread.wait()
+            self.scan_thread = None
+
+    def watch(self, directories):
+        watched = set(self.watcher.directories())
+        new = [d for d in directories if d not in watched and os.path.isdir(d)]
+        if new:
+            self.watcher.addPaths(new)
+
+    def on_scanned(self, entries):
+        self.scan_thread = None
+        self.apply(self.index.replace(entries))
+        tests_dir = self.index.tests_dir
+        self.watch(os.path.join(tests_dir, d) for d in self.index.directories())
+
+    def on_directory_changed(self, path):
+        self.dirty.add(path)
+        self.timer.start(self.DEBOUNCE_MS)
+
+    def flush(self):
+        dirty, self.dirty = self.dirty, set()
+        for directory in sorted(dirty):
+            self.rescan(directory)
+
+    def rescan(self, directory):
+        # сначала подписываемся на новые каталоги, чтобы не пропустить
+        # файлы, созданные в них во время сканирования
+        self.watch_trees(self.index.list_subdirs(directory))
+        self.apply(self.index.rescan_dir(directory))
+
+    def refresh_file(self, path):
+        self.apply(self.index.update_file(path))
+
+    def watch_trees(self, directories):
+        watched = set(self.watcher.directories())
+        for directory in directories:
+            if directory in watched:
+                continue
+            self.watch(root for root, _, _ in os.walk(directory))
+
+    def apply(self, delta):
+        if delta:
+            self.index.save()
+            self.changed.emit(delta)
@@ -0,0 +1,147 @@
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+from core.run_queue import RunListener, RunPool
+from core.runner import FlowRun
+from core.step_profiler import StepProfiler
+
+
+def step_event(timing):
+    # StepTiming меняется в потоке чтения, в UI уходит снимок
+    return timing.index, timing.status, timing.duration
+
+
+class MaestroRunner(QThread):
+    log = pyqtSignal(list)
+    step = pyqtSignal(int, str, object)  # индекс шага, статус, длительность
+    finished = pyqtSignal(int)
+
+    def __init__(
+        self,
+        yaml_path,
+        device=None,
+        log_path=None,
+        timings=None,
+        test_name=None,
+        timeout=None,
+        idle_timeout=None,
+    ):
+        super().__init__()
+        self.test_name = test_name or yaml_path
+        self.timings = timings
+        self.profiler = StepProfiler(
+            on_step=lambda timing: self.step.emit(*step_event(timing))
+        )
+        self.flow_run = FlowRun(
+            yaml_path,
+            device=device,
+            log_path=log_path,
+            on_lines=self.log.emit,
+            profiler=self.profiler,
+            timeout=timeout,
+            idle_timeout=idle_timeout,
+        )
+
+    def cancel(self):
+        self.flow_run.cancel()
+
+    def run(self):
+        code = self.flow_run.run()
+        if self.timings:
+            self.timings.record(
+                self.test_name,
+                code,
+                self.profiler.duration,
+                self.profiler.steps,
+                self.flow_run.device,
+                cpu_time=self.flow_run.cpu_time,
+                peak_rss=self.flow_run.peak_rss,
+            )
+        self.finished.emit(code)
+
+
+class SignalListener(RunListener):
+    # сигналы из рабочих потоков пула доставляются в поток UI очередью Qt
+    def __init__(self, run_queue):
+        self.run_queue = run_queue
+
+    def job_started(self, job):
+        self.run_queue.job_started.emit(job)
+
+    def job_log(self, job, lines):
+        self.run_queue.job_log.emit(job, lines)
+
+    def job_step(self, job, timing):
+        self.run_queue.job_step.emit(job, *step_event(timing))
+
+    def job_retry(self, job):
+        self.run_queue.job_retry.emit(job)
+
+    def job_finished(self, job):
+        self.run_queue.job_finished.emit(job)
+
+
+class RunQueue(QObject):
+    job_started = pyqtSignal(object)
+    job_log = pyqtSignal(object, list)
+    job_step = pyqtSignal(object, int, str, object)
+    job_retry = pyqtSignal(object)
+    job_finished = pyqtSignal(object)
+    all_finished = pyqtSignal()
+
+    def __init__(
+        self,
+        devices,
+        history=None,
+        log_dir=None,
+        timings=None,
+        batch_size=1,
+        timeout=None,
+        idle_timeout=None,
+        retries=0,
+    ):
+        super().__init__()
+        self.pool = RunPool(
+            devices,
+            history=history,
+            log_dir=log_dir,
+            listener=SignalListener(self),
+            timings=timings,
+            batch_size=batch_size,
+            timeout=timeout,
+            idle_timeout=idle_timeout,
+            retries=retries,
+        )
+        self.thread = None
+
+    @property
+    def jobs(self):
+        return self.pool.jobs
+
+    @property
+    def log_dir(self):
+        return self.pool.log_dir
+
+    def workers(self):
+        return self.pool.workers()
+
+    def is_running(self):
+        return self.thread is not None and self.thread.isRunning()
+
+    def cancel(self):
+        self.pool.cancel()
+
+    def start(self, jobs):
+        self.pool.jobs = list(jobs)
+        self.thread = PoolThread(self.pool, self.pool.jobs)
+        self.thread.finished.connect(self.all_finished)
+        self.thread.start()
+
+
+class PoolThread(QThread):
+    def __init__(self, pool, jobs):
+        super().__init__()
+        self.pool = pool
+        self.jobs = jobs
+
+    def run(self):
+        self.pool.run(self.jobs)
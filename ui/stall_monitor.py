@@ -0,0 +1,41 @@
+import time
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from core.tracing import tracer
+
+
+class StallMonitor(QObject):
+    # таймер в потоке UI: если тик пришёл заметно позже срока, цикл событий
+    # был занят — записываем задержку как событие трассировки
+    stalled = pyqtSignal(float)
+
+    INTERVAL_MS = 50
+    THRESHOLD_MS = 100
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.INTERVAL_MS)
+        self.timer.timeout.connect(self.tick)
+        self.last = None
+
+    def start(self):
+        self.last = time.perf_counter_ns()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+        self.last = None
+
+    def is_running(self):
+        return self.timer.isActive()
+
+    def tick(self):
+        now = time.perf_counter_ns()
+        expected = self.last + self.INTERVAL_MS * 1_000_000
+        self.last = now
+        late = now - expected
+        if late >= self.THRESHOLD_MS * 1_000_000:
+            tracer.record("event loop stall", expected, late)
+            self.stalled.emit(late / 1_000_000)
@@ -1,17 +1,16 @@
-from PyQt5.QtWidgets import QFormLayout, QLineEdit, QWidget
+from PyQt5.QtWidgets import QFormLayout, QLineEdit
 
+from ui.step_editors.base import BaseStepEditor
 
-class AssertVisibleEditor(QWidget):
-    def __init__(self, step):
+
+class AssertVisibleEditor(BaseStepEditor):
+    def __init__(self, step=None):
         super().__init__()
-        self.step = step
 
         self.id_input = QLineEdit()
-        self.id_input.setText(step.params.get("id", ""))
         self.id_input.setPlaceholderText("ID")
 
         self.text_input = QLineEdit()
-        self.text_input.setText(step.params.get("text", ""))
         self.text_input.setPlaceholderText("Текст элемента")
 
         self.id_input.textChanged.connect(self.on_change)
@@ -22,9 +21,17 @@ class AssertVisibleEditor(QWidget):
         layout.addRow("Text:", self.text_input)
         self.setLayout(layout)
 
-    def on_change(self):
-        self.step.params.clear()
+        if step:
+            self.bind(step)
+
+    def load(self, step):
+        self.id_input.setText(step.params.get("id", ""))
+        self.text_input.setText(step.params.get("text", ""))
+
+    def collect(self):
+        params = {}
         if self.id_input.text():
-            self.step.params["id"] = self.id_input.text()
+            params["id"] = self.id_input.text()
         elif self.text_input.text():
-            self.step.params["text"] = self.text_input.text()
+            params["text"] = self.text_input.text()
+        return params
@@ -1,7 +1,35 @@
+from PyQt5.QtCore import pyqtSignal
 from PyQt5.QtWidgets import QWidget
 
 
 class BaseStepEditor(QWidget):
-    def __init__(self, step):
+    changed = pyqtSignal()
+
+    def __init__(self, step=None):
         super().__init__()
+        self.step = None
+        self.loading = False
+
+    def bind(self, step):
+        # заполнение полей из шага не считается правкой
         self.step = step
+        self.loading = True
+        try:
+            self.load(step)
+        finally:
+            self.loading = False
+
+    def unbind(self):
+        self.step = None
+
+    def load(self, step):
+        pass
+
+    def collect(self):
+        return {}
+
+    def on_change(self):
+        if self.loading or self.step is None:
+            return
+        self.step.set_params(self.collect())
+        self.changed.emit()
@@ -7,18 +7,24 @@ from ui.step_editors.tap_on import TapOnEditor
 
 
 class StepEditorFactory:
+    EDITORS = {
+        "tapOn": TapOnEditor,
+        "inputText": InputTextEditor,
+        "launchApp": LaunchAppEditor,
+        "assertVisible": AssertVisibleEditor,
+        "back": BackEditor,
+    }
+
     @staticmethod
     def create(step, project_dir=None):
-        if step.step_type == "tapOn":
-            return TapOnEditor(step)
-        if step.step_type == "inputText":
-            return InputTextEditor(step)
-        if step.step_type == "launchApp":
-            return LaunchAppEditor(step)
-        if step.step_type == "assertVisible":
-            return AssertVisibleEditor(step)
-        if step.step_type == "runFlow":
-            return RunFlowEditor(step, project_dir)
-        if step.step_type == "back":
-            return BackEditor(step)
-        return None
+        editor = StepEditorFactory.create_for_type(step.step_type, project_dir)
+        if editor:
+            editor.bind(step)
+        return editor
+
+    @staticmethod
+    def create_for_type(step_type, project_dir=None):
+        if step_type == "runFlow":
+            return RunFlowEditor(project_dir=project_dir)
+        editor_class = StepEditorFactory.EDITORS.get(step_type)
+        return editor_class() if editor_class else None
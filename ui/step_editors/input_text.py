@@ -1,17 +1,15 @@
-from PyQt5.QtWidgets import QFormLayout, QLineEdit, QWidget
+from PyQt5.QtWidgets import QFormLayout, QLineEdit
 
+from ui.step_editors.base import BaseStepEditor
 
-class InputTextEditor(QWidget):
-    def __init__(self, step):
+
+class InputTextEditor(BaseStepEditor):
+    def __init__(self, step=None):
         super().__init__()
-        self.step = step
 
         self.target_id = QLineEdit()
         self.input_text = QLineEdit()
 
-        self.target_id.setText(step.params.get("id", ""))
-        self.input_text.setText(step.params.get("text", ""))
-
         self.target_id.textChanged.connect(self.on_change)
         self.input_text.textChanged.connect(self.on_change)
 
@@ -20,11 +18,20 @@ class InputTextEditor(QWidget):
         layout.addRow("Text:", self.input_text)
         self.setLayout(layout)
 
-    def on_change(self):
-        self.step.params.clear()
+        if step:
+            self.bind(step)
+
+    def load(self, step):
+        self.target_id.setText(step.params.get("id", ""))
+        self.input_text.setText(step.params.get("text", ""))
+
+    def collect(self):
+        params = {}
 
         if self.target_id.text():
-            self.step.params["id"] = self.target_id.text()
+            params["id"] = self.target_id.text()
 
         if self.input_text.text():
-            self.step.params["text"] = self.input_text.text()
+            params["text"] = self.input_text.text()
+
+        return params
@@ -1,8 +1,10 @@
-from PyQt5.QtWidgets import QLabel, QVBoxLayout, QWidget
+from PyQt5.QtWidgets import QLabel, QVBoxLayout
 
+from ui.step_editors.base import BaseStepEditor
 
-class LaunchAppEditor(QWidget):
-    def __init__(self, step):
+
+class LaunchAppEditor(BaseStepEditor):
+    def __init__(self, step=None):
         super().__init__()
         layout = QVBoxLayout()
         layout.addWidget(QLabel("LaunchApp"))
@@ -0,0 +1,46 @@
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtWidgets import QStackedWidget, QWidget
+
+from ui.step_editors.factory import StepEditorFactory
+
+
+class StepEditorPool(QStackedWidget):
+    changed = pyqtSignal()
+
+    def __init__(self, project_dir=None):
+        super().__init__()
+        self.project_dir = project_dir
+        # один редактор на тип шага, создаётся при первом выборе такого шага
+        self.editors = {}
+        self.empty = QWidget()
+        self.addWidget(self.empty)
+
+    def set_project_dir(self, project_dir):
+        self.project_dir = project_dir
+        for editor in self.editors.values():
+            if editor is not None and hasattr(editor, "project_dir"):
+                editor.project_dir = project_dir
+
+    def editor_for(self, step_type):
+        if step_type not in self.editors:
+            editor = StepEditorFactory.create_for_type(step_type, self.project_dir)
+            if editor is not None:
+                editor.changed.connect(self.changed)
+                self.addWidget(editor)
+            self.editors[step_type] = editor
+        return self.editors[step_type]
+
+    def show_step(self, step):
+        self.clear()
+        editor = self.editor_for(step.step_type)
+        if editor is None:
+            return None
+        editor.bind(step)
+        self.setCurrentWidget(editor)
+        return editor
+
+    def clear(self):
+        current = self.currentWidget()
+        if current is not self.empty:
+            current.unbind()
+        self.setCurrentWidget(self.empty)
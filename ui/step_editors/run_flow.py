@@ -1,16 +1,17 @@
 import os
 
-from PyQt5.QtWidgets import QFileDialog, QFormLayout, QLineEdit, QPushButton, QWidget
+from PyQt5.QtWidgets import QFileDialog, QFormLayout, QLineEdit, QPushButton
 
+from core.flow_graph import flow_reference
+from ui.step_editors.base import BaseStepEditor
 
-class RunFlowEditor(QWidget):
-    def __init__(self, step, project_dir):
+
+class RunFlowEditor(BaseStepEditor):
+    def __init__(self, step=None, project_dir=None):
         super().__init__()
-        self.step = step
         self.project_dir = project_dir
 
         self.file_input = QLineEdit()
-        self.file_input.setText(step.params.get("file", ""))
 
         browse_btn = QPushButton("Browse")
         browse_btn.clicked.connect(self.browse)
@@ -22,6 +23,12 @@ class RunFlowEditor(QWidget):
         layout.addRow("", browse_btn)
         self.setLayout(layout)
 
+        if step:
+            self.bind(step)
+
+    def load(self, step):
+        self.file_input.setText(flow_reference(step) or "")
+
     def browse(self):
         tests_dir = os.path.join(self.project_dir, "tests")
         path, _ = QFileDialog.getOpenFileName(
@@ -31,7 +38,8 @@ class RunFlowEditor(QWidget):
             rel = os.path.relpath(path, tests_dir)
             self.file_input.setText(rel)
 
-    def on_change(self):
-        self.step.params.clear()
+    def collect(self):
+        params = {}
         if self.file_input.text():
-            self.step.params["file"] = self.file_input.text()
+            params["file"] = self.file_input.text()
+        return params
@@ -1,20 +1,16 @@
-from PyQt5.QtWidgets import QFormLayout, QLineEdit, QWidget
+from PyQt5.QtWidgets import QFormLayout, QLineEdit
 
+from ui.step_editors.base import BaseStepEditor
 
-class TapOnEditor(QWidget):
-    def __init__(self, step):
+
+class TapOnEditor(BaseStepEditor):
+    def __init__(self, step=None):
         super().__init__()
-        self.step = step
 
         self.id_input = QLineEdit()
         self.text_input = QLineEdit()
         self.point_input = QLineEdit()
 
-        # заполнение из модели
-        self.id_input.setText(step.params.get("id", ""))
-        self.text_input.setText(step.params.get("text", ""))
-        self.point_input.setText(step.params.get("point", ""))
-
         self.id_input.textChanged.connect(self.on_change)
         self.text_input.textChanged.connect(self.on_change)
         self.point_input.textChanged.connect(self.on_change)
@@ -25,14 +21,25 @@ class TapOnEditor(QWidget):
         layout.addRow("Point:", self.point_input)
         self.setLayout(layout)
 
-    def on_change(self):
-        self.step.params.clear()
+        if step:
+            self.bind(step)
+
+    def load(self, step):
+        # заполнение из модели
+        self.id_input.setText(step.params.get("id", ""))
+        self.text_input.setText(step.params.get("text", ""))
+        self.point_input.setText(step.params.get("point", ""))
+
+    def collect(self):
+        params = {}
 
         if self.id_input.text():
-            self.step.params["id"] = self.id_input.text()
+            params["id"] = self.id_input.text()
 
         if self.text_input.text():
-            self.step.params["text"] = self.text_input.text()
+            params["text"] = self.text_input.text()
 
         if self.point_input.text():
-            self.step.params["point"] = self.point_input.text()
+            params["point"] = self.point_input.text()
+
+        return params
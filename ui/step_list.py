@@ -1,34 +1,167 @@
-from PyQt5.QtWidgets import QListWidget, QListWidgetItem
+from PyQt5.QtCore import QAbstractListModel, QMimeData, QModelIndex, Qt
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QAbstractItemView, QListView
 
-from core.step import MaestroStep
+STEP_ROLE = Qt.UserRole
+MIME_TYPE = "application/x-maestro-step-rows"
 
+# подсветка шагов по ходу запуска maestro
+RUN_STATUS_COLORS = {
+    "RUNNING": QColor("#fff3bf"),
+    "COMPLETED": QColor("#d3f9d8"),
+    "FAILED": QColor("#ffc9c9"),
+    "WARNED": QColor("#ffe8cc"),
+}
 
-class StepListWidget(QListWidget):
+
+class StepListModel(QAbstractListModel):
     def __init__(self):
         super().__init__()
+        # единственное хранилище шагов; имена считаются лениво, только
+        # для строк, которые view реально показывает
         self.steps = []
-        self.setDragDropMode(QListWidget.InternalMove)
+        self.names = {}
+        self.run_status = {}  # шаг -> (статус, длительность) последнего запуска
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.steps)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        step = self.steps[index.row()]
+        if role == Qt.DisplayRole:
+            name = self.names.get(step)
+            if name is None:
+                name = self.names[step] = step.display_name()
+            return name
+        if role == STEP_ROLE:
+            return step
+        if role == Qt.BackgroundRole:
+            status = self.run_status.get(step)
+            return RUN_STATUS_COLORS.get(status[0]) if status else None
+        if role == Qt.ToolTipRole:
+            status = self.run_status.get(step)
+            if status and status[1] is not None:
+                return f"{status[0]} in {status[1]:.2f}s"
+            return status[0] if status else None
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDragEnabled
+
+    def supportedDropActions(self):
+        return Qt.MoveAction
+
+    def mimeTypes(self):
+        return [MIME_TYPE]
+
+    def mimeData(self, indexes):
+        rows = sorted({index.row() for index in indexes})
+        data = QMimeData()
+        data.setData(MIME_TYPE, ",".join(map(str, rows)).encode())
+        return data
+
+    def dropMimeData(self, data, action, row, column, parent):
+        # перетаскивание внутри списка — перемещение строк, без копирования
+        if action != Qt.MoveAction or not data.hasFormat(MIME_TYPE):
+            return False
+        rows = bytes(data.data(MIME_TYPE)).decode().split(",")
+        moved = [self.steps[int(r)] for r in rows if r]
+        if row < 0:
+            row = parent.row() if parent.isValid() else len(self.steps)
+
+        for step in moved:
+            self.moveRow(QModelIndex(), self.steps.index(step), QModelIndex(), row)
+            row = self.steps.index(step) + 1
+        return True
 
-    def add_step(self, step_type):
-        step = MaestroStep(step_type)
-        self.steps.append(step)
+    def moveRows(self, source_parent, source_row, count, dest_parent, dest_row):
+        if source_row <= dest_row <= source_row + count:
+            return False
+        if not self.beginMoveRows(
+            source_parent, source_row, source_row + count - 1, dest_parent, dest_row
+        ):
+            return False
+        moved = self.steps[source_row : source_row + count]
+        del self.steps[source_row : source_row + count]
+        if dest_row > source_row:
+            dest_row -= count
+        self.steps[dest_row:dest_row] = moved
+        self.endMoveRows()
+        return True
 
-        item = QListWidgetItem(f"{len(self.steps)}. {step_type}")
-        item.setData(1, step)  # Qt.UserRole = 1
-        self.addItem(item)
+    def set_steps(self, steps):
+        self.beginResetModel()
+        self.steps = list(steps)
+        self.names = {}
+        self.run_status = {}
+        self.endResetModel()
 
-        self.setCurrentRow(len(self.steps) - 1)
+    def insert(self, row, step):
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.steps.insert(row, step)
+        self.endInsertRows()
 
-    # def mark_invalid_steps(self, errors):
-    # for i in range(self.count()):
-    #    self.item(i).setBackground(None)
+    def append(self, step):
+        self.insert(len(self.steps), step)
+        return len(self.steps) - 1
 
-    # for err in errors:
-    #    self.item(err.step_index).setBackground(QColor.red)
+    def set_run_status(self, row, status, duration=None):
+        if not 0 <= row < len(self.steps):
+            return
+        self.run_status[self.steps[row]] = (status, duration)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.BackgroundRole, Qt.ToolTipRole])
+
+    def clear_run_status(self):
+        if not self.run_status:
+            return
+        self.run_status = {}
+        if self.steps:
+            self.dataChanged.emit(
+                self.index(0),
+                self.index(len(self.steps) - 1),
+                [Qt.BackgroundRole, Qt.ToolTipRole],
+            )
+
+    def extend(self, steps):
+        if not steps:
+            return
+        first = len(self.steps)
+        self.beginInsertRows(QModelIndex(), first, first + len(steps) - 1)
+        self.steps.extend(steps)
+        self.endInsertRows()
+
+    def remove(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        step = self.steps.pop(row)
+        self.names.pop(step, None)
+        self.endRemoveRows()
+        return step
+
+    def step_changed(self, row):
+        self.names.pop(self.steps[row], None)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+
+class StepListView(QListView):
+    def __init__(self):
+        super().__init__()
+        # одинаковая высота строк — view не опрашивает все строки при раскладке
+        self.setUniformItemSizes(True)
+        self.setDragEnabled(True)
+        self.setAcceptDrops(True)
+        self.setDropIndicatorShown(True)
+        self.setDefaultDropAction(Qt.MoveAction)
+        self.setDragDropMode(QAbstractItemView.InternalMove)
+        self.setCursor(Qt.OpenHandCursor)
 
-    def dropEvent(self, event):
-        super().dropEvent(event)
-        self.sync_steps_with_ui()
+    def current_row(self):
+        return self.currentIndex().row()
 
-    def sync_steps_with_ui(self):
-        self.steps = [self.item(i).data(1) for i in range(self.count())]
+    def set_current_row(self, row):
+        self.setCurrentIndex(self.model().index(row))
@@ -1,15 +1,34 @@
-from PyQt5.QtWidgets import QTextEdit
+from collections import deque
 
+from PyQt5.QtWidgets import QPlainTextEdit
 
-class LogView(QTextEdit):
-    def __init__(self):
+
+class LogView(QPlainTextEdit):
+    def __init__(self, max_lines=5000):
         super().__init__()
         self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.set_max_lines(max_lines)
 
-    # def append_line(self, text):
-    #    self.append(text)
-    #    self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+    def set_max_lines(self, max_lines):
+        # старые строки документ выкидывает сам — кольцевой буфер
+        self.max_lines = max_lines
+        self.setMaximumBlockCount(max_lines)
 
     def append_line(self, text: str):
-        self.append(text)
-        self.moveCursor(self.textCursor().End)
+        self.appendPlainText(text)
+
+    def append_lines(self, lines):
+        if lines:
+            self.appendPlainText("\n".join(lines[-self.max_lines :]))
+
+    def load_file(self, path):
+        # показываем только хвост, полный лог остаётся в файле
+        self.clear()
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                lines = deque(f, maxlen=self.max_lines)
+        except OSError as e:
+            self.append_line(str(e))
+            return
+        self.append_lines([line.rstrip("\n") for line in lines])
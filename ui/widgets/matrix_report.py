@@ -0,0 +1,95 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import (
+    QDialog,
+    QLabel,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+from core.matrix import matrix_table
+from core.run_report import job_status
+
+STATUS_COLORS = {
+    "passed": QColor("#d4edda"),
+    "flaky": QColor("#fff3cd"),
+    "failed": QColor("#f8d7da"),
+    "stopped": QColor("#e2e3e5"),
+}
+
+
+class MatrixReport(QDialog):
+    # строки — наборы параметров, столбцы — тесты; обновляется по ходу прогона
+    def __init__(self, jobs, on_open_log=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Matrix run")
+        self.resize(720, 420)
+        self.jobs = list(jobs)
+        self.on_open_log = on_open_log
+
+        tests, labels, cells = matrix_table(self.jobs)
+        self.positions = {}
+        self.summary = QLabel()
+        self.table = QTableWidget(len(labels), len(tests))
+        self.table.setHorizontalHeaderLabels(tests)
+        self.table.setVerticalHeaderLabels([label or "—" for label in labels])
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.cellDoubleClicked.connect(self.on_cell_double_clicked)
+        for row, label in enumerate(labels):
+            for column, test in enumerate(tests):
+                job = cells.get((label, test))
+                item = QTableWidgetItem("" if job is None else "⏳")
+                item.setTextAlignment(Qt.AlignCenter)
+                if job is None:
+                    # у теста своя матрица, этого набора в ней нет
+                    item.setFlags(Qt.NoItemFlags)
+                else:
+                    self.positions[job] = (row, column)
+                self.table.setItem(row, column, item)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.summary)
+        layout.addWidget(self.table)
+        self.setLayout(layout)
+        for job in self.jobs:
+            self.refresh(job)
+
+    def refresh(self, job):
+        position = self.positions.get(job)
+        if position is None:
+            return
+        item = self.table.item(*position)
+        item.setText(self.cell_text(job))
+        item.setToolTip(job.log_path or "")
+        if job.returncode is not None or job.stop_reason:
+            item.setBackground(STATUS_COLORS[job_status(job)])
+        self.update_summary()
+
+    def update_summary(self):
+        done = [
+            job for job in self.jobs if job.returncode is not None or job.stop_reason
+        ]
+        statuses = [job_status(job) for job in done]
+        self.summary.setText(
+            f"{len(done)} of {len(self.jobs)} runs finished: "
+            f"{statuses.count('passed')} passed, {statuses.count('flaky')} flaky, "
+            f"{statuses.count('failed')} failed, {statuses.count('stopped')} stopped"
+        )
+
+    @staticmethod
+    def cell_text(job):
+        if job.running:
+            return "▶"
+        if job.returncode is None:
+            if job.stop_reason:
+                return "⏹"
+            return f"↻ {len(job.attempts)}" if job.attempts else "⏳"
+        icon = {"passed": "✅", "flaky": "⚠️", "failed": "❌", "stopped": "⏹"}
+        return f"{icon[job_status(job)]} {job.duration:.1f}s"
+
+    def on_cell_double_clicked(self, row, column):
+        for job, position in self.positions.items():
+            if position == (row, column) and job.log_path and self.on_open_log:
+                self.on_open_log(job)
+                return
@@ -0,0 +1,96 @@
+from PyQt5.QtGui import QFontDatabase
+from PyQt5.QtWidgets import (
+    QDialog,
+    QHBoxLayout,
+    QPlainTextEdit,
+    QPushButton,
+    QVBoxLayout,
+)
+
+from core.memory import (
+    format_allocators,
+    is_tracing,
+    start_tracing,
+    stop_tracing,
+    take_snapshot,
+    top_allocators,
+)
+from ui.memory_stats import memory_counts
+
+
+class MemoryReport(QDialog):
+    def __init__(self, window):
+        super().__init__(window)
+        self.setWindowTitle("Memory")
+        self.resize(720, 520)
+        self.main_window = window
+        # рост считаем от первого снимка после запуска tracemalloc
+        self.first = None
+
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+
+        self.refresh_btn = QPushButton("Refresh")
+        self.refresh_btn.clicked.connect(self.refresh)
+        self.tracing_btn = QPushButton()
+        self.tracing_btn.clicked.connect(self.toggle_tracing)
+        self.snapshot_btn = QPushButton("Snapshot")
+        self.snapshot_btn.setToolTip("Top allocators and growth since the first one")
+        self.snapshot_btn.clicked.connect(self.snapshot)
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.refresh_btn)
+        buttons.addWidget(self.tracing_btn)
+        buttons.addWidget(self.snapshot_btn)
+        buttons.addStretch()
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.text)
+        layout.addLayout(buttons)
+        self.refresh()
+
+    def toggle_tracing(self):
+        if is_tracing():
+            stop_tracing()
+            self.first = None
+        else:
+            start_tracing()
+        self.refresh()
+
+    def snapshot(self):
+        current = take_snapshot()
+        if current is None:
+            return
+        previous = self.first
+        if previous is None:
+            self.first = current
+        lines = self.count_lines()
+        lines.append("")
+        lines.append(
+            f"traced: {current.traced / 1024:.0f} KiB, peak {current.peak / 1024:.0f} KiB"
+        )
+        if previous is not None:
+            growth = (current.traced - previous.traced) / 1024
+            lines.append(f"growth since first snapshot: {growth:+.0f} KiB")
+            lines.append("")
+            lines.append("Top growth:")
+        else:
+            lines.append("")
+            lines.append("Top allocators:")
+        lines += format_allocators(top_allocators(current, previous))
+        self.text.setPlainText("\n".join(lines))
+
+    def count_lines(self):
+        counts = memory_counts(self.main_window)
+        width = max(len(name) for name in counts)
+        return [f"{name:<{width}}  {value}" for name, value in counts.items()]
+
+    def refresh(self):
+        tracing = is_tracing()
+        self.tracing_btn.setText("Stop tracemalloc" if tracing else "Start tracemalloc")
+        self.snapshot_btn.setEnabled(tracing)
+        lines = self.count_lines()
+        if not tracing:
+            lines += ["", "tracemalloc is off: start it to see allocators"]
+        self.text.setPlainText("\n".join(lines))
@@ -0,0 +1,55 @@
+from PyQt5.QtWidgets import QListWidget, QListWidgetItem
+
+
+class RunResultsView(QListWidget):
+    def __init__(self):
+        super().__init__()
+        self.items = {}
+
+    def show_jobs(self, jobs):
+        self.clear()
+        self.items = {}
+        for job in jobs:
+            item = QListWidgetItem()
+            item.setData(1, job)
+            self.items[job] = item
+            self.addItem(item)
+            self.refresh(job)
+
+    def refresh(self, job):
+        item = self.items.get(job)
+        if item is None:
+            return
+        item.setText(self.job_text(job))
+
+    @staticmethod
+    def job_text(job):
+        device = f" [{job.device}]" if job.device else ""
+        if job.running:
+            return f"▶ {job.test_name}{device}"
+        if job.returncode is None:
+            if job.stop_reason:
+                return f"⏹ {job.test_name} (not run)"
+            if job.attempts:
+                return f"↻ {job.test_name} (retry {len(job.attempts)})"
+            return f"⏳ {job.test_name}"
+        if job.flaky:
+            return (
+                f"⚠️ {job.test_name}{device} ({job.duration:.1f}s, flaky: "
+                f"passed on attempt {len(job.attempts) + 1})"
+            )
+        if job.passed:
+            return f"✅ {job.test_name}{device} ({job.duration:.1f}s)"
+        failed = [step for step in job.steps if step.failed]
+        at_step = f", step {failed[0].index + 1}" if failed else ""
+        if job.attempts:
+            at_step += f", {len(job.attempts) + 1} attempts"
+        if job.stop_reason:
+            return (
+                f"⏹ {job.test_name}{device} "
+                f"({job.stop_reason}, {job.duration:.1f}s{at_step})"
+            )
+        return (
+            f"❌ {job.test_name}{device} "
+            f"(code {job.returncode}, {job.duration:.1f}s{at_step})"
+        )
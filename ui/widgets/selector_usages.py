@@ -0,0 +1,97 @@
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtWidgets import (
+    QComboBox,
+    QDialog,
+    QDialogButtonBox,
+    QHBoxLayout,
+    QLabel,
+    QListWidget,
+    QListWidgetItem,
+    QPlainTextEdit,
+    QPushButton,
+    QVBoxLayout,
+)
+
+
+class SelectorUsagesDialog(QDialog):
+    usage_activated = pyqtSignal(str, object)  # файл, индекс шага
+    rename_requested = pyqtSignal(str, str)  # вид, значение
+
+    def __init__(self, selectors, index, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Find usages")
+        self.resize(560, 420)
+        self.index = index
+
+        self.selector_box = QComboBox()
+        for kind, value in selectors:
+            self.selector_box.addItem(f"{kind}: {value}", (kind, value))
+        self.selector_box.currentIndexChanged.connect(self.show_usages)
+
+        self.summary = QLabel()
+        self.usages = QListWidget()
+        self.usages.itemActivated.connect(self.on_usage_activated)
+
+        rename_btn = QPushButton("Rename…")
+        rename_btn.clicked.connect(self.on_rename)
+
+        top = QHBoxLayout()
+        top.addWidget(self.selector_box, 1)
+        top.addWidget(rename_btn)
+
+        layout = QVBoxLayout()
+        layout.addLayout(top)
+        layout.addWidget(self.summary)
+        layout.addWidget(self.usages)
+        self.setLayout(layout)
+
+        self.show_usages()
+
+    def selector(self):
+        return self.selector_box.currentData()
+
+    def show_usages(self):
+        self.usages.clear()
+        selector = self.selector()
+        if selector is None:
+            return
+        usages = self.index.usages(*selector)
+        for path, step_index in usages:
+            step = "header" if step_index is None else f"step {step_index + 1}"
+            item = QListWidgetItem(f"{path}: {step}")
+            item.setData(1, (path, step_index))
+            self.usages.addItem(item)
+        files = len({path for path, _ in usages})
+        self.summary.setText(f"{len(usages)} usages in {files} files")
+
+    def on_usage_activated(self, item):
+        path, step_index = item.data(1)
+        self.usage_activated.emit(path, step_index)
+
+    def on_rename(self):
+        selector = self.selector()
+        if selector:
+            self.rename_requested.emit(*selector)
+
+
+class RenamePreviewDialog(QDialog):
+    # dry run: показываем diff, запись — только по Apply
+    def __init__(self, diff, files, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Rename: {files} files will change")
+        self.resize(720, 520)
+
+        view = QPlainTextEdit()
+        view.setReadOnly(True)
+        view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        view.setPlainText(diff)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Apply | QDialogButtonBox.Cancel)
+        buttons.button(QDialogButtonBox.Apply).clicked.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        buttons.button(QDialogButtonBox.Apply).setEnabled(files > 0)
+
+        layout = QVBoxLayout()
+        layout.addWidget(view)
+        layout.addWidget(buttons, 0, Qt.AlignRight)
+        self.setLayout(layout)
@@ -0,0 +1,68 @@
+from datetime import datetime
+
+from PyQt5.QtWidgets import (
+    QDialog,
+    QLabel,
+    QListWidget,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+SPARK_BARS = "▁▂▃▄▅▆▇█"
+
+
+def sparkline(values):
+    if not values:
+        return ""
+    low, high = min(values), max(values)
+    scale = (len(SPARK_BARS) - 1) / (high - low) if high > low else 0
+    return "".join(SPARK_BARS[int((value - low) * scale)] for value in values)
+
+
+class TimingReport(QDialog):
+    def __init__(self, test_name, timings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Timings: {test_name}")
+        self.resize(640, 480)
+
+        trend = timings.trend(test_name)
+        slowest = timings.slowest_steps(test_name)
+
+        layout = QVBoxLayout()
+        durations = [duration for _, duration, _ in trend]
+        if durations:
+            summary = (
+                f"{len(trend)} runs, last {durations[-1]:.1f}s, "
+                f"min {min(durations):.1f}s, max {max(durations):.1f}s   "
+                f"{sparkline(durations)}"
+            )
+        else:
+            summary = "Нет истории запусков"
+        layout.addWidget(QLabel(summary))
+
+        layout.addWidget(QLabel("Slowest steps:"))
+        table = QTableWidget(len(slowest), 5)
+        table.setHorizontalHeaderLabels(["#", "Step", "Avg, s", "Max, s", "Failed"])
+        for row, (index, text, average, maximum, runs, failed) in enumerate(slowest):
+            values = [
+                str(index + 1),
+                text,
+                f"{average:.2f}",
+                f"{maximum:.2f}",
+                f"{failed}/{runs}",
+            ]
+            for column, value in enumerate(values):
+                table.setItem(row, column, QTableWidgetItem(value))
+        table.resizeColumnsToContents()
+        layout.addWidget(table)
+
+        layout.addWidget(QLabel("Runs:"))
+        runs = QListWidget()
+        for started, duration, returncode in reversed(trend):
+            status = "✅" if returncode == 0 else f"❌ code {returncode}"
+            date = datetime.fromtimestamp(started).strftime("%Y-%m-%d %H:%M:%S")
+            runs.addItem(f"{date}  {duration:.1f}s  {status}")
+        layout.addWidget(runs)
+
+        self.setLayout(layout)
@@ -0,0 +1,54 @@
+from PyQt5.QtCore import QEvent, Qt, QTimer
+from PyQt5.QtWidgets import QLabel
+
+from core.tracing import tracer
+
+
+class TraceOverlay(QLabel):
+    # полупрозрачный список последних замеров поверх окна
+    ROWS = 15
+    REFRESH_MS = 500
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setTextFormat(Qt.PlainText)
+        self.setAlignment(Qt.AlignTop | Qt.AlignLeft)
+        self.setStyleSheet(
+            "background: rgba(0, 0, 0, 170); color: #e0e0e0;"
+            "font-family: monospace; padding: 6px; border-radius: 4px;"
+        )
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+        parent.installEventFilter(self)
+        self.hide()
+
+    def eventFilter(self, obj, event):
+        if obj is self.parent() and event.type() == QEvent.Resize:
+            self.place()
+        return False
+
+    def place(self):
+        self.adjustSize()
+        parent = self.parent()
+        self.move(parent.width() - self.width() - 8, 8)
+
+    def set_active(self, active):
+        self.setVisible(active)
+        if active:
+            self.refresh()
+            self.raise_()
+            self.timer.start()
+        else:
+            self.timer.stop()
+
+    def refresh(self):
+        lines = ["ms        last timings"]
+        for event in reversed(tracer.recent(self.ROWS)):
+            mark = "⚠ " if event.name == "event loop stall" else ""
+            lines.append(f"{event.duration / 1e6:8.1f}  {mark}{event.name}")
+        if len(lines) == 1:
+            lines.append("      —  no events yet")
+        self.setText("\n".join(lines))
+        self.place()
@@ -1,8 +1,77 @@
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QTextCursor
 from PyQt5.QtWidgets import QTextEdit
 
+from core.tracing import span, traced
+
+
+def qt_length(text):
+    # позиции QTextCursor считаются в UTF-16
+    return len(text.encode("utf-16-le")) // 2
+
 
 class YamlPreview(QTextEdit):
-    def __init__(self):
+    DEBOUNCE_MS = 150
+
+    def __init__(self, source=None):
         super().__init__()
         self.setReadOnly(True)
         self.setPlaceholderText("YAML preview will appear here")
+        self.document().setUndoRedoEnabled(False)
+
+        self.source = source
+        self.fragments = []
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.refresh)
+
+    def schedule(self):
+        # серия правок подряд даёт одно обновление
+        self.timer.start(self.DEBOUNCE_MS)
+
+    @traced("update_yaml")
+    def refresh(self):
+        self.timer.stop()
+        if self.source:
+            with span("yaml_fragments"):
+                fragments = self.source()
+            self.apply_fragments(fragments)
+
+    def apply_fragments(self, fragments):
+        old = self.fragments
+        limit = min(len(old), len(fragments))
+
+        prefix = 0
+        while prefix < limit and old[prefix] == fragments[prefix]:
+            prefix += 1
+
+        suffix = 0
+        while (
+            suffix < limit - prefix
+            and old[len(old) - 1 - suffix] == fragments[len(fragments) - 1 - suffix]
+        ):
+            suffix += 1
+
+        removed = old[prefix : len(old) - suffix]
+        inserted = fragments[prefix : len(fragments) - suffix]
+        self.fragments = list(fragments)
+        if not removed and not inserted:
+            return
+
+        start = sum(qt_length(f) for f in old[:prefix])
+        end = start + sum(qt_length(f) for f in removed)
+
+        v_scroll = self.verticalScrollBar().value()
+        h_scroll = self.horizontalScrollBar().value()
+
+        cursor = QTextCursor(self.document())
+        cursor.setPosition(start)
+        cursor.setPosition(end, QTextCursor.KeepAnchor)
+        cursor.insertText("".join(inserted))
+
+        self.verticalScrollBar().setValue(v_scroll)
+        self.horizontalScrollBar().setValue(h_scroll)
+
+    def text(self):
+        return "".join(self.fragments)
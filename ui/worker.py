@@ -0,0 +1,19 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class FunctionThread(QThread):
+    done = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, func, *args):
+        super().__init__()
+        self.func = func
+        self.args = args
+
+    def run(self):
+        try:
+            result = self.func(*self.args)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.done.emit(result)